@@ -2,19 +2,26 @@
 Oddzielna aplikacja dla typera - uproszczona wersja bez prognoz
 """
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import queue
+import atexit
 import os
+import json
+import glob
+import re
+import hashlib
 from typing import List, Dict
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from tipper import Tipper
 from tipper_storage import (
     TipperStorage,
-    season_uses_worst_score_rule,
     get_season_file_signatures,
     get_cached_all_time_leaderboard,
 )
@@ -33,26 +40,50 @@ st.set_page_config(
 # Konfiguracja logowania
 LOG_LEVEL_NAME = os.getenv("TIPPER_LOG_LEVEL", "WARNING").upper()
 LOG_LEVEL = getattr(logging, LOG_LEVEL_NAME, logging.WARNING)
-LOG_FILE_MAX_BYTES = int(os.getenv("TIPPER_LOG_MAX_BYTES", "1000000"))
-LOG_FILE_BACKUP_COUNT = int(os.getenv("TIPPER_LOG_BACKUP_COUNT", "3"))
-
-rotating_file_handler = RotatingFileHandler(
-    'tipper.log',
-    maxBytes=LOG_FILE_MAX_BYTES,
-    backupCount=LOG_FILE_BACKUP_COUNT,
-    encoding='utf-8'
-)
+LOG_FILE_MAX_BYTES = int(os.getenv("TIPPER_LOG_MAX_BYTES", "32000000"))
+LOG_FILE_BACKUP_COUNT = int(os.getenv("TIPPER_LOG_BACKUP_COUNT", "5"))
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+@st.cache_resource(show_spinner=False)
+def get_log_queue_handler() -> QueueHandler:
+    """Tworzy raz na proces handlery pliku i konsoli obsługiwane przez QueueListener w osobnym wątku."""
+    rotating_file_handler = RotatingFileHandler(
+        'tipper.log',
+        maxBytes=LOG_FILE_MAX_BYTES,
+        backupCount=LOG_FILE_BACKUP_COUNT,
+        encoding='utf-8',
+        delay=True
+    )
+
+    # Rozmiar logu z jednego stat() (bez osobnego exists/getsize)
+    try:
+        log_file_size = os.stat('tipper.log').st_size
+    except OSError:
+        log_file_size = 0
+    if log_file_size > LOG_FILE_MAX_BYTES:
+        rotating_file_handler.doRollover()
+
+    log_formatter = logging.Formatter(LOG_FORMAT)
+    stream_handler = logging.StreamHandler()
+    for handler in (rotating_file_handler, stream_handler):
+        handler.setFormatter(log_formatter)
+
+    # Zapis na dysk i formatowanie poza wątkiem obsługującym rerun
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, rotating_file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    queue_handler = QueueHandler(log_queue)
+    # Formatowanie robią handlery listenera - w kolejce zostaje sama treść komunikatu (bez podwójnego prefiksu)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    return queue_handler
 
-if os.path.exists('tipper.log') and os.path.getsize('tipper.log') > LOG_FILE_MAX_BYTES:
-    rotating_file_handler.doRollover()
 
 logging.basicConfig(
     level=LOG_LEVEL,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        rotating_file_handler,
-        logging.StreamHandler()
-    ],
+    handlers=[get_log_queue_handler()],
     force=True
 )
 logger = logging.getLogger(__name__)
@@ -61,6 +92,54 @@ FIXTURES_CACHE_TTL_SECONDS = 300
 ROUND_AUTO_SYNC_TTL_SECONDS = 3600
 LEAGUE_DETAILS_CACHE_TTL_SECONDS = 86400
 ROUND_LIVE_SYNC_TTL_SECONDS = 3600
+SEASON_LIST_CACHE_TTL_SECONDS = 60
+MAX_FIXTURE_FETCH_WORKERS = 8
+LEADERBOARD_CACHE_TTL_SECONDS = 300
+# Każdy zapis (dowolnej sesji) zmienia rewizję danych - limit wpisów, aby stare widoki kolejek nie zostawały w pamięci
+ROUND_VIEW_CACHE_MAX_ENTRIES = 32
+# Wykresy Top 10 (całość, kolejki, wszechczasy) - tytuł per kolejka tworzy osobny wpis
+RANKING_FIGURE_CACHE_MAX_ENTRIES = 32
+ROUND_DATE_KEY_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+OAUTH_ENV_KEYS = (
+    'HATTRICK_CONSUMER_KEY',
+    'HATTRICK_CONSUMER_SECRET',
+    'HATTRICK_ACCESS_TOKEN',
+    'HATTRICK_ACCESS_TOKEN_SECRET'
+)
+IMPORT_REQUIRED_KEYS = frozenset({'players', 'rounds', 'seasons', 'leagues', 'settings'})
+
+
+@st.cache_resource(show_spinner=False)
+def load_oauth_credentials() -> tuple[str, str, str, str]:
+    """Odczytuje klucze OAuth Hattrick (.env / zmienne środowiskowe) raz na proces; brak klucza zgłasza wyjątek (nie trafia do cache)."""
+    # .env czytany tylko gdy nie wszystkie klucze są już w środowisku (np. ustawione przez hosting)
+    if not all(os.getenv(key) for key in OAUTH_ENV_KEYS):
+        load_dotenv(override=False)
+    credentials = tuple(os.getenv(key) for key in OAUTH_ENV_KEYS)
+    if not all(credentials):
+        raise RuntimeError("Brak kluczy OAuth Hattrick w środowisku i .env")
+    return credentials
+
+
+def get_oauth_credentials() -> tuple[str, str, str, str] | None:
+    """Zwraca klucze OAuth Hattrick lub None, gdy brakuje któregoś klucza (kolejne wywołanie sprawdzi ponownie)."""
+    try:
+        return load_oauth_credentials()
+    except RuntimeError:
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def get_hattrick_client(
+    consumer_key: str,
+    consumer_secret: str,
+    access_token: str,
+    access_token_secret: str
+) -> HattrickOAuthSimple:
+    """Zwraca współdzielonego klienta CHPP - jedna sesja OAuth (keep-alive) zamiast nowej przy każdym pobraniu."""
+    client = HattrickOAuthSimple(consumer_key, consumer_secret)
+    client.set_access_tokens(access_token, access_token_secret)
+    return client
 
 
 @st.cache_data(ttl=FIXTURES_CACHE_TTL_SECONDS, show_spinner=False)
@@ -72,8 +151,7 @@ def get_cached_league_fixtures(
     league_id: int
 ) -> List[Dict]:
     """Pobiera fixtures ligi z krótkim cache, aby ograniczyć liczbę requestów przy rerunach."""
-    client = HattrickOAuthSimple(consumer_key, consumer_secret)
-    client.set_access_tokens(access_token, access_token_secret)
+    client = get_hattrick_client(consumer_key, consumer_secret, access_token, access_token_secret)
     fixtures = client.get_league_fixtures(league_id)
 
     # Rozróżniamy awarię API (None) od ligi bez meczów ([]).
@@ -100,40 +178,99 @@ def get_cached_league_name(
     league_id: int
 ) -> str:
     """Pobiera nazwę ligi i trzyma ją długo w cache."""
-    client = HattrickOAuthSimple(consumer_key, consumer_secret)
-    client.set_access_tokens(access_token, access_token_secret)
+    client = get_hattrick_client(consumer_key, consumer_secret, access_token, access_token_secret)
     league_name = client.get_league_name(league_id)
     return league_name or f"Liga {league_id}"
 
 
-def safe_get_league_name_from_storage_or_api(storage: TipperStorage, league_id: int) -> str:
+@st.cache_data(ttl=LEAGUE_DETAILS_CACHE_TTL_SECONDS, show_spinner=False)
+def get_cached_league_names(
+    consumer_key: str,
+    consumer_secret: str,
+    access_token: str,
+    access_token_secret: str,
+    league_ids: tuple
+) -> Dict[int, str]:
+    """Pobiera nazwy listy lig równolegle i trzyma całą mapę w cache (jeden wpis na zestaw lig)."""
+    # Klient pobierany w wątku głównym - wątki robocze wołają tylko zwykłe metody klienta (bez st.cache_*)
+    client = get_hattrick_client(consumer_key, consumer_secret, access_token, access_token_secret)
+    with ThreadPoolExecutor(max_workers=max(2, min(len(league_ids), MAX_FIXTURE_FETCH_WORKERS))) as executor:
+        fetched_names = dict(zip(league_ids, executor.map(client.get_league_name, league_ids)))
+
+    # Przy błędzie API rzucamy wyjątek, żeby st.cache_data NIE zapisał nazw zastępczych na cały TTL
+    failed_league_ids = [league_id for league_id, league_name in fetched_names.items() if not league_name]
+    if failed_league_ids:
+        raise RuntimeError(f"API nie zwróciło nazw lig: {failed_league_ids}")
+    return fetched_names
+
+
+def safe_get_league_name_from_storage_or_api(storage: TipperStorage, league_id: int, save: bool = True) -> str:
     """Zwraca nazwę ligi bez wywalania się, jeśli OAuth nie jest jeszcze zainicjalizowany."""
     stored_league = storage.data.get('leagues', {}).get(str(league_id), {})
     stored_league_name = stored_league.get('name')
     if stored_league_name:
         return stored_league_name
 
-    consumer_key = os.getenv('HATTRICK_CONSUMER_KEY')
-    consumer_secret = os.getenv('HATTRICK_CONSUMER_SECRET')
-    access_token = os.getenv('HATTRICK_ACCESS_TOKEN')
-    access_token_secret = os.getenv('HATTRICK_ACCESS_TOKEN_SECRET')
-
-    if not all([consumer_key, consumer_secret, access_token, access_token_secret]):
+    oauth_credentials = get_oauth_credentials()
+    if not oauth_credentials:
         return f"Liga {league_id}"
 
-    league_name = get_cached_league_name(
-        consumer_key,
-        consumer_secret,
-        access_token,
-        access_token_secret,
-        league_id
-    )
+    league_name = get_cached_league_name(*oauth_credentials, league_id)
     if league_name:
-        storage.add_league(league_id, league_name)
+        storage.add_league(league_id, league_name, save=save)
 
     return league_name or f"Liga {league_id}"
 
 
+def get_league_names_map(storage: TipperStorage, league_ids: List[int], persist: bool = True) -> Dict[int, str]:
+    """Zwraca nazwy lig (najpierw z danych, brakujące z cache API); przy persist pobrane nazwy zapisuje w danych jednym zapisem."""
+    stored_leagues = storage.data.get('leagues', {})
+    league_names = {}
+    missing_league_ids = []
+    for league_id in league_ids:
+        stored_name = stored_leagues.get(str(league_id), {}).get('name')
+        if stored_name:
+            league_names[league_id] = stored_name
+        else:
+            missing_league_ids.append(league_id)
+
+    if not missing_league_ids:
+        return league_names
+
+    oauth_credentials = get_oauth_credentials()
+    if not oauth_credentials:
+        for league_id in missing_league_ids:
+            league_names[league_id] = f"Liga {league_id}"
+        return league_names
+
+    # Brakujące nazwy z jednego wpisu cache dla całej listy; zapis do storage tylko w wątku głównym
+    try:
+        fetched_names = get_cached_league_names(*oauth_credentials, tuple(missing_league_ids))
+    except RuntimeError as error:
+        # Nazwy zastępcze tylko na ten przebieg - kolejny spróbuje pobrać nazwy ponownie
+        logger.warning("Nie udało się pobrać nazw lig: %s", error)
+        fetched_names = {}
+    for league_id in missing_league_ids:
+        league_names[league_id] = fetched_names.get(league_id) or f"Liga {league_id}"
+
+    if persist:
+        # Zapis (jeden) tylko, gdy faktycznie dodano nazwy lig
+        storage.add_leagues({league_id: name for league_id, name in fetched_names.items() if name})
+
+    return league_names
+
+
+@st.cache_data(ttl=SEASON_LIST_CACHE_TTL_SECONDS, show_spinner=False)
+def get_available_seasons(data_dir: str, dir_mtime_ns: int) -> List[str]:
+    """Zwraca sezony z plików tipper_data_season_*.json (najnowszy pierwszy); dir_mtime_ns unieważnia cache po dodaniu pliku."""
+    season_nums = []
+    for file_path in glob.glob(os.path.join(data_dir, "tipper_data_season_*.json")):
+        match = re.search(r'tipper_data_season_(\d+)\.json', os.path.basename(file_path))
+        if match:
+            season_nums.append(int(match.group(1)))
+    return [f"season_{season_num}" for season_num in sorted(season_nums, reverse=True)]
+
+
 def get_effective_selected_players(storage: TipperStorage, season_id: str) -> List[str]:
     """Zwraca aktywną listę graczy dla sezonu; pusty wybór oznacza wszystkich."""
     all_players = storage.get_season_players_list(season_id=season_id)
@@ -145,40 +282,71 @@ def get_effective_selected_players(storage: TipperStorage, season_id: str) -> Li
     return filtered_players if filtered_players else all_players
 
 
+def get_seconds_since_auto_sync(round_id: str) -> float:
+    """Zwraca liczbę sekund od ostatniej synchronizacji rundy w bieżącej sesji."""
+    last_sync_ts = float(st.session_state.get(f"_last_auto_sync_{round_id}", 0))
+    return datetime.now().timestamp() - last_sync_ts
+
+
+def mark_round_auto_synced(round_id: str):
+    """Zapisuje czas synchronizacji rundy oraz czas ostatniej synchronizacji w całej sesji."""
+    sync_ts = datetime.now().timestamp()
+    st.session_state[f"_last_auto_sync_{round_id}"] = sync_ts
+    st.session_state["_last_auto_sync_any"] = sync_ts
+
+
 def should_auto_sync_round(round_id: str, scope: str, ttl_seconds: int | None) -> bool:
     """Ogranicza automatyczne synchronizacje tej samej rundy przy kolejnych rerunach."""
     if ttl_seconds is None:
         return False
 
-    sync_key = f"_last_auto_sync_{round_id}"
-    now_ts = datetime.now().timestamp()
-    last_sync_ts = float(st.session_state.get(sync_key, 0))
-
-    if now_ts - last_sync_ts < ttl_seconds:
+    if get_seconds_since_auto_sync(round_id) < ttl_seconds:
         return False
 
-    st.session_state[sync_key] = now_ts
+    mark_round_auto_synced(round_id)
     return True
 
 
 def get_last_auto_sync_label() -> str:
     """Zwraca etykietę z czasem ostatniej automatycznej synchronizacji w bieżącej sesji."""
-    sync_values = []
-
-    for key, value in st.session_state.items():
-        if key.startswith("_last_auto_sync_"):
-            try:
-                sync_values.append(float(value))
-            except (TypeError, ValueError):
-                continue
-
-    if not sync_values:
+    # Jeden klucz z czasem ostatniej synchronizacji zamiast przeglądania całego session_state
+    last_sync_ts = st.session_state.get("_last_auto_sync_any")
+    if last_sync_ts is None:
         return "Auto update: brak w tej sesji"
 
-    last_sync = datetime.fromtimestamp(max(sync_values))
+    last_sync = datetime.fromtimestamp(float(last_sync_ts))
     return f"Auto update: {last_sync.strftime('%H:%M')}"
 
 
+def group_matches_by_round_date(matches: List[Dict], rounds=None, skip_round_keys=frozenset()):
+    """Grupuje mecze po dniu rozgrywania (klucz YYYY-MM-DD); daty parsowane jedną wektorową konwersją pandas."""
+    if rounds is None:
+        rounds = defaultdict(list)
+    if not matches:
+        return rounds
+
+    match_dates = pd.to_datetime(
+        pd.Series([match.get('match_date') for match in matches], dtype=object),
+        format="%Y-%m-%d %H:%M:%S",
+        errors='coerce'
+    )
+    # Brakująca lub niepoprawna data daje NaT -> NaN, taki mecz jest pomijany
+    for match, round_key in zip(matches, match_dates.dt.strftime("%Y-%m-%d")):
+        if isinstance(round_key, str) and round_key not in skip_round_keys:
+            rounds[round_key].append(match)
+    return rounds
+
+
+def collect_team_names(matches) -> List[str]:
+    """Zwraca posortowane unikalne nazwy drużyn (gospodarzy i gości) z meczów w jednym przejściu."""
+    team_names = set()
+    for match in matches:
+        team_names.add((match.get('home_team_name') or '').strip())
+        team_names.add((match.get('away_team_name') or '').strip())
+    team_names.discard('')
+    return sorted(team_names)
+
+
 def build_team_metadata_from_fixtures(fixtures: List[Dict], league_names: Dict[int, str]) -> Dict[str, Dict]:
     """Buduje etykiety drużyn z nazwami lig na podstawie już pobranych fixtures."""
     team_metadata = {}
@@ -229,11 +397,12 @@ def build_ht_forum_table(df: pd.DataFrame, columns: List[str]) -> str:
     )
     rows.append(f"[tr]{header_cells}[/tr]")
 
-    for _, row in df[columns].iterrows():
-        value_cells = ''.join(
-            f"[td]{_normalize_ht_forum_cell(row[column])}[/td]"
-            for column in columns
-        )
+    # Normalizacja komórek kolumnami w pandas zamiast wywołania funkcji dla każdej komórki (iterrows)
+    cells = df[columns].fillna('').astype(str).apply(
+        lambda column: column.str.replace(r'[\r\n]', ' ', regex=True).str.strip()
+    )
+    for row in cells.itertuples(index=False, name=None):
+        value_cells = ''.join(f"[td]{value}[/td]" for value in row)
         rows.append(f"[tr]{value_cells}[/tr]")
 
     return "[table]\n" + "\n".join(rows) + "\n[/table]"
@@ -256,14 +425,15 @@ def render_ht_forum_export(title: str, df: pd.DataFrame, columns: List[str], key
         )
 
 
-def get_session_storage(season_id: str) -> TipperStorage:
-    """Zwraca storage trzymany w sesji, aby nie ładować go od nowa przy każdym rerunie."""
-    storage_cache = st.session_state.setdefault("_storage_cache", {})
+@st.cache_resource(show_spinner=False)
+def get_shared_storage(season_id: str) -> TipperStorage:
+    """Jeden storage sezonu na proces - sesje współdzielą dane w pamięci zamiast ładować własne kopie pliku."""
+    return TipperStorage(season_id=season_id)
 
-    if season_id not in storage_cache:
-        storage_cache[season_id] = TipperStorage(season_id=season_id)
 
-    storage = storage_cache[season_id]
+def get_session_storage(season_id: str) -> TipperStorage:
+    """Zwraca współdzielony storage sezonu, aby nie ładować go od nowa przy każdym rerunie ani w każdej sesji."""
+    storage = get_shared_storage(season_id)
     storage.maybe_backup_to_github()
     return storage
 
@@ -288,22 +458,19 @@ def get_round_sync_ttl(selected_matches: List[Dict], stored_matches: List[Dict])
 
     has_missing_past_result = False
     has_future_match = False
+    # Daty parsowane jednym wywołaniem dla całej rundy zamiast strptime per mecz
+    match_datetimes = build_match_datetimes(list(matches_by_id.values()))
 
-    for match in matches_by_id.values():
+    for match_id, match in matches_by_id.items():
         home_goals = match.get('home_goals')
         away_goals = match.get('away_goals')
 
         if home_goals is not None and away_goals is not None:
             continue
 
-        match_date = match.get('match_date')
-        if not match_date:
-            has_missing_past_result = True
-            continue
-
-        try:
-            match_dt = datetime.strptime(match_date, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
+        # Brak daty lub błędny format traktujemy jak mecz rozegrany bez wyniku
+        match_dt = match_datetimes.get(match_id)
+        if match_dt is None:
             has_missing_past_result = True
             continue
 
@@ -321,6 +488,35 @@ def get_round_sync_ttl(selected_matches: List[Dict], stored_matches: List[Dict])
     return None
 
 
+def build_match_datetimes(matches: List[Dict]) -> Dict[str, datetime | None]:
+    """Parsuje daty meczów jednym wektorowym wywołaniem pandas; zwraca mapę match_id -> datetime (None gdy brak/błąd)."""
+    parsed_dates = pd.to_datetime(
+        [match.get('match_date') for match in matches],
+        format="%Y-%m-%d %H:%M:%S",
+        errors='coerce'
+    )
+    return {
+        str(match.get('match_id', '')): (None if pd.isna(match_dt) else match_dt.to_pydatetime())
+        for match, match_dt in zip(matches, parsed_dates)
+    }
+
+
+def get_editable_match_ids(match_datetimes: Dict[str, datetime | None], allow_historical: bool, now: datetime) -> set:
+    """Zwraca match_id meczów, dla których można zmieniać typ (nierozpoczęte lub dozwolone typy historyczne)."""
+    if allow_historical:
+        return set(match_datetimes)
+    return {match_id for match_id, match_dt in match_datetimes.items() if match_dt is None or now < match_dt}
+
+
+def get_predictions_form_hash(form_values: Dict[str, str], stored_predictions: Dict) -> str:
+    """Skrót wartości formularza i zapisanych typów - ten sam skrót oznacza, że zapis niczego nie zmieni."""
+    payload = repr((
+        sorted(form_values.items()),
+        sorted((str(mid), pred.get('home'), pred.get('away')) for mid, pred in stored_predictions.items())
+    ))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
 def get_all_time_leaderboard(exclude_worst: bool = False) -> List[Dict]:
     """
     Oblicza ranking wszechczasów - suma punktów ze wszystkich sezonów dla każdego gracza
@@ -332,24 +528,538 @@ def get_all_time_leaderboard(exclude_worst: bool = False) -> List[Dict]:
         Lista słowników z danymi graczy posortowana po sumie punktów (malejąco)
     """
     file_signatures = get_season_file_signatures(os.getcwd())
-    logger.info(f"get_all_time_leaderboard: używam cache dla {len(file_signatures)} plików sezonów")
+    logger.debug("get_all_time_leaderboard: używam cache dla %s plików sezonów", len(file_signatures))
     return list(get_cached_all_time_leaderboard(file_signatures, exclude_worst))
 
 
+@st.cache_data(ttl=LEADERBOARD_CACHE_TTL_SECONDS, show_spinner=False)
+def get_cached_leaderboard(season_id: str, exclude_worst: bool, data_revision: int) -> List[Dict]:
+    """Ranking sezonu liczony raz na rewizję danych (storage.data_revision); TTL odświeża status kolejek zależny od czasu."""
+    return get_shared_storage(season_id).get_leaderboard(exclude_worst=exclude_worst, season_id=season_id)
+
+
+def build_leaderboard_dataframe(leaderboard: List[Dict], exclude_worst: bool) -> pd.DataFrame:
+    """Buduje tabelę rankingu całości kolumnowo (punkty kolejek w formacie: 26 + 37 + 32 = 95 - 26)."""
+    raw_df = pd.DataFrame(leaderboard)
+    round_points = raw_df['round_points']
+    original_totals = raw_df['original_total'].astype(str)
+    worst_scores = raw_df['worst_score'].astype(str)
+    excluded_worst = raw_df['excluded_worst'].astype(bool)
+
+    points_summary = round_points.map(lambda points: ' + '.join(map(str, points))) + ' = ' + original_totals
+    points_summary = points_summary.where(~(excluded_worst & exclude_worst), points_summary + ' - ' + worst_scores)
+    # Gracz bez kolejek - sama suma punktów
+    points_summary = points_summary.where(round_points.map(bool), raw_df['total_points'].astype(str))
+
+    return pd.DataFrame({
+        'Miejsce': range(1, len(raw_df) + 1),
+        'Gracz': raw_df['player_name'],
+        'Drużyna': raw_df['team_name'].fillna('').replace('', '—'),
+        'Punkty': points_summary,
+        'Suma': raw_df['total_points'],
+        'Rundy': raw_df['rounds_played'],
+        'Najlepszy': raw_df['best_score'],
+        'Najgorszy': raw_df['worst_score'].astype(object).where(~excluded_worst, worst_scores + ' (odrzucony)')
+    })
+
+
+@st.cache_data(max_entries=RANKING_FIGURE_CACHE_MAX_ENTRIES, show_spinner=False)
+def get_ranking_bar_figure(top_df: pd.DataFrame, title: str, color_scale: str):
+    """Wykres słupkowy Top 10 rankingu - budowany ponownie tylko gdy zmienią się dane lub tytuł."""
+    fig = px.bar(
+        top_df,
+        x='Gracz',
+        y='Suma',
+        title=title,
+        labels={'Suma': 'Punkty', 'Gracz': 'Gracz'},
+        color='Suma',
+        color_continuous_scale=color_scale
+    )
+    fig.update_layout(xaxis_tickangle=-45, height=400)
+    return fig
+
+
+def get_default_round_idx(round_played_flags: tuple) -> int:
+    """Indeks najstarszej nie rozegranej kolejki na liście rund (desc); 0 gdy wszystkie są rozegrane."""
+    # Przeszukaj od końca (od najstarszej do najnowszej)
+    return next(
+        (idx for idx in range(len(round_played_flags) - 1, -1, -1) if not round_played_flags[idx]),
+        0
+    )
+
+
+def render_round_selector(
+    storage: TipperStorage,
+    season_id: str,
+    filtered_rounds: List,
+    round_options: List[str],
+    date_to_round_number: Dict[str, int],
+    default_round_idx: int,
+    widget_key: str
+):
+    """Wybór kolejki wspólny dla rankingu i typowania; zwraca (data, mecze, numer, round_id) lub None."""
+    # Zapisany wybór rundy w session_state synchronizuje ranking z sekcją typowania
+    if 'selected_round_idx' in st.session_state:
+        default_round_idx = st.session_state.selected_round_idx
+
+    selected_round_idx = st.selectbox("Wybierz rundę:", range(len(round_options)), index=default_round_idx, format_func=lambda x: round_options[x], key=widget_key)
+    st.session_state.selected_round_idx = selected_round_idx
+
+    if selected_round_idx is None:
+        return None
+
+    selected_round_date, selected_matches = filtered_rounds[selected_round_idx]
+    round_number = date_to_round_number[selected_round_date]  # Numer kolejki według daty asc (1 = najstarsza)
+    round_id = f"round_{selected_round_date}"
+
+    # Dodaj rundę do storage jeśli nie istnieje (sezon zostanie automatycznie utworzony w add_round)
+    if round_id not in storage.data['rounds']:
+        storage.add_round(season_id, round_id, selected_matches, selected_round_date)
+
+    return selected_round_date, selected_matches, round_number, round_id
+
+
 def get_exclude_worst_setting(season_id: str):
     """Zwraca zapisane ustawienie sezonowe i pokazuje je w widoku rankingu."""
-    storage_cache = st.session_state.get("_storage_cache", {})
-    storage = storage_cache.get(season_id)
-    if storage is not None:
-        rule_enabled = storage.get_exclude_worst_rule(season_id)
-    else:
-        rule_enabled = season_uses_worst_score_rule(season_id)
+    rule_enabled = get_shared_storage(season_id).get_exclude_worst_rule(season_id)
 
     rule_text = "włączone" if rule_enabled else "wyłączone"
     st.caption(f"Ustawienie sezonowe: odrzucanie najgorszego wyniku jest {rule_text}.")
     return rule_enabled
 
 
+@st.fragment
+def render_league_editor(storage: TipperStorage, selected_season_id: str, season_editable: bool):
+    """Edycja listy lig sezonu jako fragment - zmiany pól przebudowują tylko tę sekcję, a nie całą aplikację."""
+    # ID lig dla typera - per sezon (dynamiczna lista)
+    st.subheader(f"🏆 Ligi typera (Sezon {selected_season_id.replace('season_', '')})")
+    
+    # Pobierz zapisane ligi dla wybranego sezonu
+    saved_leagues = storage.get_selected_leagues(season_id=selected_season_id)
+    
+    # Jeśli nie ma zapisanych lig, użyj domyślnych
+    if not saved_leagues:
+        saved_leagues = [32612, 9399]
+    
+    # Inicjalizuj session_state dla lig (jeśli nie istnieje)
+    leagues_key = f"leagues_list_{selected_season_id}"
+    if leagues_key not in st.session_state:
+        st.session_state[leagues_key] = saved_leagues.copy()
+    
+    # Wyświetl listę lig z możliwością edycji
+    st.markdown("**Lista lig:**")
+    leagues_to_remove = []
+
+    # Nazwy lig rozwiązywane raz dla całej listy, bez zapisu do storage przy każdym przebiegu fragmentu
+    league_names_map = get_league_names_map(storage, st.session_state[leagues_key], persist=False)
+    league_rows = list(enumerate(st.session_state[leagues_key]))
+
+    for idx, league_id in league_rows:
+        col_league, col_remove = st.columns([4, 1])
+        with col_league:
+            new_league_id = st.number_input(
+                f"Liga {idx + 1} (LeagueLevelUnitID):",
+                value=league_id,
+                min_value=1,
+                key=f"league_{selected_season_id}_{idx}",
+                label_visibility="collapsed",
+                disabled=not season_editable
+            )
+            # Nazwa z mapy; zmienione w polu ID rozwiązywane osobno (również bez zapisu)
+            league_name_label = league_names_map.get(new_league_id) or get_league_names_map(
+                storage, [new_league_id], persist=False
+            )[new_league_id]
+
+            st.caption(f"Liga {idx + 1}: {new_league_id} | {league_name_label}")
+            # Aktualizuj wartość w session_state
+            st.session_state[leagues_key][idx] = new_league_id
+        with col_remove:
+            if st.button("🗑️", key=f"remove_league_{selected_season_id}_{idx}", help="Usuń ligę", disabled=not season_editable):
+                leagues_to_remove.append(idx)
+    
+    # Usuń zaznaczone ligi (od końca, aby nie zmieniać indeksów)
+    for idx in sorted(leagues_to_remove, reverse=True):
+        st.session_state[leagues_key].pop(idx)
+        st.rerun(scope="fragment")
+    
+    # Przycisk dodawania nowej ligi
+    col_add, col_save = st.columns(2)
+    with col_add:
+        if st.button("➕ Dodaj ligę", key=f"add_league_{selected_season_id}", width='stretch', disabled=not season_editable):
+            # Dodaj domyślną ligę (najwyższe ID + 1 lub 1)
+            if st.session_state[leagues_key]:
+                new_league_id = max(st.session_state[leagues_key]) + 1
+            else:
+                new_league_id = 32612
+            st.session_state[leagues_key].append(new_league_id)
+            st.rerun(scope="fragment")
+    
+    with col_save:
+        # Przycisk zapisu lig
+        if st.button("💾 Zapisz ligi", type="primary", key=f"save_leagues_{selected_season_id}", width='stretch', disabled=not season_editable):
+            TIPPER_LEAGUES = st.session_state[leagues_key].copy()
+            # Nazwy lig rozwiązywane jedną partią - zapisane w danych nie wymagają zapytania do API
+            get_league_names_map(storage, TIPPER_LEAGUES)
+            storage.set_selected_leagues(TIPPER_LEAGUES, season_id=selected_season_id)
+            storage.flush_save()  # Wymuś natychmiastowy zapis przed rerun
+            st.success(f"✅ Zapisano {len(TIPPER_LEAGUES)} lig dla sezonu {selected_season_id.replace('season_', '')}")
+            st.rerun()
+    
+    # Informacje o zapisanych ligach
+    if saved_leagues:
+        st.info(f"**Zapisane ligi:** {', '.join(map(str, saved_leagues))}")
+
+
+@st.fragment
+def render_data_export(storage: TipperStorage):
+    """Eksport danych jako fragment - kliknięcia przycisków backupu nie przebudowują całej aplikacji."""
+    if st.button("📥 Pobierz backup danych", width='stretch', help="Pobierz aktualny plik tipper_data.json"):
+        # Ta sama serializacja co przy zapisie pliku, przekazana jako bytes (bez dodatkowego kodowania str w Streamlit)
+        st.download_button(
+            label="⬇️ Pobierz plik JSON",
+            data=storage._serialize_data().encode('utf-8'),
+            file_name="tipper_data.json",
+            mime="application/json",
+            width='stretch'
+        )
+
+
+@st.cache_data(ttl=LEADERBOARD_CACHE_TTL_SECONDS, max_entries=ROUND_VIEW_CACHE_MAX_ENTRIES, show_spinner=False)
+def get_round_view(
+    season_id: str,
+    round_id: str,
+    selected_players: tuple,
+    selected_matches: List[Dict],
+    data_revision: int
+):
+    """Buduje tabelę rankingu kolejki i wiersze typów graczy (cache per rewizja danych storage)."""
+    storage = get_shared_storage(season_id)
+    round_leaderboard = [
+        player for player in storage.get_round_leaderboard(round_id)
+        if player['player_name'] in selected_players
+    ]
+
+    # Tabela budowana kolumnami zamiast listy słowników per wiersz (bez kolumny Typy);
+    # punkty za mecze jako natywna lista - wykres w komórce rysuje przeglądarka
+    df_round_leaderboard = pd.DataFrame({
+        'Miejsce': range(1, len(round_leaderboard) + 1),
+        'Gracz': [player['player_name'] for player in round_leaderboard],
+        'Drużyna': [player.get('team_name') or '—' for player in round_leaderboard],
+        'Punkty': [player.get('match_points', []) for player in round_leaderboard],
+        'Suma': [player['total_points'] for player in round_leaderboard],
+        'Mecze': [player['matches_count'] for player in round_leaderboard]
+    })
+
+    # Pobierz dane rundy jednorazowo: mecze i punkty wszystkich graczy
+    round_data = storage.get_round_snapshot(round_id)
+    matches_map = {str(m.get('match_id', '')): m for m in round_data.get('matches', [])}
+    round_match_points = round_data.get('match_points', {})
+
+    # Indeks meczów z API po match_id (fallback dla meczów brakujących w storage)
+    api_matches_by_id = {str(m.get('match_id', '')): m for m in selected_matches}
+
+    # Daty meczów rundy zbierane raz (storage, z fallbackiem na mecze z API) - klucz sortowania dla wszystkich graczy
+    match_dates = {mid: m.get('match_date', '') for mid, m in api_matches_by_id.items()}
+    match_dates.update({mid: m.get('match_date') for mid, m in matches_map.items() if m.get('match_date')})
+    # Kolejność meczów wg daty liczona raz dla rundy (mecze spoza rundy na początku, jak przy pustej dacie)
+    match_order = {mid: idx for idx, mid in enumerate(sorted(match_dates, key=lambda mid: match_dates[mid] or ''))}
+
+    # Typy wszystkich graczy rundy pobierane jednym wywołaniem zamiast osobnego odczytu na gracza
+    predictions_by_player = storage.get_round_player_predictions(
+        round_id, [player['player_name'] for player in round_leaderboard], season_id=season_id
+    )
+
+    get_match = matches_map.get
+    prediction_rows_by_player = {}
+    for player_name, player_predictions in predictions_by_player.items():
+        # Punkty gracza pobierane raz, klucze ujednolicone do string (typy mogą mieć klucze int)
+        player_match_points = {
+            str(match_id): points
+            for match_id, points in round_match_points.get(player_name, {}).items()
+        }
+        # Typy dla meczów nieobecnych ani w storage, ani w danych z API - wyświetlane jako "? vs ?"
+        missing_matches = [
+            str(match_id) for match_id in player_predictions
+            if str(match_id) not in matches_map and str(match_id) not in api_matches_by_id
+        ]
+        if missing_matches:
+            logger.warning(
+                "Ranking per kolejka: gracz %s ma typy dla meczów spoza rundy %s: %s",
+                player_name, round_id, missing_matches
+            )
+
+        rows = []
+        for match_id in sorted(player_predictions, key=lambda mid: match_order.get(str(mid), -1)):
+            match = get_match(str(match_id), {})
+
+            # Jeśli nie znaleziono w storage lub brak nazw drużyn, użyj meczu z API
+            if not match or match.get('home_team_name') in [None, '?', ''] or match.get('away_team_name') in [None, '?', '']:
+                match = api_matches_by_id.get(str(match_id), match)
+
+            pred = player_predictions[match_id]
+            home_team = match.get('home_team_name', '?')
+            away_team = match.get('away_team_name', '?')
+
+            points = player_match_points.get(str(match_id), 0)
+
+            # Pobierz wynik meczu jeśli rozegrany
+            home_goals = match.get('home_goals')
+            away_goals = match.get('away_goals')
+            has_result = home_goals is not None and away_goals is not None
+            result = f"{home_goals}-{away_goals}" if has_result else "—"
+
+            # Mecz rozegrany, a gracz z typem nie ma zapisanych punktów - punkty nie zostały przeliczone
+            if has_result and str(match_id) not in player_match_points:
+                logger.warning(
+                    "Ranking per kolejka: gracz %s, mecz %s w rundzie %s ma wynik %s-%s, ale brak punktów",
+                    player_name, match_id, round_id, home_goals, away_goals
+                )
+
+            rows.append({
+                'match_id': match_id,
+                'home_team': home_team,
+                'away_team': away_team,
+                'Mecz': f"{home_team} vs {away_team}",
+                'Typ': f"{pred.get('home', 0)}-{pred.get('away', 0)}",
+                'Wynik': result,
+                'Punkty': points
+            })
+        prediction_rows_by_player[player_name] = rows
+
+    return round_leaderboard, df_round_leaderboard, prediction_rows_by_player
+
+
+def render_round_ranking(
+    storage: TipperStorage,
+    round_id: str,
+    round_number: int,
+    selected_matches: List[Dict],
+    selected_players: List[str],
+    selected_season_id: str,
+    season_editable: bool
+):
+    """Renderuje ranking kolejki (tabela, szczegóły typów, wykres) wewnątrz fragmentu zakładki rankingu."""
+    # Przeładuj dane po przeliczeniu
+    storage.reload_data()
+    # Tabela kolejki i wiersze typów graczy z cache (przebudowa tylko po zmianie danych)
+    round_leaderboard, df_round_leaderboard, prediction_rows_by_player = get_round_view(
+        selected_season_id, round_id, tuple(selected_players), selected_matches, storage.data_revision
+    )
+
+    if round_leaderboard:
+        round_match_points = storage.get_round_snapshot(round_id).get('match_points', {})
+
+        st.dataframe(
+            df_round_leaderboard,
+            width='stretch',
+            hide_index=True,
+            column_config={'Punkty': st.column_config.BarChartColumn('Punkty per mecz')}
+        )
+        # Forum HT nie wyświetla wykresów - punkty za mecze w formacie tekstowym: 3+7+1+4+8+9=32
+        render_ht_forum_export(
+            f"Ranking kolejki {round_number}",
+            df_round_leaderboard.assign(Punkty=[
+                f"{'+'.join(map(str, match_points))}={total_points}" if match_points and total_points > 0 else "0"
+                for match_points, total_points in zip(df_round_leaderboard['Punkty'], df_round_leaderboard['Suma'])
+            ]),
+            ['Miejsce', 'Gracz', 'Drużyna', 'Punkty', 'Suma', 'Mecze'],
+            key=f"ht_round_table_{selected_season_id}_{round_id}"
+        )
+
+        # Dodaj expandery z typami dla każdego gracza
+        st.markdown("### 📋 Szczegóły typów")
+        for player in round_leaderboard:
+            player_name = player['player_name']
+            types_table_data = prediction_rows_by_player[player_name]
+            match_points_dict = round_match_points.get(player_name, {})
+
+            if types_table_data:
+                with st.expander(f"👤 {player_name} - Typy i wyniki", expanded=True):
+                    df_types = pd.DataFrame(types_table_data, columns=['Mecz', 'Typ', 'Wynik', 'Punkty'])
+                    st.dataframe(df_types, width='stretch', hide_index=True)
+                    # Suma jest już policzona w rankingu kolejki
+                    total_points = player['total_points']
+                    st.caption(f"**Suma punktów: {total_points}**")
+
+                    # Sekcja ręcznej edycji punktów
+                    st.markdown("---")
+                    st.markdown("### ✏️ Ręczna edycja punktów")
+                    st.caption("💡 Możesz ręcznie ustawić punkty dla każdego meczu (w tym ujemne wartości)")
+
+                    # Przygotuj dane do edycji
+                    manual_points_data = {}
+                    for row in types_table_data:
+                        match_id = row['match_id']
+                        home_team = row['home_team']
+                        away_team = row['away_team']
+                        # Aktualne punkty rozwiązane już przy budowie wierszy typów
+                        current_points = row['Punkty']
+
+                        # Sprawdź czy punkty są ręcznie ustawione
+                        is_manual = storage.is_manual_points(round_id, match_id, player_name)
+
+                        col_match, col_points, col_manual = st.columns([3, 2, 1])
+                        with col_match:
+                            st.write(f"**{home_team} vs {away_team}**")
+                        with col_points:
+                            new_points = st.number_input(
+                                "Punkty:",
+                                value=int(current_points),
+                                min_value=None,  # Pozwól na ujemne wartości
+                                max_value=None,
+                                step=1,
+                                key=f"manual_points_{player_name}_{round_id}_{match_id}",
+                                label_visibility="collapsed",
+                                disabled=not season_editable
+                            )
+                            # Zapisz wartość do słownika
+                            manual_points_data[match_id] = new_points
+                        with col_manual:
+                            if is_manual:
+                                st.caption("✏️ Ręczne")
+                            else:
+                                st.caption("🤖 Auto")
+
+                    # Przycisk zapisu wszystkich punktów
+                    if st.button("💾 Zapisz wszystkie punkty", type="primary", key=f"save_all_points_{player_name}_{round_id}", width='stretch', disabled=not season_editable):
+                        saved_count = 0
+                        for match_id, new_points in manual_points_data.items():
+                            # Pobierz aktualne punkty
+                            current_points = None
+                            if str(match_id) in match_points_dict:
+                                current_points = match_points_dict[str(match_id)]
+                            elif match_id in match_points_dict:
+                                current_points = match_points_dict[match_id]
+                            elif str(match_id).isdigit() and int(match_id) in match_points_dict:
+                                current_points = match_points_dict[int(match_id)]
+                            else:
+                                current_points = 0
+
+                            # Zapisz tylko jeśli wartość się zmieniła
+                            if new_points != current_points:
+                                storage.set_manual_points(round_id, match_id, player_name, new_points, season_id=selected_season_id)
+                                saved_count += 1
+
+                        if saved_count > 0:
+                            storage.flush_save()
+                            st.success(f"✅ Zapisano punkty dla {saved_count} meczów")
+                            # NIE odświeżamy - użytkownik może kontynuować pracę
+                        else:
+                            st.info("ℹ️ Brak zmian do zapisania")
+
+                    # Podsumowanie dla logów (wewnątrz bloku gdzie types_table_data jest zdefiniowane)
+                    zero_points_count = sum(1 for row in types_table_data if row['Punkty'] == 0)
+                    matches_with_results = sum(1 for row in types_table_data if row['Wynik'] != '—')
+                    if zero_points_count > 0 and matches_with_results < len(types_table_data):
+                        logger.warning(
+                            "UWAGA: %s w %s: %s meczów ma 0 punktów, ale tylko %s meczów ma wyniki",
+                            player_name, round_id, zero_points_count, matches_with_results
+                        )
+                    # Szczegóły per mecz to tylko ślad diagnostyczny - poziom DEBUG
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "PODSUMOWANIE dla %s w %s: meczów=%d, z wynikami=%d, z 0 punktami=%d, suma=%s",
+                            player_name, round_id, len(types_table_data), matches_with_results, zero_points_count, total_points
+                        )
+                        for row in types_table_data:
+                            logger.debug("    %s: Typ %s, Wynik %s, Punkty %s", row['Mecz'], row['Typ'], row['Wynik'], row['Punkty'])
+
+        # Wykres rankingu per kolejka
+        if len(round_leaderboard) > 0:
+            fig = get_ranking_bar_figure(df_round_leaderboard.head(10)[['Gracz', 'Suma']], f"Top 10 - Ranking kolejki {round_number}", 'viridis')
+            st.plotly_chart(fig, use_container_width=True, key=f"ranking_round_{round_number}_chart")
+    else:
+        st.info("📊 Brak danych do wyświetlenia dla tej kolejki")
+
+
+@st.fragment
+def render_round_ranking_tab(
+    storage: TipperStorage,
+    selected_season_id: str,
+    filtered_rounds: List,
+    round_options: List[str],
+    date_to_round_number: Dict[str, int],
+    default_round_idx: int,
+    selected_players: List[str],
+    season_editable: bool
+):
+    """Renderuje wybór rundy i ranking kolejki jako fragment - zmiana rundy nie przebudowuje reszty strony."""
+    # Wybór rundy - pod Rankingiem
+    st.markdown("---")
+    st.subheader("📅 Wybór rundy")
+
+    selected_round = render_round_selector(
+        storage, selected_season_id, filtered_rounds, round_options,
+        date_to_round_number, default_round_idx, "ranking_round_select"
+    )
+
+    if selected_round is not None:
+        selected_round_date, selected_matches, round_number, round_id = selected_round
+
+        # Ranking dla wybranej rundy
+        # Przeładuj dane przed pobraniem rankingu, aby mieć aktualne punkty
+        storage.reload_data()
+        round_data = storage.get_round_snapshot(round_id)
+        round_matches = round_data.get('matches', [])
+
+        # Teraz przelicz punkty dla wszystkich meczów z wynikami
+        round_predictions = round_data.get('predictions', {})
+        match_points_dict = round_data.get('match_points', {})
+
+        # Sprawdź każdy mecz i przelicz punkty jeśli ma wynik, ale brakuje punktów
+        pending_results = []
+        for match in round_matches:
+            match_id = str(match.get('match_id', ''))
+            home_goals = match.get('home_goals')
+            away_goals = match.get('away_goals')
+
+            # Jeśli mecz ma wynik, sprawdź czy są punkty dla wszystkich graczy z typami
+            if home_goals is not None and away_goals is not None:
+                # Sprawdź czy wszyscy gracze z typami mają punkty
+                needs_recalculation = False
+                players_with_predictions = 0
+                players_with_points = 0
+
+                for player_name, player_predictions in round_predictions.items():
+                    # Sprawdź czy gracz ma typ dla tego meczu
+                    has_prediction = (match_id in player_predictions or 
+                                    str(match_id) in player_predictions or
+                                    (match_id.isdigit() and int(match_id) in player_predictions))
+
+                    if has_prediction:
+                        players_with_predictions += 1
+                        # Sprawdź czy gracz ma punkty dla tego meczu
+                        player_points = match_points_dict.get(player_name, {})
+                        has_points = (match_id in player_points or 
+                                    str(match_id) in player_points or
+                                    (match_id.isdigit() and int(match_id) in player_points))
+
+                        if has_points:
+                            players_with_points += 1
+                        else:
+                            needs_recalculation = True
+
+                # Jeśli brakuje punktów, przelicz je
+                if needs_recalculation or (players_with_predictions > 0 and players_with_points < players_with_predictions):
+                    logger.info("[Ranking per kolejka] Automatyczne przeliczanie punktów dla meczu %s w rundzie %s (graczy z typami: %s, z punktami: %s)", match_id, round_id, players_with_predictions, players_with_points)
+                    pending_results.append((match_id, int(home_goals), int(away_goals)))
+
+        # Wszystkie brakujące punkty przeliczane razem - jedno przeliczenie sum i jeden zapis
+        if pending_results:
+            storage.update_match_results_bulk(round_id, pending_results, season_id=selected_season_id)
+
+        # Ranking kolejki (tabela, szczegóły typów, wykres)
+        render_round_ranking(
+            storage,
+            round_id,
+            round_number,
+            selected_matches,
+            selected_players,
+            selected_season_id,
+            season_editable
+        )
+
+
 def main():
     """Główna funkcja aplikacji typera"""
     # Sprawdź autentykację
@@ -362,53 +1072,24 @@ def main():
     
     st.title("🎯 Hattrick Typer")
     
-    # Automatyczne wykrywanie sezonów z plików JSON
-    def get_available_seasons():
-        """Skanuje katalog w poszukiwaniu plików tipper_data_season_*.json i zwraca listę sezonów"""
-        import glob
-        import re
-        
-        seasons = []
-        
-        # Szukaj plików tipper_data_season_*.json
-        pattern = os.path.join(os.getcwd(), "tipper_data_season_*.json")
-        files = glob.glob(pattern)
-        
-        # Wyciągnij numery sezonów z nazw plików
-        for file_path in files:
-            filename = os.path.basename(file_path)
-            match = re.search(r'tipper_data_season_(\d+)\.json', filename)
-            if match:
-                season_num = int(match.group(1))
-                seasons.append(season_num)
-        
-        # Sortuj malejąco (najnowszy pierwszy)
-        seasons.sort(reverse=True)
-        
-        # Zwróć jako listę stringów "season_XX"
-        return [f"season_{s}" for s in seasons]
-    
-    # Pobierz dostępne sezony
-    available_seasons = get_available_seasons()
+    # Pobierz dostępne sezony (skan katalogu tylko po zmianie jego zawartości)
+    data_dir = os.getcwd()
+    available_seasons = get_available_seasons(data_dir, os.stat(data_dir).st_mtime_ns)
     
     # Jeśli nie znaleziono żadnych sezonów, użyj domyślnych
     if not available_seasons:
         available_seasons = ["current_season"]
         current_season_id = "current_season"
     else:
-        # Najwyższy numer sezonu to current_season
-        current_season_num = max([int(s.replace("season_", "")) for s in available_seasons])
-        current_season_id = f"season_{current_season_num}"
+        # Najwyższy numer sezonu to current_season (lista jest już posortowana malejąco)
+        current_season_id = available_seasons[0]
     
-    # Przygotuj opcje dla dropdown (current_season + dostępne sezony)
-    season_options = [current_season_id] + [s for s in available_seasons if s != current_season_id]
-    season_display = []
-    for s in season_options:
-        if s == current_season_id:
-            season_display.append(f"Sezon {current_season_num} (obecny)")
-        else:
-            season_num = s.replace("season_", "")
-            season_display.append(f"Sezon {season_num}")
+    # Przygotuj opcje dla dropdown (current_season jest już pierwszy na liście)
+    season_options = available_seasons
+    season_display = [
+        f"Sezon {season_id.removeprefix('season_')}" + (" (obecny)" if season_id == current_season_id else "")
+        for season_id in season_options
+    ]
     
     # Domyślnie wybierz current_season (pierwszy w liście)
     default_season_idx = 0
@@ -447,10 +1128,13 @@ def main():
                 # Jeśli zaznaczono kopiowanie graczy, skopiuj ich z poprzedniego sezonu
                 if copy_players and available_seasons:
                     # Znajdź poprzedni sezon (najwyższy numer przed nowym)
-                    # available_seasons to lista stringów "season_XX", więc konwertuj na numery
-                    previous_seasons = [int(s.replace("season_", "")) for s in available_seasons if int(s.replace("season_", "")) < new_season_num]
-                    if previous_seasons:
-                        previous_season_num = max(previous_seasons)
+                    # available_seasons jest posortowana malejąco, więc pierwszy mniejszy numer jest poprzednim sezonem
+                    season_nums = (season_id.removeprefix("season_") for season_id in available_seasons)
+                    previous_season_num = next(
+                        (int(num) for num in season_nums if num.isdigit() and int(num) < new_season_num),
+                        None
+                    )
+                    if previous_season_num is not None:
                         previous_season_id = f"season_{previous_season_num}"
                         
                         # Załaduj poprzedni sezon i skopiuj graczy
@@ -507,91 +1191,16 @@ def main():
         if season_read_only_reason:
             st.info(f"🔒 {season_read_only_reason}")
         
-        # ID lig dla typera - per sezon (dynamiczna lista)
-        st.subheader(f"🏆 Ligi typera (Sezon {selected_season_id.replace('season_', '')})")
-        
-        # Pobierz zapisane ligi dla wybranego sezonu
-        saved_leagues = storage.get_selected_leagues(season_id=selected_season_id)
-        
-        # Jeśli nie ma zapisanych lig, użyj domyślnych
-        if not saved_leagues:
-            saved_leagues = [32612, 9399]
-        
-        # Inicjalizuj session_state dla lig (jeśli nie istnieje)
-        leagues_key = f"leagues_list_{selected_season_id}"
-        if leagues_key not in st.session_state:
-            st.session_state[leagues_key] = saved_leagues.copy()
-        
-        # Wyświetl listę lig z możliwością edycji
-        st.markdown("**Lista lig:**")
-        leagues_to_remove = []
-        
-        for idx, league_id in enumerate(st.session_state[leagues_key]):
-            col_league, col_remove = st.columns([4, 1])
-            with col_league:
-                new_league_id = st.number_input(
-                    f"Liga {idx + 1} (LeagueLevelUnitID):",
-                    value=league_id,
-                    min_value=1,
-                    key=f"league_{selected_season_id}_{idx}",
-                    label_visibility="collapsed",
-                    disabled=not season_editable
-                )
-                stored_league = storage.data.get('leagues', {}).get(str(new_league_id), {})
-                stored_league_name = stored_league.get('name')
-                if stored_league_name:
-                    league_name_label = stored_league_name
-                else:
-                    league_name_label = safe_get_league_name_from_storage_or_api(storage, new_league_id)
-
-                st.caption(f"Liga {idx + 1}: {new_league_id} | {league_name_label}")
-                # Aktualizuj wartość w session_state
-                st.session_state[leagues_key][idx] = new_league_id
-            with col_remove:
-                if st.button("🗑️", key=f"remove_league_{selected_season_id}_{idx}", help="Usuń ligę", disabled=not season_editable):
-                    leagues_to_remove.append(idx)
-        
-        # Usuń zaznaczone ligi (od końca, aby nie zmieniać indeksów)
-        for idx in sorted(leagues_to_remove, reverse=True):
-            st.session_state[leagues_key].pop(idx)
-            st.rerun()
-        
-        # Przycisk dodawania nowej ligi
-        col_add, col_save = st.columns(2)
-        with col_add:
-            if st.button("➕ Dodaj ligę", key=f"add_league_{selected_season_id}", width='stretch', disabled=not season_editable):
-                # Dodaj domyślną ligę (najwyższe ID + 1 lub 1)
-                if st.session_state[leagues_key]:
-                    new_league_id = max(st.session_state[leagues_key]) + 1
-                else:
-                    new_league_id = 32612
-                st.session_state[leagues_key].append(new_league_id)
-                st.rerun()
-        
-        with col_save:
-            # Przycisk zapisu lig
-            if st.button("💾 Zapisz ligi", type="primary", key=f"save_leagues_{selected_season_id}", width='stretch', disabled=not season_editable):
-                TIPPER_LEAGUES = st.session_state[leagues_key].copy()
-                for league_id in TIPPER_LEAGUES:
-                    league_name = safe_get_league_name_from_storage_or_api(storage, league_id)
-                    storage.add_league(league_id, league_name)
-                storage.set_selected_leagues(TIPPER_LEAGUES, season_id=selected_season_id)
-                storage.flush_save()  # Wymuś natychmiastowy zapis przed rerun
-                st.success(f"✅ Zapisano {len(TIPPER_LEAGUES)} lig dla sezonu {selected_season_id.replace('season_', '')}")
-                st.rerun()
+        # ID lig dla typera - per sezon (dynamiczna lista); edycja w osobnym fragmencie
+        render_league_editor(storage, selected_season_id, season_editable)
         
         # Użyj aktualnej listy lig
-        TIPPER_LEAGUES = st.session_state[leagues_key].copy()
-        
-        # Informacje o zapisanych ligach
-        if saved_leagues:
-            st.info(f"**Zapisane ligi:** {', '.join(map(str, saved_leagues))}")
+        TIPPER_LEAGUES = st.session_state[f"leagues_list_{selected_season_id}"].copy()
         
         st.markdown("---")
         
         # Status archiwalny sezonu
         st.subheader(f"📦 Status sezonu (Sezon {selected_season_id.replace('season_', '')})")
-        is_archived = storage.is_season_archived(season_id=selected_season_id)
         
         archived_status = st.checkbox(
             "Oznacz jako archiwalny",
@@ -647,16 +1256,7 @@ def main():
         # Storage jest już utworzony w głównym widoku - użyj go
         
         # Eksport danych
-        if st.button("📥 Pobierz backup danych", width='stretch', help="Pobierz aktualny plik tipper_data.json"):
-            import json
-            data_str = json.dumps(storage.data, ensure_ascii=False, indent=2)
-            st.download_button(
-                label="⬇️ Pobierz plik JSON",
-                data=data_str,
-                file_name="tipper_data.json",
-                mime="application/json",
-                width='stretch'
-            )
+        render_data_export(storage)
         
         # Import danych
         with st.expander("📤 Import danych z pliku", expanded=False):
@@ -670,13 +1270,11 @@ def main():
             
             if uploaded_file is not None:
                 try:
-                    # Wczytaj dane z pliku
-                    import json
-                    uploaded_data = json.load(uploaded_file)
+                    # Wczytaj dane z pliku (bufor już w pamięci - bez czytania strumienia fragmentami)
+                    uploaded_data = json.loads(uploaded_file.getvalue())
                     
                     # Walidacja struktury danych
-                    required_keys = ['players', 'rounds', 'seasons', 'leagues', 'settings']
-                    if all(key in uploaded_data for key in required_keys):
+                    if isinstance(uploaded_data, dict) and IMPORT_REQUIRED_KEYS.issubset(uploaded_data.keys()):
                         st.success("✅ Plik został poprawnie wczytany!")
                         
                         # Pokaż podsumowanie danych
@@ -687,12 +1285,8 @@ def main():
                         
                         # Przycisk importu
                         if st.button("💾 Zaimportuj dane", type="primary", width='stretch', disabled=not season_editable):
-                            # Zrób backup przed importem
-                            backup_data = storage.data.copy()
-                            
-                            # Zaimportuj dane
-                            storage.data = uploaded_data
-                            storage._save_data()
+                            # Zaimportuj dane (zapis atomowy - przy błędzie plik na dysku pozostaje w poprzedniej wersji)
+                            storage.replace_data(uploaded_data)
                             
                             st.success("✅ Dane zostały zaimportowane pomyślnie!")
                             st.info("🔄 Odśwież stronę aby zobaczyć zmiany")
@@ -709,25 +1303,20 @@ def main():
     
     # Pobierz dane z API
     try:
-        load_dotenv()
-        
-        # Pobierz klucze OAuth z zmiennych środowiskowych
-        consumer_key = os.getenv('HATTRICK_CONSUMER_KEY')
-        consumer_secret = os.getenv('HATTRICK_CONSUMER_SECRET')
-        access_token = os.getenv('HATTRICK_ACCESS_TOKEN')
-        access_token_secret = os.getenv('HATTRICK_ACCESS_TOKEN_SECRET')
-        
-        if not all([consumer_key, consumer_secret, access_token, access_token_secret]):
+        # Klucze OAuth rozwiązywane raz na proces (bez ponownego czytania .env przy każdym rerun)
+        oauth_credentials = get_oauth_credentials()
+        if not oauth_credentials:
             st.error("❌ Brak kluczy OAuth. Uruchom: python get_oauth_simple.py")
             st.info("💡 Aby uzyskać klucze OAuth, uruchom skrypt `get_oauth_simple.py`")
             return
+        consumer_key, consumer_secret, access_token, access_token_secret = oauth_credentials
         
         # Wczytaj zapisany wybór drużyn przed rozgałęzieniem na sezon archiwalny/bieżący.
         # Dzięki temu dalsza część widoku zawsze ma zainicjalizowaną zmienną.
         selected_teams = storage.get_selected_teams(season_id=selected_season_id)
 
         # Sprawdź czy sezon jest archiwalny
-        is_archived = storage.is_season_archived(season_id=selected_season_id)
+        is_archived = is_selected_season_archived
         
         # Dla archiwalnych sezonów nie pobieramy danych z API - używamy tylko danych z pliku
         if is_archived:
@@ -739,21 +1328,11 @@ def main():
                     matches = round_data.get('matches', [])
                     all_fixtures.extend(matches)
             
-            # Sprawdź czy są gracze z wynikami - bezpośrednio z danych
-            has_players_with_scores = False
-            players_data_check = {}
-            
-            # Sprawdź w strukturze sezonu
-            if selected_season_id in storage.data.get('seasons', {}):
-                season_data = storage.data['seasons'][selected_season_id]
-                if 'players' in season_data and season_data['players']:
-                    players_data_check = season_data['players']
-            
-            # Sprawdź czy są gracze z wynikami
-            for player_name, player_data in players_data_check.items():
-                if player_data.get('total_points', 0) > 0:
-                    has_players_with_scores = True
-                    break
+            # Sprawdź czy są gracze z wynikami - bezpośrednio ze struktury sezonu (any() przerywa na pierwszym)
+            players_data_check = storage.data.get('seasons', {}).get(selected_season_id, {}).get('players') or {}
+            has_players_with_scores = any(
+                player_data.get('total_points', 0) > 0 for player_data in players_data_check.values()
+            )
             
             # Jeśli nie ma meczów, ale są gracze z wynikami - wyświetl tylko ranking
             if not all_fixtures and has_players_with_scores:
@@ -863,34 +1442,14 @@ def main():
                 return
             
             # Pobierz wszystkie unikalne nazwy drużyn z meczów
-            all_team_names = set()
-            for fixture in all_fixtures:
-                home_team = fixture.get('home_team_name', '').strip()
-                away_team = fixture.get('away_team_name', '').strip()
-                if home_team:
-                    all_team_names.add(home_team)
-                if away_team:
-                    all_team_names.add(away_team)
-            
-            all_team_names = sorted(list(all_team_names))
+            all_team_names = collect_team_names(all_fixtures)
             team_metadata = storage.get_team_metadata(season_id=selected_season_id)
             
             # Grupuj mecze według rund (na podstawie daty)
-            rounds = defaultdict(list)
-            
-            for fixture in all_fixtures:
-                match_date = fixture.get('match_date')
-                if match_date:
-                    try:
-                        # Parsuj datę i utwórz klucz rundy (np. "2024-10-26")
-                        dt = datetime.strptime(match_date, "%Y-%m-%d %H:%M:%S")
-                        round_key = dt.strftime("%Y-%m-%d")
-                        rounds[round_key].append(fixture)
-                    except ValueError:
-                        continue
+            rounds = group_matches_by_round_date(all_fixtures)
             
             # Sortuj rundy po dacie (najstarsza pierwsza) dla numeracji
-            sorted_rounds_asc = sorted(rounds.items(), key=lambda x: x[0])
+            sorted_rounds_asc = sorted(rounds.items())  # Klucze ISO (YYYY-MM-DD) są unikalne - sortowanie leksykalne = chronologiczne
             
             # Jeśli nie ma meczów, ale są gracze - już obsłużyliśmy to wyżej
             if not sorted_rounds_asc:
@@ -900,22 +1459,35 @@ def main():
             # Dla niearchiwalnych sezonów pobieramy dane z API
             # Pobierz mecze z obu lig
             all_fixtures = []
+            def fetch_league_fixtures(league_id):
+                # Wątek roboczy nie może rysować widgetów - błąd zwracamy do wątku głównego
+                try:
+                    return league_id, get_cached_league_fixtures(
+                        consumer_key,
+                        consumer_secret,
+                        access_token,
+                        access_token_secret,
+                        league_id
+                    ), None
+                except Exception as e:
+                    return league_id, None, e
+
             with st.spinner("Pobieranie meczów z lig..."):
-                for league_id in TIPPER_LEAGUES:
-                    try:
-                        fixtures = get_cached_league_fixtures(
-                            consumer_key,
-                            consumer_secret,
-                            access_token,
-                            access_token_secret,
-                            league_id
-                        )
-                        if fixtures:
-                            all_fixtures.extend(fixtures)
-                            logger.info(f"Pobrano {len(fixtures)} meczów z ligi {league_id}")
-                    except Exception as e:
-                        logger.error(f"Błąd pobierania meczów z ligi {league_id}: {e}")
-                        st.warning(f"⚠️ Nie udało się pobrać meczów z ligi {league_id}: {e}")
+                # Ligi pobierane równolegle - czas oczekiwania ~1 RTT zamiast N × RTT;
+                # wątki robocze dostają kontekst przebiegu, bo korzystają z st.cache_data
+                with ThreadPoolExecutor(
+                    max_workers=max(2, min(len(TIPPER_LEAGUES), MAX_FIXTURE_FETCH_WORKERS)),
+                    initializer=add_script_run_ctx,
+                    initargs=(None, get_script_run_ctx())
+                ) as executor:
+                    fetch_results = list(executor.map(fetch_league_fixtures, TIPPER_LEAGUES))
+                for league_id, fixtures, error in fetch_results:
+                    if error is not None:
+                        logger.error("Błąd pobierania meczów z ligi %s: %s", league_id, error)
+                        st.warning(f"⚠️ Nie udało się pobrać meczów z ligi {league_id}: {error}")
+                    elif fixtures:
+                        all_fixtures.extend(fixtures)
+                        logger.debug("Pobrano %s meczów z ligi %s", len(fixtures), league_id)
             
             if not all_fixtures:
                 # Całkowita awaria API: jeśli mamy zapisane rundy tego sezonu,
@@ -930,58 +1502,37 @@ def main():
                 st.warning("⚠️ Nie udało się pobrać meczów z API - pokazuję zapisane kolejki")
 
             # Grupuj mecze według rund (na podstawie daty)
-            rounds = defaultdict(list)
-            
-            for fixture in all_fixtures:
-                match_date = fixture.get('match_date')
-                if match_date:
-                    try:
-                        # Parsuj datę i utwórz klucz rundy (np. "2024-10-26")
-                        dt = datetime.strptime(match_date, "%Y-%m-%d %H:%M:%S")
-                        round_key = dt.strftime("%Y-%m-%d")
-                        rounds[round_key].append(fixture)
-                    except ValueError:
-                        continue
+            rounds = group_matches_by_round_date(all_fixtures)
 
             # Fallback: dołącz zapisane rundy tego sezonu, których API teraz nie zwróciło.
             # Chroni przed znikaniem (i przenumerowaniem) kolejek przy chwilowej awarii
             # lub niepełnej odpowiedzi API. Nie nadpisujemy dat, które API zwróciło -
             # dla nich zostawiamy świeższe dane z API (zawierają aktualne wyniki).
-            api_dates = set(rounds.keys())
-            for round_data in storage.data.get('rounds', {}).values():
+            # Rundy zapisywane są jako round_<data>, więc klucz daty bierzemy z ID rundy bez ponownego parsowania dat meczów
+            api_round_keys = frozenset(rounds)
+            unkeyed_stored_matches = []
+            for stored_round_id, round_data in storage.data.get('rounds', {}).items():
                 if round_data.get('season_id') != selected_season_id:
                     continue
-                for match in round_data.get('matches', []):
-                    match_date = match.get('match_date')
-                    if not match_date:
-                        continue
-                    try:
-                        dt = datetime.strptime(match_date, "%Y-%m-%d %H:%M:%S")
-                        round_key = dt.strftime("%Y-%m-%d")
-                    except ValueError:
-                        continue
-                    if round_key not in api_dates:
-                        rounds[round_key].append(match)
+                round_key = stored_round_id.removeprefix('round_')
+                if ROUND_DATE_KEY_PATTERN.fullmatch(round_key):
+                    if round_key not in api_round_keys:
+                        rounds[round_key].extend(round_data.get('matches', []))
+                else:
+                    unkeyed_stored_matches.extend(round_data.get('matches', []))
+            group_matches_by_round_date(unkeyed_stored_matches, rounds, skip_round_keys=api_round_keys)
 
             # Sortuj rundy po dacie (najstarsza pierwsza) dla numeracji
-            sorted_rounds_asc = sorted(rounds.items(), key=lambda x: x[0])
+            sorted_rounds_asc = sorted(rounds.items())  # Klucze ISO (YYYY-MM-DD) są unikalne - sortowanie leksykalne = chronologiczne
 
             if not sorted_rounds_asc:
                 st.warning("⚠️ Brak meczów do wyświetlenia")
                 return
             
             # Pobierz wszystkie unikalne nazwy drużyn z meczów
-            all_team_names = set()
-            for _, matches in sorted_rounds_asc:
-                for match in matches:
-                    home_team = match.get('home_team_name', '').strip()
-                    away_team = match.get('away_team_name', '').strip()
-                    if home_team:
-                        all_team_names.add(home_team)
-                    if away_team:
-                        all_team_names.add(away_team)
-            
-            all_team_names = sorted(list(all_team_names))
+            all_team_names = collect_team_names(
+                match for _, matches in sorted_rounds_asc for match in matches
+            )
             
             # Przeładuj dane z pliku (aby mieć aktualne dane po restarcie)
             storage.reload_data()
@@ -990,23 +1541,7 @@ def main():
             team_metadata = storage.get_team_metadata(season_id=selected_season_id)
 
             season_leagues = storage.get_selected_leagues(season_id=selected_season_id) or TIPPER_LEAGUES
-            league_names = {}
-
-            for league_id in season_leagues:
-                stored_league = storage.data.get('leagues', {}).get(str(league_id), {})
-                stored_name = stored_league.get('name')
-
-                if stored_name:
-                    league_names[league_id] = stored_name
-                else:
-                    league_names[league_id] = get_cached_league_name(
-                        consumer_key,
-                        consumer_secret,
-                        access_token,
-                        access_token_secret,
-                        league_id
-                    )
-                    storage.add_league(league_id, league_names[league_id])
+            league_names = get_league_names_map(storage, season_leagues)
 
             current_team_metadata = build_team_metadata_from_fixtures(all_fixtures, league_names)
             if current_team_metadata:
@@ -1020,33 +1555,37 @@ def main():
         if not selected_teams:
             selected_teams = all_team_names.copy()
 
-        team_labels = {}
-        for team_name in all_team_names:
-            team_labels[team_name] = team_metadata.get(team_name, {}).get('label', team_name)
-        
         # Wybór drużyn do typowania - w sidebarze
         with st.sidebar:
             st.markdown("---")
             st.subheader(f"⚙️ Wybór drużyn do typowania (Sezon {selected_season_id.replace('season_', '')})")
             st.markdown("*Zaznacz drużyny, które chcesz uwzględnić w typerze*")
             
-            # Użyj checkboxów dla wyboru drużyn
-            new_selected_teams = []
-            
-            for team_name in all_team_names:
-                if st.checkbox(
-                    team_labels.get(team_name, team_name),
-                    value=team_name in selected_teams,
-                    key=f"team_select_{selected_season_id}_{team_name}",
-                    disabled=not season_editable
-                ):
-                    new_selected_teams.append(team_name)
+            # Jedna tabela z kolumną wyboru zamiast osobnego checkboxa dla każdej drużyny
+            saved_selected_teams_set = frozenset(selected_teams)
+            team_editor_key = f"team_editor_{selected_season_id}"
+            teams_df = pd.DataFrame({
+                'Drużyna': all_team_names,
+                'Liga': [', '.join(team_metadata.get(team_name, {}).get('league_names', [])) for team_name in all_team_names],
+                'Wybrana': [team_name in saved_selected_teams_set for team_name in all_team_names]
+            })
+            edited_teams_df = st.data_editor(
+                teams_df,
+                key=team_editor_key,
+                hide_index=True,
+                width='stretch',
+                disabled=['Drużyna', 'Liga'] if season_editable else True,
+                column_config={'Wybrana': st.column_config.CheckboxColumn("✔")}
+            )
+            new_selected_teams = edited_teams_df.loc[edited_teams_df['Wybrana'], 'Drużyna'].tolist()
             
             # Przycisk zapisu ustawień
             if st.button("💾 Zapisz wybór drużyn", type="primary", width='stretch', disabled=not season_editable):
                 teams_to_save = new_selected_teams if new_selected_teams else all_team_names
                 storage.set_selected_teams(teams_to_save, season_id=selected_season_id)
                 storage.flush_save()  # Wymuś natychmiastowy zapis przed rerun
+                # Edycje tabeli są względne do zapisanego wyboru - po zapisie zaczynamy od czystego stanu
+                st.session_state.pop(team_editor_key, None)
                 st.success(f"✅ Zapisano wybór {len(teams_to_save)} drużyn dla sezonu {selected_season_id.replace('season_', '')}")
                 st.rerun()
             
@@ -1082,29 +1621,24 @@ def main():
 
             selected_players = new_selected_players if new_selected_players else saved_selected_players
         
-        # Filtruj mecze - tylko te, w których uczestniczą wybrane drużyny
-        def filter_matches_by_teams(matches: List[Dict], team_names: List[str]) -> List[Dict]:
-            """Filtruje mecze, pozostawiając tylko te z wybranymi drużynami"""
-            if not team_names:
-                return matches  # Jeśli nie wybrano drużyn, zwróć wszystkie
-            
-            filtered = []
-            for match in matches:
-                home_team = match.get('home_team_name', '').strip()
-                away_team = match.get('away_team_name', '').strip()
-                
-                # Mecz jest uwzględniony, jeśli przynajmniej jedna drużyna jest wybrana
-                if home_team in team_names or away_team in team_names:
-                    filtered.append(match)
-            
-            return filtered
-        
-        # Filtruj rundy (według daty asc dla numeracji)
+        # Filtruj rundy (według daty asc dla numeracji) - tylko mecze, w których uczestniczy wybrana drużyna.
+        # Każdy mecz sprawdzany raz względem zbioru; bez wybranych drużyn zostają wszystkie mecze.
+        selected_teams_set = frozenset(selected_teams)
         filtered_rounds_asc = []
+        round_has_results = {}
         for date, matches in sorted_rounds_asc:
-            filtered_matches = filter_matches_by_teams(matches, selected_teams)
-            if filtered_matches:  # Tylko jeśli są jakieś mecze po filtrowaniu
-                filtered_rounds_asc.append((date, filtered_matches))
+            if selected_teams_set:
+                matches = [
+                    match for match in matches
+                    if (match.get('home_team_name') or '').strip() in selected_teams_set
+                    or (match.get('away_team_name') or '').strip() in selected_teams_set
+                ]
+            if matches:  # Tylko jeśli są jakieś mecze po filtrowaniu
+                filtered_rounds_asc.append((date, matches))
+                # Flaga "kolejka ma rozegrane mecze" liczona raz przy budowie listy rund
+                round_has_results[date] = any(
+                    m.get('home_goals') is not None and m.get('away_goals') is not None for m in matches
+                )
         
         if not filtered_rounds_asc:
             st.warning(f"⚠️ Brak meczów dla wybranych drużyn ({len(selected_teams)} drużyn)")
@@ -1112,12 +1646,23 @@ def main():
             return
         
         # Stwórz mapę data -> numer kolejki (według daty asc: najstarsza = 1)
-        date_to_round_number = {}
-        for idx, (date, _) in enumerate(filtered_rounds_asc, 1):
-            date_to_round_number[date] = idx  # Numer 1 = najstarsza
+        date_to_round_number = {date: idx for idx, (date, _) in enumerate(filtered_rounds_asc, 1)}  # Numer 1 = najstarsza
+        
+        # Kolejność desc (najnowsza pierwsza) dla wyświetlania - odwrócenie listy asc zamiast ponownego sortowania
+        filtered_rounds = filtered_rounds_asc[::-1]
         
-        # Sortuj rundy po dacie desc (najnowsza pierwsza) dla wyświetlania
-        filtered_rounds = sorted(filtered_rounds_asc, key=lambda x: x[0], reverse=True)
+        # Etykiety kolejek liczone raz na przebieg - wspólne dla rankingu i wprowadzania typów
+        # Numeruj kolejki według daty asc (numer 1 = najstarsza), ale wyświetlaj sort desc (najnowsza pierwsza)
+        # Lista desc to odwrócona lista asc - numer kolejki wynika z pozycji, bez słownika na każdej iteracji
+        rounds_count = len(filtered_rounds)
+        round_options = [
+            f"Kolejka {rounds_count - idx} - {date} ({len(matches)} meczów)"
+            for idx, (date, matches) in enumerate(filtered_rounds)
+        ]
+        
+        # Sygnatura "czy kolejka ma rozegrane mecze" z flag policzonych przy filtrowaniu - domyślna kolejka z cache
+        round_played_flags = tuple(round_has_results[date] for date, _ in filtered_rounds)
+        default_unplayed_round_idx = get_default_round_idx(round_played_flags)
         
         # Ranking - na samą górę
         st.markdown("---")
@@ -1132,43 +1677,12 @@ def main():
             
             exclude_worst = get_exclude_worst_setting(selected_season_id)
             # Przelicz punkty przed pobraniem rankingu (aby mieć aktualne dane)
-            storage._recalculate_player_totals(season_id=selected_season_id)
-            leaderboard = storage.get_leaderboard(exclude_worst=exclude_worst, season_id=selected_season_id)
+            storage.recalculate_totals_and_save(season_id=selected_season_id)
+            leaderboard = get_cached_leaderboard(selected_season_id, exclude_worst, storage.data_revision)
             leaderboard = [player for player in leaderboard if player['player_name'] in selected_players]
             
             if leaderboard:
-                # Przygotuj dane do wyświetlenia
-                leaderboard_data = []
-                for idx, player in enumerate(leaderboard, 1):
-                    # Formatuj punkty z każdej kolejki: 26 + 37 + 32 + ... = 393 - 23
-                    round_points = player.get('round_points', [])
-                    original_total = player.get('original_total', player['total_points'])
-                    
-                    if round_points:
-                        # Formatuj punkty: 26 + 37 + 32 + ...
-                        points_str = ' + '.join(str(p) for p in round_points)
-                        
-                        # Dodaj sumę i odjęcie najgorszego jeśli włączone
-                        if exclude_worst and player['excluded_worst']:
-                            worst = player['worst_score']
-                            points_summary = f"{points_str} = {original_total} - {worst}"
-                        else:
-                            points_summary = f"{points_str} = {original_total}"
-                    else:
-                        points_summary = str(player['total_points'])
-                    
-                    leaderboard_data.append({
-                        'Miejsce': idx,
-                        'Gracz': player['player_name'],
-                        'Drużyna': player.get('team_name') or '—',
-                        'Punkty': points_summary,
-                        'Suma': player['total_points'],
-                        'Rundy': player['rounds_played'],
-                        'Najlepszy': player['best_score'],
-                        'Najgorszy': player['worst_score'] if not player['excluded_worst'] else f"{player['worst_score']} (odrzucony)"
-                    })
-                
-                df_leaderboard = pd.DataFrame(leaderboard_data)
+                df_leaderboard = build_leaderboard_dataframe(leaderboard, exclude_worst)
                 st.dataframe(df_leaderboard, width='stretch', hide_index=True)
                 render_ht_forum_export(
                     "Ranking całości",
@@ -1179,33 +1693,20 @@ def main():
                 
                 # Wykres rankingu całości
                 if len(leaderboard) > 0:
-                    fig = px.bar(
-                        df_leaderboard.head(10),
-                        x='Gracz',
-                        y='Suma',
-                        title="Top 10 - Ranking całości",
-                        labels={'Suma': 'Punkty', 'Gracz': 'Gracz'},
-                        color='Suma',
-                        color_continuous_scale='plasma'
-                    )
-                    fig.update_layout(xaxis_tickangle=-45, height=400)
+                    fig = get_ranking_bar_figure(df_leaderboard.head(10)[['Gracz', 'Suma']], "Top 10 - Ranking całości", 'plasma')
                     st.plotly_chart(fig, use_container_width=True, key="ranking_overall_chart_main")
                     
-                    # Statystyki
+                    # Statystyki z jednej agregacji gotowego DataFrame rankingu
+                    ranking_stats = df_leaderboard[['Suma', 'Rundy']].agg(['sum', 'mean', 'max'])
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
-                        st.metric("Liczba graczy", len(leaderboard))
+                        st.metric("Liczba graczy", len(df_leaderboard))
                     with col2:
-                        if leaderboard:
-                            st.metric("Najwięcej punktów", leaderboard[0]['total_points'])
+                        st.metric("Najwięcej punktów", int(ranking_stats.at['max', 'Suma']))
                     with col3:
-                        if leaderboard:
-                            avg_points = sum(p['total_points'] for p in leaderboard) / len(leaderboard)
-                            st.metric("Średnia punktów", f"{avg_points:.1f}")
+                        st.metric("Średnia punktów", f"{ranking_stats.at['mean', 'Suma']:.1f}")
                     with col4:
-                        if leaderboard:
-                            total_rounds = sum(p['rounds_played'] for p in leaderboard)
-                            st.metric("Łącznie rund", total_rounds)
+                        st.metric("Łącznie rund", int(ranking_stats.at['sum', 'Rundy']))
             else:
                 st.info("📊 Brak danych do wyświetlenia")
         
@@ -1213,437 +1714,10 @@ def main():
         with ranking_tab2:
             st.markdown("### 📊 Ranking per kolejka")
             
-            # Wybór rundy - pod Rankingiem
-            st.markdown("---")
-            st.subheader("📅 Wybór rundy")
-            
-            # Znajdź pierwszą nie rozegraną kolejkę (najstarszą nie rozegraną - domyślnie po zalogowaniu)
-            default_round_idx = 0
-            # Przeszukaj od końca (od najstarszej do najnowszej), aby znaleźć najstarszą nie rozegraną
-            for idx in range(len(filtered_rounds) - 1, -1, -1):
-                date, matches = filtered_rounds[idx]
-                # Sprawdź czy kolejka ma rozegrane mecze
-                has_played = any(m.get('home_goals') is not None and m.get('away_goals') is not None for m in matches)
-                if not has_played:
-                    default_round_idx = idx
-                    break  # Weź najstarszą nie rozegraną kolejkę
-            
-            # Sprawdź czy jest zapisany wybór rundy w session_state
-            if 'selected_round_idx' in st.session_state:
-                default_round_idx = st.session_state.selected_round_idx
-            
-            # Numeruj kolejki według daty asc (numer 1 = najstarsza), ale wyświetlaj sort desc (najnowsza pierwsza)
-            round_options = []
-            for date, matches in filtered_rounds:
-                round_number = date_to_round_number[date]  # Numer według daty asc
-                round_options.append(f"Kolejka {round_number} - {date} ({len(matches)} meczów)")
-            
-            selected_round_idx = st.selectbox("Wybierz rundę:", range(len(round_options)), index=default_round_idx, format_func=lambda x: round_options[x], key="ranking_round_select")
-            
-            # Zapisz wybór rundy w session_state
-            st.session_state.selected_round_idx = selected_round_idx
-            
-            if selected_round_idx is not None:
-                selected_round_date, selected_matches = filtered_rounds[selected_round_idx]
-                round_number = date_to_round_number[selected_round_date]  # Numer kolejki według daty asc (1 = najstarsza)
-                round_id = f"round_{selected_round_date}"
-                
-                # Dodaj rundę do storage jeśli nie istnieje
-                if round_id not in storage.data['rounds']:
-                    # Sezon zostanie automatycznie utworzony w add_round jeśli nie istnieje
-                    storage.add_round(selected_season_id, round_id, selected_matches, selected_round_date)
-                
-                # Ranking dla wybranej rundy
-                # Przeładuj dane przed pobraniem rankingu, aby mieć aktualne punkty
-                storage.reload_data()
-                round_data = storage.data['rounds'].get(round_id, {})
-                round_matches = round_data.get('matches', [])
-                auto_sync_round = False
-                
-                # Stwórz mapę meczów w storage (po match_id)
-                storage_matches_map = {}
-                for m in round_matches:
-                    mid = str(m.get('match_id', ''))
-                    storage_matches_map[mid] = m
-                
-                # Zaktualizuj wyniki meczów z API
-                updated_results_count = 0
-                if auto_sync_round:
-                    logger.info(f"[Ranking per kolejka] Aktualizacja wyników z API: sprawdzam {len(selected_matches)} meczów z API dla rundy {round_id}")
-                    for api_match in selected_matches:
-                        match_id = str(api_match.get('match_id', ''))
-                        api_home_goals = api_match.get('home_goals')
-                        api_away_goals = api_match.get('away_goals')
-                        
-                        # Jeśli mecz z API ma wynik, zaktualizuj go w storage
-                        if api_home_goals is not None and api_away_goals is not None:
-                            if match_id in storage_matches_map:
-                                storage_match = storage_matches_map[match_id]
-                                storage_home_goals = storage_match.get('home_goals')
-                                storage_away_goals = storage_match.get('away_goals')
-                                
-                                # Zaktualizuj wynik tylko jeśli się zmienił lub nie był zapisany
-                                if storage_home_goals != api_home_goals or storage_away_goals != api_away_goals:
-                                    logger.info(f"[Ranking per kolejka] ✅ Aktualizuję wynik meczu {match_id}: {storage_home_goals}-{storage_away_goals} -> {api_home_goals}-{api_away_goals}")
-                                    storage_match['home_goals'] = api_home_goals
-                                    storage_match['away_goals'] = api_away_goals
-                                    storage_match['result_updated'] = datetime.now().isoformat()
-                                    updated_results_count += 1
-                
-                # Zapisz zaktualizowane wyniki
-                if updated_results_count > 0:
-                    storage._save_data(force=True)
-                    logger.info(f"[Ranking per kolejka] Zaktualizowano {updated_results_count} wyników meczów z API")
-                    # Przeładuj dane po aktualizacji
-                    storage.reload_data()
-                    round_data = storage.data['rounds'].get(round_id, {})
-                    round_matches = round_data.get('matches', [])
-                
-                # Teraz przelicz punkty dla wszystkich meczów z wynikami
-                round_predictions = round_data.get('predictions', {})
-                match_points_dict = round_data.get('match_points', {})
-                
-                # Sprawdź każdy mecz i przelicz punkty jeśli ma wynik, ale brakuje punktów
-                recalculated_matches = 0
-                for match in round_matches:
-                    match_id = str(match.get('match_id', ''))
-                    home_goals = match.get('home_goals')
-                    away_goals = match.get('away_goals')
-                    
-                    # Jeśli mecz ma wynik, sprawdź czy są punkty dla wszystkich graczy z typami
-                    if home_goals is not None and away_goals is not None:
-                        # Sprawdź czy wszyscy gracze z typami mają punkty
-                        needs_recalculation = False
-                        players_with_predictions = 0
-                        players_with_points = 0
-                        
-                        for player_name, player_predictions in round_predictions.items():
-                            # Sprawdź czy gracz ma typ dla tego meczu
-                            has_prediction = (match_id in player_predictions or 
-                                            str(match_id) in player_predictions or
-                                            (match_id.isdigit() and int(match_id) in player_predictions))
-                            
-                            if has_prediction:
-                                players_with_predictions += 1
-                                # Sprawdź czy gracz ma punkty dla tego meczu
-                                player_points = match_points_dict.get(player_name, {})
-                                has_points = (match_id in player_points or 
-                                            str(match_id) in player_points or
-                                            (match_id.isdigit() and int(match_id) in player_points))
-                                
-                                if has_points:
-                                    players_with_points += 1
-                                else:
-                                    needs_recalculation = True
-                        
-                        # Jeśli brakuje punktów, przelicz je
-                        if needs_recalculation or (players_with_predictions > 0 and players_with_points < players_with_predictions):
-                            logger.info(f"[Ranking per kolejka] Automatyczne przeliczanie punktów dla meczu {match_id} w rundzie {round_id} (graczy z typami: {players_with_predictions}, z punktami: {players_with_points})")
-                            try:
-                                storage.update_match_result(
-                                    round_id,
-                                    match_id,
-                                    int(home_goals),
-                                    int(away_goals),
-                                    save=False,
-                                    recalculate_totals=False
-                                )
-                                recalculated_matches += 1
-                            except Exception as e:
-                                logger.error(f"[Ranking per kolejka] Błąd automatycznego przeliczania punktów dla meczu {match_id}: {e}")
-
-                if recalculated_matches > 0:
-                    storage._recalculate_player_totals(season_id=selected_season_id, save=False)
-                    storage._save_data(force=True)
-                
-                # Przeładuj dane po przeliczeniu
-                storage.reload_data()
-                round_leaderboard = storage.get_round_leaderboard(round_id)
-                round_leaderboard = [player for player in round_leaderboard if player['player_name'] in selected_players]
-                
-                if round_leaderboard:
-                    # Pobierz mecze z rundy dla wyświetlenia typów
-                    # Upewnij się, że mamy aktualne dane - pobierz round_data bezpośrednio z storage
-                    storage.reload_data()
-                    round_data = storage.data['rounds'].get(round_id, {})
-                    matches = round_data.get('matches', [])
-                    matches_map = {str(m.get('match_id', '')): m for m in matches}
-                    
-                    # Przygotuj dane do wyświetlenia (bez kolumny Typy)
-                    round_leaderboard_data = []
-                    for idx, player in enumerate(round_leaderboard, 1):
-                        # Formatuj punkty za każdy mecz: 3+7+1+4+8+9=32
-                        match_points = player.get('match_points', [])
-                        if match_points:
-                            points_str = '+'.join(str(p) for p in match_points)
-                            if player['total_points'] > 0:
-                                points_summary = f"{points_str}={player['total_points']}"
-                            else:
-                                # Jeśli suma to 0, pokaż tylko 0 (gracz nie typował)
-                                points_summary = "0"
-                        else:
-                            points_summary = "0"
-                        
-                        round_leaderboard_data.append({
-                            'Miejsce': idx,
-                            'Gracz': player['player_name'],
-                            'Drużyna': player.get('team_name') or '—',
-                            'Punkty': points_summary,
-                            'Suma': player['total_points'],
-                            'Mecze': player['matches_count']
-                        })
-                    
-                    df_round_leaderboard = pd.DataFrame(round_leaderboard_data)
-                    st.dataframe(df_round_leaderboard, width='stretch', hide_index=True)
-                    render_ht_forum_export(
-                        f"Ranking kolejki {round_number}",
-                        df_round_leaderboard,
-                        ['Miejsce', 'Gracz', 'Drużyna', 'Punkty', 'Suma', 'Mecze'],
-                        key=f"ht_round_table_{selected_season_id}_{round_id}"
-                    )
-                    
-                    # Dodaj expandery z typami dla każdego gracza
-                    st.markdown("### 📋 Szczegóły typów")
-                    for player in round_leaderboard:
-                        player_name = player['player_name']
-                        player_predictions = storage.get_player_predictions(player_name, round_id)
-                        
-                        if player_predictions:
-                            # Sortuj mecze według daty - użyj matches_map lub selected_matches jako fallback
-                            def get_match_date(mid):
-                                match = matches_map.get(str(mid), {})
-                                if not match or not match.get('match_date'):
-                                    # Spróbuj znaleźć w selected_matches
-                                    for api_match in selected_matches:
-                                        if str(api_match.get('match_id', '')) == str(mid):
-                                            return api_match.get('match_date', '')
-                                return match.get('match_date', '')
-                            
-                            sorted_match_ids = sorted(
-                                player_predictions.keys(),
-                                key=lambda mid: get_match_date(mid)
-                            )
-                            
-                            # Przygotuj dane do tabeli
-                            types_table_data = []
-                            # Pobierz match_points_dict bezpośrednio z round_data (upewnij się, że mamy aktualne dane)
-                            # Pobierz round_data ponownie dla każdego gracza, żeby mieć pewność, że dane są aktualne
-                            storage.reload_data()  # Upewnij się, że mamy najnowsze dane
-                            current_round_data = storage.data['rounds'].get(round_id, {})
-                            match_points_dict = current_round_data.get('match_points', {}).get(player_name, {})
-                            
-                            logger.info(f"DEBUG Ranking per kolejka: Gracz {player_name}, round_id={round_id}")
-                            logger.info(f"  sorted_match_ids={sorted_match_ids} (count={len(sorted_match_ids)})")
-                            logger.info(f"  match_points_dict keys={list(match_points_dict.keys())} (count={len(match_points_dict)})")
-                            logger.info(f"  match_points_dict={match_points_dict}")
-                            logger.info(f"  matches_map keys={list(matches_map.keys())} (count={len(matches_map)})")
-                            logger.info(f"  selected_matches count={len(selected_matches)}")
-                            
-                            # Sprawdź które mecze mają wyniki
-                            matches_with_results = []
-                            for m in matches:
-                                mid = str(m.get('match_id', ''))
-                                if m.get('home_goals') is not None and m.get('away_goals') is not None:
-                                    matches_with_results.append(mid)
-                            logger.info(f"  Mecze z wynikami: {matches_with_results}")
-                            logger.info(f"  Mecze z punktami w dict: {list(match_points_dict.keys())}")
-                            
-                            # Sprawdź które mecze z predictions nie są w matches_map
-                            missing_matches = []
-                            for match_id in sorted_match_ids:
-                                match_id_str = str(match_id)
-                                if match_id_str not in matches_map:
-                                    # Sprawdź czy jest w selected_matches
-                                    found_in_api = False
-                                    for api_match in selected_matches:
-                                        if str(api_match.get('match_id', '')) == match_id_str:
-                                            found_in_api = True
-                                            break
-                                    if not found_in_api:
-                                        missing_matches.append(match_id_str)
-                            if missing_matches:
-                                logger.warning(f"  UWAGA: Mecze z predictions nie znalezione w matches_map ani selected_matches: {missing_matches}")
-                            
-                            for match_id in sorted_match_ids:
-                                # Spróbuj znaleźć mecz w matches_map
-                                match = matches_map.get(str(match_id), {})
-                                
-                                # Jeśli nie znaleziono w matches_map lub brak nazw drużyn, spróbuj znaleźć w selected_matches z API
-                                if not match or match.get('home_team_name') in [None, '?', ''] or match.get('away_team_name') in [None, '?', '']:
-                                    for api_match in selected_matches:
-                                        if str(api_match.get('match_id', '')) == str(match_id):
-                                            match = api_match
-                                            logger.info(f"Znaleziono mecz {match_id} w selected_matches z API: {match.get('home_team_name')} vs {match.get('away_team_name')}")
-                                            break
-                                
-                                pred = player_predictions[match_id]
-                                home_team = match.get('home_team_name', '?')
-                                away_team = match.get('away_team_name', '?')
-                                pred_home = pred.get('home', 0)
-                                pred_away = pred.get('away', 0)
-                                
-                                # Pobierz punkty dla tego meczu
-                                # Sprawdź zarówno string jak i int jako klucz (używamy get z domyślną wartością None, żeby odróżnić 0 od braku klucza)
-                                points = None
-                                if str(match_id) in match_points_dict:
-                                    points = match_points_dict[str(match_id)]
-                                elif match_id in match_points_dict:
-                                    points = match_points_dict[match_id]
-                                elif str(match_id).isdigit() and int(match_id) in match_points_dict:
-                                    points = match_points_dict[int(match_id)]
-                                else:
-                                    points = 0
-                                
-                                # Sprawdź czy mecz ma wynik - jeśli nie, punkty powinny być 0
-                                home_goals = match.get('home_goals')
-                                away_goals = match.get('away_goals')
-                                has_result = home_goals is not None and away_goals is not None
-                                
-                                logger.info(f"  match_id={match_id} (type={type(match_id).__name__}), str(match_id)={str(match_id)}, "
-                                           f"str(match_id) in dict={str(match_id) in match_points_dict}, "
-                                           f"match_id in dict={match_id in match_points_dict}, "
-                                           f"has_result={has_result}, points={points}")
-                                
-                                # Debug: loguj jeśli nie znaleziono punktów dla meczu z wynikiem
-                                if points == 0 and has_result and match_id in player_predictions:
-                                    logger.warning(f"WARNING: Gracz {player_name}, match_id={match_id} (type={type(match_id).__name__}), "
-                                                 f"match ma wynik {home_goals}-{away_goals} ale brak punktów! "
-                                                 f"match_points_dict keys={list(match_points_dict.keys())}, "
-                                                 f"match_points_dict={match_points_dict}")
-                                
-                                # Pobierz wynik meczu jeśli rozegrany
-                                home_goals = match.get('home_goals')
-                                away_goals = match.get('away_goals')
-                                result = f"{home_goals}-{away_goals}" if home_goals is not None and away_goals is not None else "—"
-                                
-                                types_table_data.append({
-                                    'Mecz': f"{home_team} vs {away_team}",
-                                    'Typ': f"{pred_home}-{pred_away}",
-                                    'Wynik': result,
-                                    'Punkty': points
-                                })
-                            
-                            if types_table_data:
-                                with st.expander(f"👤 {player_name} - Typy i wyniki", expanded=True):
-                                    df_types = pd.DataFrame(types_table_data)
-                                    st.dataframe(df_types, width='stretch', hide_index=True)
-                                    total_points = sum(row['Punkty'] for row in types_table_data)
-                                    st.caption(f"**Suma punktów: {total_points}**")
-                                    
-                                    # Sekcja ręcznej edycji punktów
-                                    st.markdown("---")
-                                    st.markdown("### ✏️ Ręczna edycja punktów")
-                                    st.caption("💡 Możesz ręcznie ustawić punkty dla każdego meczu (w tym ujemne wartości)")
-                                    
-                                    # Przygotuj dane do edycji
-                                    manual_points_data = {}
-                                    for idx, match_id in enumerate(sorted_match_ids):
-                                        # Spróbuj znaleźć mecz w matches_map
-                                        match = matches_map.get(str(match_id), {})
-                                        
-                                        # Jeśli nie znaleziono w matches_map lub brak nazw drużyn, spróbuj znaleźć w selected_matches z API
-                                        if not match or match.get('home_team_name') in [None, '?', ''] or match.get('away_team_name') in [None, '?', '']:
-                                            for api_match in selected_matches:
-                                                if str(api_match.get('match_id', '')) == str(match_id):
-                                                    match = api_match
-                                                    logger.info(f"Ręczna edycja: Znaleziono mecz {match_id} w selected_matches z API: {match.get('home_team_name')} vs {match.get('away_team_name')}")
-                                                    break
-                                        
-                                        home_team = match.get('home_team_name', '?')
-                                        away_team = match.get('away_team_name', '?')
-                                        
-                                        # Pobierz aktualne punkty
-                                        current_points = None
-                                        if str(match_id) in match_points_dict:
-                                            current_points = match_points_dict[str(match_id)]
-                                        elif match_id in match_points_dict:
-                                            current_points = match_points_dict[match_id]
-                                        elif str(match_id).isdigit() and int(match_id) in match_points_dict:
-                                            current_points = match_points_dict[int(match_id)]
-                                        else:
-                                            current_points = 0
-                                        
-                                        # Sprawdź czy punkty są ręcznie ustawione
-                                        is_manual = storage.is_manual_points(round_id, match_id, player_name)
-                                        
-                                        col_match, col_points, col_manual = st.columns([3, 2, 1])
-                                        with col_match:
-                                            st.write(f"**{home_team} vs {away_team}**")
-                                        with col_points:
-                                            new_points = st.number_input(
-                                                "Punkty:",
-                                                value=int(current_points),
-                                                min_value=None,  # Pozwól na ujemne wartości
-                                                max_value=None,
-                                                step=1,
-                                                key=f"manual_points_{player_name}_{round_id}_{match_id}",
-                                                label_visibility="collapsed",
-                                                disabled=not season_editable
-                                            )
-                                            # Zapisz wartość do słownika
-                                            manual_points_data[match_id] = new_points
-                                        with col_manual:
-                                            if is_manual:
-                                                st.caption("✏️ Ręczne")
-                                            else:
-                                                st.caption("🤖 Auto")
-                                    
-                                    # Przycisk zapisu wszystkich punktów
-                                    if st.button("💾 Zapisz wszystkie punkty", type="primary", key=f"save_all_points_{player_name}_{round_id}", width='stretch', disabled=not season_editable):
-                                        saved_count = 0
-                                        for match_id, new_points in manual_points_data.items():
-                                            # Pobierz aktualne punkty
-                                            current_points = None
-                                            if str(match_id) in match_points_dict:
-                                                current_points = match_points_dict[str(match_id)]
-                                            elif match_id in match_points_dict:
-                                                current_points = match_points_dict[match_id]
-                                            elif str(match_id).isdigit() and int(match_id) in match_points_dict:
-                                                current_points = match_points_dict[int(match_id)]
-                                            else:
-                                                current_points = 0
-                                            
-                                            # Zapisz tylko jeśli wartość się zmieniła
-                                            if new_points != current_points:
-                                                storage.set_manual_points(round_id, match_id, player_name, new_points, season_id=selected_season_id)
-                                                saved_count += 1
-                                        
-                                        if saved_count > 0:
-                                            storage.flush_save()
-                                            st.success(f"✅ Zapisano punkty dla {saved_count} meczów")
-                                            # NIE odświeżamy - użytkownik może kontynuować pracę
-                                        else:
-                                            st.info("ℹ️ Brak zmian do zapisania")
-                                    
-                                    # Podsumowanie dla logów (wewnątrz bloku gdzie types_table_data jest zdefiniowane)
-                                    zero_points_count = sum(1 for row in types_table_data if row['Punkty'] == 0)
-                                    matches_with_results = sum(1 for row in types_table_data if row['Wynik'] != '—')
-                                    logger.info(f"PODSUMOWANIE dla {player_name} w {round_id}:")
-                                    logger.info(f"  Łącznie meczów: {len(types_table_data)}")
-                                    logger.info(f"  Mecze z wynikami: {matches_with_results}")
-                                    logger.info(f"  Mecze z 0 punktami: {zero_points_count}")
-                                    logger.info(f"  Suma punktów: {total_points}")
-                                    logger.info("  Szczegóły wszystkich meczów:")
-                                    for row in types_table_data:
-                                        logger.info(f"    {row['Mecz']}: Typ {row['Typ']}, Wynik {row['Wynik']}, Punkty {row['Punkty']}")
-                                    if zero_points_count > 0 and matches_with_results < len(types_table_data):
-                                        logger.warning(f"  UWAGA: {zero_points_count} meczów ma 0 punktów, ale tylko {matches_with_results} meczów ma wyniki")
-                    
-                    # Wykres rankingu per kolejka
-                    if len(round_leaderboard) > 0:
-                        fig = px.bar(
-                            df_round_leaderboard.head(10),
-                            x='Gracz',
-                            y='Suma',
-                            title=f"Top 10 - Ranking kolejki {round_number}",
-                            labels={'Suma': 'Punkty', 'Gracz': 'Gracz'},
-                            color='Suma',
-                            color_continuous_scale='viridis'
-                        )
-                        fig.update_layout(xaxis_tickangle=-45, height=400)
-                        st.plotly_chart(fig, use_container_width=True, key=f"ranking_round_{round_number}_chart")
-                else:
-                    st.info("📊 Brak danych do wyświetlenia dla tej kolejki")
+            render_round_ranking_tab(
+                storage, selected_season_id, filtered_rounds, round_options,
+                date_to_round_number, default_unplayed_round_idx, selected_players, season_editable
+            )
         
         # Ranking wszechczasów
         with ranking_tab3:
@@ -1655,10 +1729,10 @@ def main():
             # Przelicz punkty dla aktywnego sezonu przed pobraniem rankingu wszechczasów
             # (aby mieć aktualne dane dla sezonu 80)
             if selected_season_id and not storage.is_season_archived(season_id=selected_season_id):
-                logger.info(f"Przeliczam punkty dla sezonu {selected_season_id} przed wyświetleniem rankingu wszechczasów")
-                storage._recalculate_player_totals(season_id=selected_season_id)
-                storage._save_data(force=True)  # Zapisz zaktualizowane total_points
-                logger.info(f"Zapisano zaktualizowane punkty dla sezonu {selected_season_id}")
+                logger.info("Przeliczam punkty dla sezonu %s przed wyświetleniem rankingu wszechczasów", selected_season_id)
+                # Jeden wymuszony zapis i tylko gdy sumy punktów się zmieniły (lub czeka odłożony zapis)
+                if storage.recalculate_totals_and_save(season_id=selected_season_id):
+                    logger.info("Zapisano zaktualizowane punkty dla sezonu %s", selected_season_id)
             
             all_time_leaderboard = get_all_time_leaderboard(exclude_worst=True)
             
@@ -1690,33 +1764,20 @@ def main():
                 
                 # Wykres rankingu wszechczasów
                 if len(all_time_leaderboard) > 0:
-                    fig = px.bar(
-                        df_leaderboard.head(10),
-                        x='Gracz',
-                        y='Suma',
-                        title="Top 10 - Ranking wszechczasów",
-                        labels={'Suma': 'Punkty', 'Gracz': 'Gracz'},
-                        color='Suma',
-                        color_continuous_scale='YlOrRd'
-                    )
-                    fig.update_layout(xaxis_tickangle=-45, height=400)
+                    fig = get_ranking_bar_figure(df_leaderboard.head(10)[['Gracz', 'Suma']], "Top 10 - Ranking wszechczasów", 'YlOrRd')
                     st.plotly_chart(fig, use_container_width=True, key="ranking_alltime_chart")
                     
-                    # Statystyki
+                    # Statystyki z jednej agregacji gotowego DataFrame rankingu
+                    ranking_stats = df_leaderboard[['Suma', 'Sezony']].agg(['sum', 'mean', 'max'])
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
-                        st.metric("Liczba graczy", len(all_time_leaderboard))
+                        st.metric("Liczba graczy", len(df_leaderboard))
                     with col2:
-                        if all_time_leaderboard:
-                            st.metric("Najwięcej punktów", all_time_leaderboard[0]['total_points'])
+                        st.metric("Najwięcej punktów", int(ranking_stats.at['max', 'Suma']))
                     with col3:
-                        if all_time_leaderboard:
-                            avg_points = sum(p['total_points'] for p in all_time_leaderboard) / len(all_time_leaderboard)
-                            st.metric("Średnia punktów", f"{avg_points:.1f}")
+                        st.metric("Średnia punktów", f"{ranking_stats.at['mean', 'Suma']:.1f}")
                     with col4:
-                        if all_time_leaderboard:
-                            total_seasons = sum(p['seasons_played'] for p in all_time_leaderboard)
-                            st.metric("Łącznie sezonów", total_seasons)
+                        st.metric("Łącznie sezonów", int(ranking_stats.at['sum', 'Sezony']))
             else:
                 st.info("📊 Brak danych do wyświetlenia")
         
@@ -1724,41 +1785,24 @@ def main():
         st.markdown("---")
         st.subheader("📅 Wybór rundy")
         
-        # Znajdź pierwszą nie rozegraną kolejkę (najstarszą nie rozegraną - domyślnie po zalogowaniu)
-        default_round_idx = 0
-        # Przeszukaj od końca (od najstarszej do najnowszej), aby znaleźć najstarszą nie rozegraną
-        for idx in range(len(filtered_rounds) - 1, -1, -1):
-            date, matches = filtered_rounds[idx]
-            # Sprawdź czy kolejka ma rozegrane mecze
-            has_played = any(m.get('home_goals') is not None and m.get('away_goals') is not None for m in matches)
-            if not has_played:
-                default_round_idx = idx
-                break  # Weź najstarszą nie rozegraną kolejkę
-        
-        # Sprawdź czy jest zapisany wybór rundy w session_state (synchronizacja z rankingiem)
-        if 'selected_round_idx' in st.session_state:
-            default_round_idx = st.session_state.selected_round_idx
-        
-        # Numeruj kolejki według daty asc (numer 1 = najstarsza), ale wyświetlaj sort desc (najnowsza pierwsza)
-        round_options = []
-        for date, matches in filtered_rounds:
-            round_number = date_to_round_number[date]  # Numer według daty asc
-            round_options.append(f"Kolejka {round_number} - {date} ({len(matches)} meczów)")
-        
-        selected_round_idx = st.selectbox("Wybierz rundę:", range(len(round_options)), index=default_round_idx, format_func=lambda x: round_options[x], key="round_select_main")
-        
-        # Zapisz wybór rundy w session_state (synchronizacja z rankingiem)
-        st.session_state.selected_round_idx = selected_round_idx
+        selected_round = render_round_selector(
+            storage, selected_season_id, filtered_rounds, round_options,
+            date_to_round_number, default_unplayed_round_idx, "round_select_main"
+        )
         
-        if selected_round_idx is not None:
-            selected_round_date, selected_matches = filtered_rounds[selected_round_idx]
-            round_number = date_to_round_number[selected_round_date]  # Numer kolejki według daty asc (1 = najstarsza)
-            round_id = f"round_{selected_round_date}"
+        if selected_round is not None:
+            selected_round_date, selected_matches, round_number, round_id = selected_round
+            
+            # Daty meczów parsowane raz na przebieg (tabela statusów i formularz typów),
+            # wspólny moment odniesienia dla statusów meczów i blokady edycji
+            match_datetimes = build_match_datetimes(selected_matches)
+            render_now = datetime.now()
+            # Indeks meczów rundy po match_id budowany raz - wyszukiwanie O(1) zamiast przeglądania listy
+            match_by_id = {str(m.get('match_id', '')): m for m in selected_matches}
             
-            # Dodaj rundę do storage jeśli nie istnieje
-            if round_id not in storage.data['rounds']:
-                # Sezon zostanie automatycznie utworzony w add_round jeśli nie istnieje
-                storage.add_round(selected_season_id, round_id, selected_matches, selected_round_date)
+            # Dane wybranej rundy pobierane raz dla sekcji wprowadzania typów
+            round_data = storage.get_round_snapshot(round_id)
+            round_matches = round_data.get('matches', [])
             
             # Wyświetl mecze w rundzie - tabela na górze dla czytelności
             st.subheader(f"⚽ Kolejka {round_number} - {selected_round_date}")
@@ -1770,148 +1814,36 @@ def main():
                     with st.spinner("Pobieranie wyników i przeliczanie punktów..."):
                         # Przeładuj dane
                         storage.reload_data()
-                        st.session_state[f"_last_auto_sync_{round_id}"] = datetime.now().timestamp()
-                        round_data = storage.data['rounds'].get(round_id, {})
-                        round_matches = round_data.get('matches', [])
-                        
-                        # Stwórz mapę meczów w storage (po match_id)
-                        storage_matches_map = {}
-                        for match in round_matches:
-                            match_id = str(match.get('match_id', ''))
-                            storage_matches_map[match_id] = match
-                        
-                        # Zaktualizuj wyniki meczów z API
-                        logger.info(f"Sprawdzam {len(selected_matches)} meczów z API dla rundy {round_id}")
-                        updated_count = 0
-                        for api_match in selected_matches:
-                            match_id = str(api_match.get('match_id', ''))
-                            api_home_goals = api_match.get('home_goals')
-                            api_away_goals = api_match.get('away_goals')
-                            
-                            logger.info(f"API mecz {match_id}: home_goals={api_home_goals}, away_goals={api_away_goals}")
-                            
-                            # Jeśli mecz z API ma wynik, zaktualizuj go w storage
-                            if api_home_goals is not None and api_away_goals is not None:
-                                if match_id in storage_matches_map:
-                                    storage_match = storage_matches_map[match_id]
-                                    storage_home_goals = storage_match.get('home_goals')
-                                    storage_away_goals = storage_match.get('away_goals')
-                                    
-                                    logger.info(f"Storage mecz {match_id}: home_goals={storage_home_goals}, away_goals={storage_away_goals}")
-                                    
-                                    # Zaktualizuj wynik tylko jeśli się zmienił lub nie był zapisany
-                                    if storage_home_goals != api_home_goals or storage_away_goals != api_away_goals:
-                                        logger.info(f"✅ Aktualizuję wynik meczu {match_id} w rundzie {round_id}: {storage_home_goals}-{storage_away_goals} -> {api_home_goals}-{api_away_goals}")
-                                        storage_match['home_goals'] = api_home_goals
-                                        storage_match['away_goals'] = api_away_goals
-                                        storage_match['result_updated'] = datetime.now().isoformat()
-                                        updated_count += 1
-                                else:
-                                    # Mecz nie jest w storage - sprawdź czy gracze mają typy dla niego
-                                    predictions = round_data.get('predictions', {})
-                                    has_predictions = False
-                                    for player_name, player_predictions in predictions.items():
-                                        if match_id in player_predictions or str(match_id) in player_predictions:
-                                            has_predictions = True
-                                            break
-                                    
-                                    if has_predictions:
-                                        # Dodaj mecz do storage z danymi z API
-                                        logger.warning(f"⚠️ Mecz {match_id} z API nie został znaleziony w storage, ale gracze mają typy - dodaję mecz do storage")
-                                        new_match = api_match.copy()
-                                        new_match['home_goals'] = api_home_goals
-                                        new_match['away_goals'] = api_away_goals
-                                        new_match['result_updated'] = datetime.now().isoformat()
-                                        round_matches.append(new_match)
-                                        storage_matches_map[match_id] = new_match
-                                        updated_count += 1
-                                        logger.info(f"✅ Dodano mecz {match_id} do storage z wynikiem {api_home_goals}-{api_away_goals}")
-                                    else:
-                                        logger.warning(f"⚠️ Mecz {match_id} z API nie został znaleziony w storage i gracze nie mają typów - pomijam")
-                            else:
-                                logger.info(f"⏭️ Mecz {match_id} z API nie ma wyniku (home_goals={api_home_goals}, away_goals={api_away_goals})")
-                        
-                        if updated_count > 0:
-                            storage._save_data(force=True)  # Zapisz natychmiast
-                            logger.info(f"Zaktualizowano {updated_count} wyników meczów")
+                        mark_round_auto_synced(round_id)
+                        # Wyniki z API przenoszone do storage pod blokadą (razem z brakującymi meczami, dla których są typy)
+                        storage.sync_round_results(round_id, selected_matches, add_missing=True)
                         
                         # Przeładuj dane po aktualizacji wyników
                         storage.reload_data()
-                        round_data = storage.data['rounds'].get(round_id, {})
-                        round_matches = round_data.get('matches', [])
+                        round_matches = storage.get_round_snapshot(round_id).get('matches', [])
                         
                         # Przelicz punkty dla wszystkich meczów z wynikami w rundzie
                         # Użyj zarówno meczów z storage jak i z API (aby nie pominąć żadnego)
-                        calculated_count = 0
-                        logger.info(f"Przeliczanie punktów dla rundy {round_id}: {len(round_matches)} meczów w storage, {len(selected_matches)} meczów w API")
-                        
-                        # Stwórz zbiór przetworzonych meczów, aby nie przeliczać dwa razy
-                        processed_match_ids = set()
+                        logger.debug("Przeliczanie punktów dla rundy %s: %s meczów w storage, %s meczów w API", round_id, len(round_matches), len(selected_matches))
                         
-                        # Najpierw przelicz mecze z storage
-                        for match in round_matches:
+                        # Najpierw mecze z storage, potem mecze z API, których nie było w storage (każdy mecz raz)
+                        results_by_match_id = {}
+                        for match in [*round_matches, *selected_matches]:
                             match_id = str(match.get('match_id', ''))
                             home_goals = match.get('home_goals')
                             away_goals = match.get('away_goals')
-                            
-                            logger.info(f"Sprawdzam mecz z storage {match_id}: home_goals={home_goals}, away_goals={away_goals}")
-                            
+                            if match_id in results_by_match_id:
+                                continue
                             # Jeśli mecz ma wynik, przelicz punkty (update_match_result sprawdzi czy są typy)
                             if home_goals is not None and away_goals is not None:
-                                try:
-                                    logger.info(f"Wywołuję update_match_result dla meczu {match_id} z wynikiem {home_goals}-{away_goals}")
-                                    storage.update_match_result(
-                                        round_id,
-                                        match_id,
-                                        int(home_goals),
-                                        int(away_goals),
-                                        save=False,
-                                        recalculate_totals=False
-                                    )
-                                    calculated_count += 1
-                                    processed_match_ids.add(match_id)
-                                    logger.info(f"✅ Przeliczono punkty dla meczu {match_id} w rundzie {round_id} (wynik: {home_goals}-{away_goals})")
-                                except Exception as e:
-                                    logger.error(f"❌ Błąd przeliczania punktów dla meczu {match_id}: {e}", exc_info=True)
-                            else:
-                                logger.info(f"⏭️ Mecz {match_id} nie ma wyniku (home_goals={home_goals}, away_goals={away_goals}) - pomijam")
-                        
-                        # Teraz przelicz mecze z API, które nie były w storage lub nie zostały jeszcze przeliczone
-                        for api_match in selected_matches:
-                            match_id = str(api_match.get('match_id', ''))
-                            
-                            # Pomiń jeśli już przetworzony
-                            if match_id in processed_match_ids:
-                                continue
-                            
-                            api_home_goals = api_match.get('home_goals')
-                            api_away_goals = api_match.get('away_goals')
-                            
-                            logger.info(f"Sprawdzam mecz z API {match_id}: home_goals={api_home_goals}, away_goals={api_away_goals}")
-                            
-                            # Jeśli mecz z API ma wynik, przelicz punkty
-                            if api_home_goals is not None and api_away_goals is not None:
-                                try:
-                                    logger.info(f"Wywołuję update_match_result dla meczu z API {match_id} z wynikiem {api_home_goals}-{api_away_goals}")
-                                    storage.update_match_result(
-                                        round_id,
-                                        match_id,
-                                        int(api_home_goals),
-                                        int(api_away_goals),
-                                        save=False,
-                                        recalculate_totals=False
-                                    )
-                                    calculated_count += 1
-                                    processed_match_ids.add(match_id)
-                                    logger.info(f"✅ Przeliczono punkty dla meczu z API {match_id} w rundzie {round_id} (wynik: {api_home_goals}-{api_away_goals})")
-                                except Exception as e:
-                                    logger.error(f"❌ Błąd przeliczania punktów dla meczu z API {match_id}: {e}", exc_info=True)
+                                results_by_match_id[match_id] = (match_id, int(home_goals), int(away_goals))
                             else:
-                                logger.info(f"⏭️ Mecz z API {match_id} nie ma wyniku (home_goals={api_home_goals}, away_goals={api_away_goals}) - pomijam")
+                                logger.debug("⏭️ Mecz %s nie ma wyniku (home_goals=%s, away_goals=%s) - pomijam", match_id, home_goals, away_goals)
                         
-                        if calculated_count > 0:
-                            storage._recalculate_player_totals(season_id=selected_season_id, save=False)
-                            storage._save_data(force=True)
+                        # Jedno przeliczenie punktów wszystkich meczów, sum graczy i jeden zapis
+                        calculated_count = storage.update_match_results_bulk(
+                            round_id, list(results_by_match_id.values()), season_id=selected_season_id
+                        )
 
                         if calculated_count > 0:
                             st.success(f"✅ Przeliczono punkty dla {calculated_count} meczów")
@@ -1925,75 +1857,24 @@ def main():
             with col_info:
                 st.caption("💡 Kliknij, aby pobrać najnowsze wyniki z API i przeliczyć punkty dla tej kolejki")
             
-            # Sprawdź czy mecze są już rozegrane
-            matches_played = []
-            matches_upcoming = []
-            
-            for match in selected_matches:
-                if match.get('home_goals') is not None and match.get('away_goals') is not None:
-                    matches_played.append(match)
-                else:
-                    matches_upcoming.append(match)
-            
-            round_sync_ttl = get_round_sync_ttl(selected_matches, round_matches)
+            # W oknie throttlingu nie analizuj meczów rundy - synchronizacja i tak zostałaby pominięta
+            if get_seconds_since_auto_sync(round_id) >= ROUND_LIVE_SYNC_TTL_SECONDS:
+                round_sync_ttl = get_round_sync_ttl(selected_matches, round_matches)
+            else:
+                round_sync_ttl = None
             if should_auto_sync_round(round_id, "main", round_sync_ttl):
                 # Najpierw zaktualizuj wszystkie wyniki z API do storage
                 storage.reload_data()
-                round_data = storage.data['rounds'].get(round_id, {})
-                round_matches = round_data.get('matches', [])
-                
-                # Stwórz mapę meczów w storage (po match_id)
-                storage_matches_map = {}
-                for m in round_matches:
-                    mid = str(m.get('match_id', ''))
-                    storage_matches_map[mid] = m
-                
-                # Zaktualizuj wyniki meczów z API
-                updated_results_count = 0
-                logger.info(f"Aktualizacja wyników z API: sprawdzam {len(selected_matches)} meczów z API dla rundy {round_id}")
-                for api_match in selected_matches:
-                    match_id = str(api_match.get('match_id', ''))
-                    api_home_goals = api_match.get('home_goals')
-                    api_away_goals = api_match.get('away_goals')
-                    
-                    logger.info(f"API mecz {match_id}: home_goals={api_home_goals}, away_goals={api_away_goals}")
-                    
-                    # Jeśli mecz z API ma wynik, zaktualizuj go w storage
-                    if api_home_goals is not None and api_away_goals is not None:
-                        if match_id in storage_matches_map:
-                            storage_match = storage_matches_map[match_id]
-                            storage_home_goals = storage_match.get('home_goals')
-                            storage_away_goals = storage_match.get('away_goals')
-                            
-                            logger.info(f"Storage mecz {match_id}: home_goals={storage_home_goals}, away_goals={storage_away_goals}")
-                            
-                            # Zaktualizuj wynik tylko jeśli się zmienił lub nie był zapisany
-                            if storage_home_goals != api_home_goals or storage_away_goals != api_away_goals:
-                                logger.info(f"✅ Aktualizuję wynik meczu {match_id}: {storage_home_goals}-{storage_away_goals} -> {api_home_goals}-{api_away_goals}")
-                                storage_match['home_goals'] = api_home_goals
-                                storage_match['away_goals'] = api_away_goals
-                                storage_match['result_updated'] = datetime.now().isoformat()
-                                updated_results_count += 1
-                            else:
-                                logger.info(f"⏭️ Wynik meczu {match_id} już jest aktualny: {storage_home_goals}-{storage_away_goals}")
-                        else:
-                            logger.warning(f"⚠️ Mecz {match_id} z API nie został znaleziony w storage_matches_map (keys: {list(storage_matches_map.keys())})")
-                    else:
-                        logger.info(f"⏭️ Mecz {match_id} z API nie ma wyniku (home_goals={api_home_goals}, away_goals={api_away_goals})")
-                
-                # Zapisz zaktualizowane wyniki
-                if updated_results_count > 0:
-                    storage._save_data(force=True)
-                    logger.info(f"Zaktualizowano {updated_results_count} wyników meczów z API")
-                    # Przeładuj dane po aktualizacji
+                # Wyniki z API przenoszone do storage pod blokadą; przeładowanie tylko po faktycznej zmianie
+                if storage.sync_round_results(round_id, selected_matches) > 0:
                     storage.reload_data()
-                    round_data = storage.data['rounds'].get(round_id, {})
-                    round_matches = round_data.get('matches', [])
+                round_data = storage.get_round_snapshot(round_id)
+                round_matches = round_data.get('matches', [])
                 
                 # Teraz przelicz punkty dla wszystkich meczów z wynikami
                 round_predictions = round_data.get('predictions', {})
                 match_points_dict = round_data.get('match_points', {})
-                recalculated_matches = 0
+                pending_results = []
                 
                 for match in round_matches:
                     match_id = str(match.get('match_id', ''))
@@ -2027,56 +1908,31 @@ def main():
                         
                         # Jeśli nie wszyscy gracze z typami mają punkty, przelicz je
                         if needs_recalculation or (players_with_predictions > 0 and players_with_points < players_with_predictions):
-                            logger.info(f"Brak punktów dla meczu {match_id} - przeliczam punkty (graczy z typami: {players_with_predictions}, z punktami: {players_with_points})")
-                            try:
-                                storage.update_match_result(
-                                    round_id,
-                                    match_id,
-                                    int(home_goals),
-                                    int(away_goals),
-                                    save=False,
-                                    recalculate_totals=False
-                                )
-                                recalculated_matches += 1
-                            except Exception as e:
-                                logger.error(f"Błąd przeliczania punktów dla meczu {match_id}: {e}", exc_info=True)
+                            logger.info("Brak punktów dla meczu %s - przeliczam punkty (graczy z typami: %s, z punktami: %s)", match_id, players_with_predictions, players_with_points)
+                            pending_results.append((match_id, int(home_goals), int(away_goals)))
 
-                if recalculated_matches > 0:
-                    storage._recalculate_player_totals(season_id=selected_season_id, save=False)
-                    storage._save_data(force=True)
+                # Wszystkie brakujące punkty przeliczane razem - jedno przeliczenie sum i jeden zapis
+                if pending_results:
+                    storage.update_match_results_bulk(round_id, pending_results, season_id=selected_season_id)
             
-            # Przygotuj dane do tabeli
-            matches_table_data = []
-            for match in selected_matches:
-                home_team = match.get('home_team_name', 'Unknown')
-                away_team = match.get('away_team_name', 'Unknown')
-                match_date = match.get('match_date', '')
-                home_goals = match.get('home_goals')
-                away_goals = match.get('away_goals')
-                match_id = str(match.get('match_id', ''))
-                
-                # Status meczu
-                status = "⏳ Oczekuje"
-                if home_goals is not None and away_goals is not None:
-                    status = f"✅ {home_goals}-{away_goals}"
-                else:
-                    try:
-                        match_dt = datetime.strptime(match_date, "%Y-%m-%d %H:%M:%S")
-                        if datetime.now() >= match_dt:
-                            status = "⏰ Rozpoczęty"
-                    except Exception:
-                        pass
-                
-                matches_table_data.append({
-                    'Gospodarz': home_team,
-                    'Gość': away_team,
-                    'Data': match_date,
-                    'Status': status
+            # Tabela meczów budowana kolumnami (bez pośredniego słownika dla każdego wiersza)
+            if selected_matches:
+                match_statuses = []
+                for match in selected_matches:
+                    home_goals = match.get('home_goals')
+                    away_goals = match.get('away_goals')
+                    if home_goals is not None and away_goals is not None:
+                        match_statuses.append(f"✅ {home_goals}-{away_goals}")
+                    else:
+                        match_dt = match_datetimes.get(str(match.get('match_id', '')))
+                        match_statuses.append("⏰ Rozpoczęty" if match_dt is not None and render_now >= match_dt else "⏳ Oczekuje")
+
+                df_matches = pd.DataFrame({
+                    'Gospodarz': [match.get('home_team_name', 'Unknown') for match in selected_matches],
+                    'Gość': [match.get('away_team_name', 'Unknown') for match in selected_matches],
+                    'Data': [match.get('match_date', '') for match in selected_matches],
+                    'Status': match_statuses
                 })
-            
-            # Wyświetl tabelę z meczami
-            if matches_table_data:
-                df_matches = pd.DataFrame(matches_table_data)
                 st.dataframe(df_matches, width='stretch', hide_index=True)
             
             
@@ -2100,7 +1956,7 @@ def main():
             
             with col_player1:
                 # Lista graczy z sezonu
-                all_players_list = selected_players if 'selected_players' in locals() else get_effective_selected_players(storage, selected_season_id)
+                all_players_list = selected_players  # Gracze wybrani w panelu sezonu (zawsze ustawieni wyżej)
                 if all_players_list:
                     selected_player = st.selectbox("Wybierz gracza:", all_players_list, key="tipper_selected_player")
                 else:
@@ -2241,19 +2097,37 @@ def main():
                 if round_id not in storage.data.get('rounds', {}):
                     storage.add_round(selected_season_id, round_id, selected_matches, selected_round_date)
                 
-                # Sprawdź czy trzeba odświeżyć dane
-                needs_refresh = st.session_state.get('_refresh_predictions', False)
-                
-                # Sprawdź czy trzeba odświeżyć dane (po zapisie typów)
-                needs_refresh = st.session_state.get('_refresh_predictions', False)
+                # Sprawdź czy trzeba odświeżyć dane (po zapisie typów) i wyczyść flagę po użyciu
+                needs_refresh = st.session_state.pop('_refresh_predictions', False)
                 if needs_refresh:
                     logger.info("Odświeżam dane po zapisie typów")
-                    # Wyczyść flagę po użyciu
-                    st.session_state['_refresh_predictions'] = False
                 
                 # Pobierz istniejące typy gracza dla tej rundy
                 existing_predictions = storage.get_player_predictions(selected_player, round_id, season_id=selected_season_id)
                 
+                # Typy formularza trzymane w jednym słowniku na gracza i rundę (zamiast osobnego klucza na mecz)
+                preds_state_key = f"tipper_preds_{selected_player}_{round_id}"
+                bulk_fill_key = f"bulk_fill_{selected_player}_{round_id}"
+                # Zapisane typy sformatowane raz - wartości startowe słownika formularza i domyślne wartości siatki
+                stored_pred_values = {
+                    str(mid): f"{pred.get('home', 0)}-{pred.get('away', 0)}"
+                    for mid, pred in existing_predictions.items()
+                }
+                needs_hydrate = needs_refresh or preds_state_key not in st.session_state
+                if needs_hydrate:
+                    st.session_state[preds_state_key] = dict(stored_pred_values)
+                form_preds = st.session_state[preds_state_key]
+                
+                # Dane z bulk mają priorytet nad istniejącymi typami
+                bulk_fill_data = st.session_state.pop(bulk_fill_key, None)
+                if bulk_fill_data:
+                    form_preds.update({str(mid): value for mid, value in bulk_fill_data.items()})
+                
+                editor_key = f"tipper_editor_{selected_player}_{round_id}"
+                if needs_hydrate or bulk_fill_data:
+                    # Zresetuj edycje w siatce, aby przyjęła wartości ze słownika
+                    st.session_state.pop(editor_key, None)
+                
                 st.markdown(f"### Typy dla: **{selected_player}**")
                 
                 # Tryb wprowadzania: pojedyncze i bulk obok siebie
@@ -2265,129 +2139,68 @@ def main():
                         # Wyświetl formularz dla każdego meczu
                         st.markdown("**Wprowadź typy dla każdego meczu:**")
                         
-                        for idx, match in enumerate(selected_matches):
+                        # Jedna siatka st.data_editor zamiast osobnego pola tekstowego dla każdego meczu;
+                        # mecze zablokowane (rozpoczęte) trafiają do osobnej tabeli tylko do odczytu
+                        editor_rows = []
+                        locked_rows = []
+                        editable_match_ids = get_editable_match_ids(match_datetimes, allow_historical, render_now)
+                        for match in selected_matches:
                             match_id = str(match.get('match_id', ''))
-                            home_team = match.get('home_team_name', 'Unknown')
-                            away_team = match.get('away_team_name', 'Unknown')
-                            match_date = match.get('match_date', '')
                             home_goals = match.get('home_goals')
                             away_goals = match.get('away_goals')
+                            has_result = home_goals is not None and away_goals is not None
                             
-                            # Sprawdź czy mecz już się rozpoczął
-                            can_edit = True
-                            is_historical = False
-                            if match_date:
-                                try:
-                                    match_dt = datetime.strptime(match_date, "%Y-%m-%d %H:%M:%S")
-                                    if datetime.now() >= match_dt:
-                                        is_historical = True
-                                        can_edit = allow_historical
-                                except Exception:
-                                    pass
+                            can_edit = match_id in editable_match_ids
                             
                             # Pobierz istniejący typ
                             has_existing = match_id in existing_predictions
-                            if has_existing:
-                                existing_pred = existing_predictions[match_id]
-                                default_value = f"{existing_pred.get('home', 0)}-{existing_pred.get('away', 0)}"
-                            else:
-                                default_value = "0-0"
+                            default_value = stored_pred_values.get(match_id, "0-0")
                             
                             # Oblicz punkty jeśli mecz rozegrany
-                            points_display = ""
-                            if home_goals is not None and away_goals is not None and has_existing:
+                            points = None
+                            if has_result and has_existing:
+                                existing_pred = existing_predictions[match_id]
                                 pred_home = existing_pred.get('home', 0)
                                 pred_away = existing_pred.get('away', 0)
                                 points = tipper.calculate_points((pred_home, pred_away), (int(home_goals), int(away_goals)))
-                                points_display = f" | **Punkty: {points}**"
                             
-                            col1, col2, col3 = st.columns([3, 1.5, 1])
-                            with col1:
-                                status_icon = "✅" if has_existing else "❌"
-                                result_text = f" ({home_goals}-{away_goals})" if home_goals is not None and away_goals is not None else ""
-                                st.write(f"{status_icon} **{home_team}** vs **{away_team}**{result_text} {points_display}")
-                            with col2:
-                                if can_edit:
-                                    input_key = f"tipper_pred_{selected_player}_{match_id}"
-                                    
-                                    # Sprawdź czy są dane z bulk do wypełnienia
-                                    bulk_fill_key = f"bulk_fill_{selected_player}_{round_id}"
-                                    bulk_fill_data = st.session_state.get(bulk_fill_key, {})
-                                    
-                                    # Określ wartość początkową - priorytet: bulk > istniejąca wartość > domyślna
-                                    initial_value = default_value
-                                    
-                                    # Sprawdź czy są dane z bulk dla tego meczu (sprawdź zarówno string jak i int)
-                                    match_id_str = str(match_id)
-                                    bulk_value = None
-                                    if match_id_str in bulk_fill_data:
-                                        bulk_value = bulk_fill_data[match_id_str]
-                                    elif match_id in bulk_fill_data:
-                                        bulk_value = bulk_fill_data[match_id]
-                                    
-                                    if bulk_value:
-                                        initial_value = bulk_value
-                                        st.session_state[input_key] = bulk_value
-                                    elif input_key in st.session_state:
-                                        initial_value = st.session_state[input_key]
-                                    elif needs_refresh:
-                                        initial_value = default_value
-                                        if input_key in st.session_state:
-                                            del st.session_state[input_key]
-                                    
-                                    if input_key in st.session_state:
-                                        pred_input = st.text_input(
-                                            "Typ:",
-                                            value=st.session_state[input_key],
-                                            key=input_key,
-                                            label_visibility="collapsed",
-                                            disabled=not season_editable
-                                        )
-                                    else:
-                                        pred_input = st.text_input(
-                                            "Typ:",
-                                            value=initial_value,
-                                            key=input_key,
-                                            label_visibility="collapsed",
-                                            disabled=not season_editable
-                                        )
-                                else:
-                                    if is_historical:
-                                        st.info("⏰ Rozegrany")
-                                    else:
-                                        st.warning("⏰ Rozpoczęty")
-                                    pred_input = default_value
-                            with col3:
-                                if has_existing and home_goals is not None and away_goals is not None:
-                                    pred_data = existing_predictions[match_id]
-                                    pred_home = pred_data.get('home', 0)
-                                    pred_away = pred_data.get('away', 0)
-                                    points = tipper.calculate_points((pred_home, pred_away), (int(home_goals), int(away_goals)))
-                                    st.metric("Punkty", points)
-                                else:
-                                    st.empty()
+                            (editor_rows if can_edit else locked_rows).append({
+                                'match_id': match_id,
+                                'Status': ("✅" if has_existing else "❌") + ("" if can_edit else " ⏰"),
+                                'Mecz': f"{match.get('home_team_name', 'Unknown')} vs {match.get('away_team_name', 'Unknown')}",
+                                'Wynik': f"{home_goals}-{away_goals}" if has_result else "",
+                                'Typ': form_preds.get(match_id, default_value) if can_edit else default_value,
+                                'Punkty': points
+                            })
                         
-                        # Wyczyść dane z bulk po wyświetleniu wszystkich pól
-                        bulk_fill_key = f"bulk_fill_{selected_player}_{round_id}"
-                        if bulk_fill_key in st.session_state:
-                            bulk_fill_data = st.session_state[bulk_fill_key]
-                            used_match_ids = set()
-                            for match in selected_matches:
-                                match_id_str = str(match.get('match_id', ''))
-                                if match_id_str in bulk_fill_data:
-                                    used_match_ids.add(match_id_str)
-                            
-                            for match_id in used_match_ids:
-                                if match_id in bulk_fill_data:
-                                    del bulk_fill_data[match_id]
-                            
-                            if not bulk_fill_data:
-                                del st.session_state[bulk_fill_key]
-                            else:
-                                st.session_state[bulk_fill_key] = bulk_fill_data
+                        points_column_config = {'Punkty': st.column_config.NumberColumn('Punkty', format="%d")}
+                        form_values = {}
+                        if editor_rows:
+                            edited_df = st.data_editor(
+                                pd.DataFrame(editor_rows).set_index('match_id'),
+                                key=editor_key,
+                                hide_index=True,
+                                width='stretch',
+                                disabled=True if not season_editable else ['Status', 'Mecz', 'Wynik', 'Punkty'],
+                                column_config={
+                                    'Typ': st.column_config.TextColumn('Typ', max_chars=7, help="Format: 2-1"),
+                                    **points_column_config
+                                }
+                            )
+                            # Wartości z siatki - zawiera wyłącznie mecze, które można edytować
+                            form_values = {
+                                match_id: value if isinstance(value, str) else ''
+                                for match_id, value in edited_df['Typ'].items()
+                            }
                         
-                        if needs_refresh:
-                            st.session_state['_refresh_predictions'] = False
+                        if locked_rows:
+                            st.caption("⏰ Mecze rozpoczęte - typu nie można już zmienić (zaznacz typy historyczne, aby je edytować)")
+                            st.dataframe(
+                                pd.DataFrame(locked_rows).drop(columns='match_id'),
+                                hide_index=True,
+                                width='stretch',
+                                column_config=points_column_config
+                            )
                         
                         col_save_single, col_delete_single = st.columns(2)
                         with col_save_single:
@@ -2397,7 +2210,16 @@ def main():
                             delete_button_key = f"tipper_delete_all_{selected_player}_{round_id}"
                             delete_types_submitted = st.form_submit_button("🗑️ Usuń typy", use_container_width=True, disabled=not season_editable)
 
-                        if save_types_submitted:
+                        # Ponowny zapis tych samych wartości przy niezmienionych typach pomija parsowanie i zapis
+                        saved_hash_key = f"tipper_saved_hash_{selected_player}_{round_id}"
+                        skip_unchanged_save = (
+                            save_types_submitted
+                            and st.session_state.get(saved_hash_key) == get_predictions_form_hash(form_values, existing_predictions)
+                        )
+                        
+                        if skip_unchanged_save:
+                            st.info("ℹ️ Brak zmian do zapisania")
+                        elif save_types_submitted:
                             saved_count = 0
                             updated_count = 0
                             errors = []
@@ -2405,144 +2227,74 @@ def main():
                             if round_id not in storage.data.get('rounds', {}):
                                 storage.add_round(selected_season_id, round_id, selected_matches, selected_round_date)
                             
-                            # Pobierz wszystkie istniejące typy przed zapisem (aby nie stracić tych, które nie są w session_state)
-                            # NIE przeładowujemy danych - używamy aktualnych danych z storage
-                            existing_predictions_before = storage.get_player_predictions(selected_player, round_id, season_id=selected_season_id)
+                            # Migawka istniejących typów odczytanych już przy renderowaniu (bez przeładowania i ponownego odczytu)
+                            # z kluczami znormalizowanymi do string (jedno sprawdzenie zamiast wariantów str/int)
+                            existing_by_id = {str(mid): pred for mid, pred in existing_predictions.items()}
+                            
+                            logger.debug("Zapis typów: Sprawdzam %s meczów dla gracza %s", len(selected_matches), selected_player)
                             
-                            logger.info(f"Zapis typów: Sprawdzam {len(selected_matches)} meczów dla gracza {selected_player}")
+                            # Zapamiętaj wartości z formularza w słowniku gracza/rundy
+                            form_preds.update(form_values)
+                            logger.debug("Zapis typów: Wartości z formularza: %s", form_values)
                             
-                            # Loguj wszystkie klucze w session_state związane z typami
-                            all_prediction_keys = [k for k in st.session_state.keys() if k.startswith(f"tipper_pred_{selected_player}_")]
-                            logger.info(f"Zapis typów: Znaleziono {len(all_prediction_keys)} kluczy w session_state: {all_prediction_keys}")
+                            # Mecze edytowalne w chwili zapisu (mecz mógł się rozpocząć od wyświetlenia formularza)
+                            save_editable_ids = get_editable_match_ids(match_datetimes, allow_historical, datetime.now())
+                            predictions_to_save = {}
                             
-                            # Loguj wartości dla każdego klucza
-                            for key in all_prediction_keys:
-                                logger.info(f"Zapis typów: Klucz '{key}' ma wartość: '{st.session_state.get(key, 'BRAK')}'")
+                            # Puste pola (i mecze zablokowane) odrzucane od razu - istniejące typy zostają, parsowane są tylko niepuste wartości
+                            nonempty_values = {match_id: value.strip() for match_id, value in form_values.items() if value and value.strip()}
+                            logger.debug("Zapis typów: %s niepustych pól z %s meczów", len(nonempty_values), len(selected_matches))
                             
                             for match in selected_matches:
                                 match_id = str(match.get('match_id', ''))
-                                match_id_int = match.get('match_id', '')
+                                pred_input = nonempty_values.get(match_id)
+                                if pred_input is None:
+                                    continue
                                 
-                                # Spróbuj znaleźć klucz w session_state (może być jako string lub int)
-                                input_key = f"tipper_pred_{selected_player}_{match_id}"
-                                input_key_int = f"tipper_pred_{selected_player}_{match_id_int}" if isinstance(match_id_int, int) else None
+                                parsed = tipper.parse_prediction(pred_input)
+                                logger.debug("Zapis typów: Mecz %s: sparsowano '%s' -> %s", match_id, pred_input, parsed)
                                 
-                                # Sprawdź czy jest wartość w session_state (z trybu pojedynczego)
-                                pred_input = None
-                                if input_key in st.session_state:
-                                    pred_input = st.session_state[input_key]
-                                elif input_key_int and input_key_int in st.session_state:
-                                    pred_input = st.session_state[input_key_int]
-                                    # Znormalizuj klucz do string
-                                    st.session_state[input_key] = pred_input
-                                    if input_key_int != input_key:
-                                        del st.session_state[input_key_int]
-                                
-                                if pred_input is not None:
-                                    logger.info(f"Zapis typów: Mecz {match_id} ({match.get('home_team_name')} vs {match.get('away_team_name')}), wartość w session_state: '{pred_input}'")
-                                    
-                                    # Pomiń puste wartości lub "0-0" jeśli typ już istnieje (chroni przed przypadkowym zerowaniem)
-                                    if not pred_input or pred_input.strip() == "":
-                                        # Puste pole - pomiń (zachowaj istniejący typ jeśli istnieje)
-                                        if match_id in existing_predictions_before or str(match_id) in existing_predictions_before:
-                                            logger.info(f"Zapis typów: Puste pole dla meczu {match_id}, zachowuję istniejący typ")
-                                            continue  # Zachowaj istniejący typ
-                                        else:
-                                            logger.info(f"Zapis typów: Puste pole dla meczu {match_id}, pomijam")
-                                            continue  # Pomiń puste pole
+                                if parsed:
+                                    # Sprawdź czy to nie jest "0-0" dla istniejącego typu (chroni przed przypadkowym zerowaniem)
+                                    if parsed == (0, 0):
+                                        # Sprawdź czy typ już istnieje - jeśli tak, pomiń (nie zeruj)
+                                        existing_pred = existing_by_id.get(match_id)
+                                        if existing_pred and (existing_pred.get('home', 0) != 0 or existing_pred.get('away', 0) != 0):
+                                            # Istniejący typ nie jest "0-0" - nie zeruj go
+                                            logger.info("Pomijam zapis '0-0' dla meczu %s - istnieje typ %s-%s", match_id, existing_pred.get('home', 0), existing_pred.get('away', 0))
+                                            continue
                                     
-                                    parsed = tipper.parse_prediction(pred_input)
-                                    logger.info(f"Zapis typów: Sparsowano '{pred_input}' -> {parsed}")
-                                    
-                                    if parsed:
-                                        # Sprawdź czy to nie jest "0-0" dla istniejącego typu (chroni przed przypadkowym zerowaniem)
-                                        if parsed == (0, 0):
-                                            # Sprawdź czy typ już istnieje - jeśli tak, pomiń (nie zeruj)
-                                            if match_id in existing_predictions_before or str(match_id) in existing_predictions_before:
-                                                existing_pred = existing_predictions_before.get(match_id) or existing_predictions_before.get(str(match_id))
-                                                if existing_pred and (existing_pred.get('home', 0) != 0 or existing_pred.get('away', 0) != 0):
-                                                    # Istniejący typ nie jest "0-0" - nie zeruj go
-                                                    logger.info(f"Pomijam zapis '0-0' dla meczu {match_id} - istnieje typ {existing_pred.get('home', 0)}-{existing_pred.get('away', 0)}")
-                                                    continue
-                                        
-                                        # Sprawdź czy mecz już się rozpoczął
-                                        match_date = match.get('match_date')
-                                        can_add = True
-                                        
-                                        if match_date:
-                                            try:
-                                                match_dt = datetime.strptime(match_date, "%Y-%m-%d %H:%M:%S")
-                                                if datetime.now() >= match_dt:
-                                                    can_add = allow_historical
-                                                    if not can_add:
-                                                        errors.append(f"Mecz {match.get('home_team_name')} vs {match.get('away_team_name')} już rozegrany")
-                                            except Exception:
-                                                pass
-                                        
-                                        if can_add:
-                                            # Sprawdź czy typ już istnieje
-                                            is_update = (match_id in existing_predictions_before or 
-                                                       str(match_id) in existing_predictions_before or
-                                                       (match_id.isdigit() and int(match_id) in existing_predictions_before))
-                                            
-                                            logger.info(f"Zapis typów: Zapisuję typ {parsed} dla meczu {match_id}, is_update={is_update}")
-                                            result = storage.add_prediction(
-                                                round_id,
-                                                selected_player,
-                                                match_id,
-                                                parsed,
-                                                recalculate_totals=False
-                                            )
-                                            
-                                            if result:
-                                                if is_update:
-                                                    updated_count += 1
-                                                else:
-                                                    saved_count += 1
-                                                    logger.info(f"Zapis typów: ✅ Zapisano typ dla meczu {match_id}")
-                                            else:
-                                                errors.append(f"Błąd zapisu dla {match.get('home_team_name')} vs {match.get('away_team_name')}")
-                                                logger.error(f"Zapis typów: ❌ Błąd zapisu dla meczu {match_id}")
+                                    # Sprawdź czy mecz już się rozpoczął
+                                    if match_id in save_editable_ids:
+                                        predictions_to_save[match_id] = parsed
                                     else:
-                                        errors.append(f"Nieprawidłowy format dla {match.get('home_team_name')} vs {match.get('away_team_name')}")
-                                        logger.warning(f"Zapis typów: Nieprawidłowy format '{pred_input}' dla meczu {match_id}")
+                                        errors.append(f"Mecz {match.get('home_team_name')} vs {match.get('away_team_name')} już rozegrany")
                                 else:
-                                    # Jeśli nie ma wartości w session_state, ale istnieje typ w danych, zachowaj go
-                                    # (to chroni przed utratą typów z bulk, które nie są w session_state)
-                                    if match_id in existing_predictions_before or str(match_id) in existing_predictions_before:
-                                        # Typ istnieje, ale nie ma wartości w session_state - nie rób nic (zachowaj istniejący)
-                                        logger.info(f"Zapis typów: Mecz {match_id} nie ma wartości w session_state, ale typ istnieje - zachowuję")
-                                        pass
-                                    else:
-                                        logger.info(f"Zapis typów: Mecz {match_id} nie ma wartości w session_state i nie ma istniejącego typu - pomijam")
+                                    errors.append(f"Nieprawidłowy format dla {match.get('home_team_name')} vs {match.get('away_team_name')}")
+                                    logger.warning("Zapis typów: Nieprawidłowy format '%s' dla meczu %s", pred_input, match_id)
+                            
+                            # Jeden upsert wszystkich typów (nowe i zaktualizowane liczone przez storage)
+                            if predictions_to_save:
+                                saved_count, updated_count = storage.add_predictions_batch(round_id, selected_player, predictions_to_save)
+                                if saved_count + updated_count == 0:
+                                    errors.append(f"Błąd zapisu typów dla rundy {round_id}")
                                 
                             total_saved = saved_count + updated_count
                             if total_saved > 0:
                                 # Przelicz punkty dla wszystkich meczów z wynikami w tej rundzie
                                 # NIE przeładowujemy danych - używamy aktualnych danych z storage
-                                round_data = storage.data['rounds'].get(round_id, {})
+                                round_data = storage.get_round_snapshot(round_id)
                                 round_matches = round_data.get('matches', [])
-                                recalculated_matches = 0
-                                for match in round_matches:
-                                    match_id = str(match.get('match_id', ''))
-                                    home_goals = match.get('home_goals')
-                                    away_goals = match.get('away_goals')
-                                    if home_goals is not None and away_goals is not None:
-                                        # Przelicz punkty dla tego meczu (dla wszystkich graczy z typami)
-                                        try:
-                                            storage.update_match_result(
-                                                round_id,
-                                                match_id,
-                                                int(home_goals),
-                                                int(away_goals),
-                                                save=False,
-                                                recalculate_totals=False
-                                            )
-                                            recalculated_matches += 1
-                                        except Exception as e:
-                                            logger.error(f"Błąd przeliczania punktów dla meczu {match_id}: {e}")
-
-                                storage._recalculate_player_totals(season_id=selected_season_id, save=False)
+                                # Punkty wszystkich rozegranych meczów przeliczane jednym wywołaniem (sumy i zapis raz)
+                                storage.update_match_results_bulk(
+                                    round_id,
+                                    [
+                                        (str(match.get('match_id', '')), int(match['home_goals']), int(match['away_goals']))
+                                        for match in round_matches
+                                        if match.get('home_goals') is not None and match.get('away_goals') is not None
+                                    ],
+                                    season_id=selected_season_id
+                                )
                                 
                                 if updated_count > 0 and saved_count > 0:
                                     st.success(f"✅ Zapisano {saved_count} nowych typów, zaktualizowano {updated_count} typów")
@@ -2558,10 +2310,14 @@ def main():
                                 logger.info("Zapis typów (pojedyncze): Wymuszam zapis danych")
                                 storage.flush_save()
                                 
+                                st.session_state[saved_hash_key] = get_predictions_form_hash(
+                                    form_values,
+                                    storage.get_player_predictions(selected_player, round_id, season_id=selected_season_id)
+                                )
+                                
+                                # Rerun po każdym zapisie - ranking i szczegóły typów wyżej na stronie muszą pokazać nowe typy
                                 # Ustaw flagę odświeżenia w session_state (będzie użyta przy następnym renderowaniu)
                                 st.session_state['_refresh_predictions'] = True
-                                
-                                # Odśwież ekran, aby zaktualizować ikony statusu (✅/❌)
                                 st.rerun()
                             else:
                                 if errors:
@@ -2569,12 +2325,22 @@ def main():
                                 else:
                                     st.warning("⚠️ Wprowadź typy przed zapisem")
                         elif delete_types_submitted:
-                            if storage.delete_player_predictions(round_id, selected_player):
+                            # Typy rozegranych meczów są chronione, chyba że włączono typy historyczne
+                            locked_match_ids = set(match_datetimes) - editable_match_ids
+                            deletable_ids = [match_id for match_id in existing_predictions if str(match_id) not in locked_match_ids]
+                            
+                            # Jedno usunięcie wsadowe i jedno przeliczenie sum zamiast operacji per mecz
+                            deleted_count = storage.delete_predictions_batch(round_id, selected_player, deletable_ids, save=False)
+                            if deleted_count > 0:
                                 storage.flush_save()  # Wymuś natychmiastowy zapis
-                                st.success("✅ Usunięto wszystkie typy")
+                                st.success(f"✅ Usunięto {deleted_count} typów")
+                                if len(deletable_ids) < len(existing_predictions):
+                                    st.info("ℹ️ Typy rozegranych meczów zostały zachowane")
                                 # NIE odświeżamy - użytkownik może kontynuować pracę
+                            elif existing_predictions:
+                                st.warning("⚠️ Brak typów do usunięcia - wszystkie dotyczą rozegranych meczów")
                             else:
-                                st.error("❌ Nie udało się usunąć typów")
+                                st.info("ℹ️ Brak typów do usunięcia")
                 
                 with col_bulk:  # Bulk mode
                     with st.form(key=f"tipper_bulk_form_{selected_player}_{round_id}"):
@@ -2600,8 +2366,9 @@ def main():
                             # Parsuj typy z dopasowaniem do meczów
                             parsed = tipper.parse_match_predictions(predictions_text, selected_matches)
                             
-                            logger.info(f"Bulk mode: Sparsowano {len(parsed)} typów z {len(selected_matches)} dostępnych meczów")
-                            logger.info(f"Bulk mode: Sparsowane typy: {list(parsed.keys())}")
+                            logger.debug("Bulk mode: Sparsowano %s typów z %s dostępnych meczów", len(parsed), len(selected_matches))
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Bulk mode: Sparsowane typy: %s", list(parsed.keys()))
                             
                             # Wyświetl dostępne mecze dla debugowania
                             if len(parsed) < len(selected_matches):
@@ -2627,7 +2394,7 @@ def main():
                                     bulk_fill_data[match_id_str] = pred_text
                                     
                                     filled_count += 1
-                                    logger.info(f"Bulk mode: Przygotowano wypełnienie pola dla meczu {match_id_str} wartością {pred_text}")
+                                    logger.debug("Bulk mode: Przygotowano wypełnienie pola dla meczu %s wartością %s", match_id_str, pred_text)
                                 
                                 # Zapisz dane do session_state (będą użyte przy następnym rerun do wypełnienia pól)
                                 st.session_state[bulk_fill_key] = bulk_fill_data
@@ -2656,22 +2423,21 @@ def main():
                     
                     # Pobierz aktualne punkty dla gracza w tej rundzie
                     storage.reload_data()
-                    round_data = storage.data['rounds'].get(round_id, {})
+                    round_data = storage.get_round_snapshot(round_id)
                     match_points_dict = round_data.get('match_points', {}).get(selected_player, {})
                     player_predictions = storage.get_player_predictions(selected_player, round_id, season_id=selected_season_id)
                     
                     if player_predictions:
                         # Sortuj mecze według daty
-                        matches_map = {str(m.get('match_id', '')): m for m in selected_matches}
                         sorted_match_ids = sorted(
                             player_predictions.keys(),
-                            key=lambda mid: matches_map.get(str(mid), {}).get('match_date', '')
+                            key=lambda mid: match_by_id.get(str(mid), {}).get('match_date', '')
                         )
                         
                         # Przygotuj dane do edycji
                         manual_points_data = {}
                         for match_id in sorted_match_ids:
-                            match = matches_map.get(str(match_id), {})
+                            match = match_by_id.get(str(match_id), {})
                             home_team = match.get('home_team_name', '?')
                             away_team = match.get('away_team_name', '?')
                             
@@ -2775,7 +2541,7 @@ def main():
     
     except Exception as e:
         st.error(f"❌ Błąd: {str(e)}")
-        logger.error(f"Błąd typera: {e}", exc_info=True)
+        logger.error("Błąd typera: %s", e, exc_info=True)
 
 
 if __name__ == "__main__":
@@ -14,6 +14,9 @@ from tipper_storage import get_season_file_signatures, get_cached_all_time_leade
 
 logger = logging.getLogger(__name__)
 
+# Jak długo ranking kolejki na stronie logowania może pochodzić z cache
+ROUND_LEADERBOARD_CACHE_TTL_SECONDS = 30
+
 
 def get_effective_selected_players_for_login(storage, season_id: str) -> list[str]:
     """Zwraca aktywną listę graczy dla sezonu; pusty wybór oznacza wszystkich."""
@@ -26,6 +29,18 @@ def get_effective_selected_players_for_login(storage, season_id: str) -> list[st
     return filtered_players if filtered_players else all_players
 
 
+@st.cache_data(ttl=ROUND_LEADERBOARD_CACHE_TTL_SECONDS, show_spinner=False)
+def _get_cached_round_leaderboard(_storage, data_file: str, file_signature, round_id: str) -> list[dict]:
+    """Ranking kolejki liczony raz na wersję pliku sezonu (zapis typów zmienia sygnaturę i unieważnia cache)."""
+    return _storage.get_round_leaderboard(round_id)
+
+
+def get_round_leaderboard_for_login(storage, round_id: str) -> list[dict]:
+    """Zwraca ranking kolejki z cache - strona logowania tworzy nowy storage przy każdym rerunie."""
+    # Ta sama sygnatura pliku (mtime_ns, rozmiar) co przy pomijaniu przeładowań storage
+    return _get_cached_round_leaderboard(storage, storage.data_file, storage._get_local_file_signature(), round_id)
+
+
 def format_season_label(season_id: str) -> str:
     """Formatuje czytelną etykietę sezonu do UI."""
     if season_id and season_id.startswith('season_'):
@@ -84,6 +99,7 @@ def verify_password(password: str, hashed_password: str, salt: str) -> bool:
     return hashed == hashed_password
 
 
+@st.cache_resource(show_spinner=False)
 def load_users() -> Dict[str, Dict[str, str]]:
     """
     Ładuje użytkowników z zmiennych środowiskowych
@@ -101,6 +117,8 @@ def load_users() -> Dict[str, Dict[str, str]]:
     APP_USER_2_PASSWORD_HASH=hash2
     APP_USER_2_PASSWORD_SALT=salt2
     
+    Wynik jest cache'owany raz na proces - .env nie jest parsowany przy każdym rerunie strony logowania.
+    
     Returns:
         Dict z username -> {password_hash, salt}
     """
@@ -234,21 +252,17 @@ def login_page() -> bool:
                     fig.update_layout(xaxis_tickangle=-45, height=400)
                     st.plotly_chart(fig, use_container_width=True, key="login_ranking_overall_chart")
                     
-                    # Statystyki
+                    # Statystyki z jednej agregacji DataFrame rankingu
+                    ranking_stats = df_leaderboard[['Suma', 'Rundy']].agg(['sum', 'mean', 'max'])
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
-                        st.metric("Liczba graczy", len(leaderboard))
+                        st.metric("Liczba graczy", len(df_leaderboard))
                     with col2:
-                        if leaderboard:
-                            st.metric("Najwięcej punktów", leaderboard[0]['total_points'])
+                        st.metric("Najwięcej punktów", int(ranking_stats.at['max', 'Suma']))
                     with col3:
-                        if leaderboard:
-                            avg_points = sum(p['total_points'] for p in leaderboard) / len(leaderboard)
-                            st.metric("Średnia punktów", f"{avg_points:.1f}")
+                        st.metric("Średnia punktów", f"{ranking_stats.at['mean', 'Suma']:.1f}")
                     with col4:
-                        if leaderboard:
-                            total_rounds = sum(p['rounds_played'] for p in leaderboard)
-                            st.metric("Łącznie rund", total_rounds)
+                        st.metric("Łącznie rund", int(ranking_stats.at['sum', 'Rundy']))
                     
                     # Rozbudowane raporty
                     st.markdown("---")
@@ -413,7 +427,7 @@ def login_page() -> bool:
                     # Znajdź ostatnią rozegraną kolejkę (domyślnie)
                     default_round_idx = 0
                     for idx, (round_id, _, _) in enumerate(round_options):
-                        round_data = storage.data['rounds'].get(round_id, {})
+                        round_data = storage.get_round_snapshot(round_id)
                         matches = round_data.get('matches', [])
                         # Sprawdź czy kolejka ma rozegrane mecze
                         has_played = any(
@@ -441,12 +455,12 @@ def login_page() -> bool:
                         round_number = date_to_round_number.get(selected_round_id, '?')
                         
                         # Ranking dla wybranej rundy
-                        round_leaderboard = storage.get_round_leaderboard(selected_round_id)
+                        round_leaderboard = get_round_leaderboard_for_login(storage, selected_round_id)
                         round_leaderboard = [player for player in round_leaderboard if player['player_name'] in selected_players]
                         
                         if round_leaderboard:
                             # Pobierz mecze z rundy dla wyświetlenia typów
-                            round_data = storage.data['rounds'].get(selected_round_id, {})
+                            round_data = storage.get_round_snapshot(selected_round_id)
                             matches = round_data.get('matches', [])
                             matches_map = {str(m.get('match_id', '')): m for m in matches}
                             
@@ -477,58 +491,62 @@ def login_page() -> bool:
                             
                             # Dodaj expandery z typami dla każdego gracza
                             st.markdown("### 📋 Szczegóły typów")
-                            for player in round_leaderboard:
-                                player_name = player['player_name']
-                                player_predictions = storage.get_player_predictions(player_name, selected_round_id)
+                            # Tabele typów budowane tylko na żądanie - zwinięte expandery i tak wykonują swoją treść
+                            if st.checkbox("Pokaż szczegóły typów", key="login_show_types_details"):
+                                predictions_by_player = storage.get_round_player_predictions(
+                                    selected_round_id, [player['player_name'] for player in round_leaderboard]
+                                )
+                                round_match_points = round_data.get('match_points', {})
+                                get_match = matches_map.get
+                                # Kolejność meczów wg daty liczona raz dla rundy, a nie dla każdego gracza
+                                match_order = {
+                                    mid: idx
+                                    for idx, mid in enumerate(sorted(matches_map, key=lambda mid: matches_map[mid].get('match_date') or ''))
+                                }
+                                for player in round_leaderboard:
+                                    player_name = player['player_name']
+                                    player_predictions = predictions_by_player[player_name]
                                 
-                                if player_predictions:
-                                    # Sortuj mecze według daty
-                                    sorted_match_ids = sorted(
-                                        player_predictions.keys(),
-                                        key=lambda mid: matches_map.get(str(mid), {}).get('match_date', '')
-                                    )
+                                    if player_predictions:
+                                        # Punkty gracza pobierane raz, klucze ujednolicone do string (typy mogą mieć klucze int)
+                                        player_match_points = {
+                                            str(match_id): points
+                                            for match_id, points in round_match_points.get(player_name, {}).items()
+                                        }
+                                        # Sortuj mecze według daty
+                                        sorted_match_ids = sorted(player_predictions, key=lambda mid: match_order.get(str(mid), -1))
                                     
-                                    # Przygotuj dane do tabeli
-                                    types_table_data = []
-                                    for match_id in sorted_match_ids:
-                                        match = matches_map.get(str(match_id), {})
-                                        pred = player_predictions[match_id]
-                                        home_team = match.get('home_team_name', '?')
-                                        away_team = match.get('away_team_name', '?')
-                                        pred_home = pred.get('home', 0)
-                                        pred_away = pred.get('away', 0)
+                                        # Przygotuj dane do tabeli
+                                        types_table_data = []
+                                        for match_id in sorted_match_ids:
+                                            match = get_match(str(match_id), {})
+                                            pred = player_predictions[match_id]
+                                            home_team = match.get('home_team_name', '?')
+                                            away_team = match.get('away_team_name', '?')
+                                            pred_home = pred.get('home', 0)
+                                            pred_away = pred.get('away', 0)
                                         
-                                        # Pobierz punkty dla tego meczu
-                                        match_points_dict = round_data.get('match_points', {}).get(player_name, {})
-                                        # Sprawdź zarówno string jak i int jako klucz (używamy get z domyślną wartością None, żeby odróżnić 0 od braku klucza)
-                                        points = None
-                                        if str(match_id) in match_points_dict:
-                                            points = match_points_dict[str(match_id)]
-                                        elif match_id in match_points_dict:
-                                            points = match_points_dict[match_id]
-                                        elif str(match_id).isdigit() and int(match_id) in match_points_dict:
-                                            points = match_points_dict[int(match_id)]
-                                        else:
-                                            points = 0
+                                            # Pobierz punkty dla tego meczu
+                                            points = player_match_points.get(str(match_id), 0)
                                         
-                                        # Pobierz wynik meczu jeśli rozegrany
-                                        home_goals = match.get('home_goals')
-                                        away_goals = match.get('away_goals')
-                                        result = f"{home_goals}-{away_goals}" if home_goals is not None and away_goals is not None else "—"
+                                            # Pobierz wynik meczu jeśli rozegrany
+                                            home_goals = match.get('home_goals')
+                                            away_goals = match.get('away_goals')
+                                            result = f"{home_goals}-{away_goals}" if home_goals is not None and away_goals is not None else "—"
                                         
-                                        types_table_data.append({
-                                            'Mecz': f"{home_team} vs {away_team}",
-                                            'Typ': f"{pred_home}-{pred_away}",
-                                            'Wynik': result,
-                                            'Punkty': points
-                                        })
+                                            types_table_data.append({
+                                                'Mecz': f"{home_team} vs {away_team}",
+                                                'Typ': f"{pred_home}-{pred_away}",
+                                                'Wynik': result,
+                                                'Punkty': points
+                                            })
                                     
-                                    if types_table_data:
-                                        with st.expander(f"👤 {player_name} - Typy i wyniki", expanded=False):
-                                            df_types = pd.DataFrame(types_table_data)
-                                            st.dataframe(df_types, use_container_width=True, hide_index=True)
-                                            total_points = sum(row['Punkty'] for row in types_table_data)
-                                            st.caption(f"**Suma punktów: {total_points}**")
+                                        if types_table_data:
+                                            with st.expander(f"👤 {player_name} - Typy i wyniki", expanded=False):
+                                                df_types = pd.DataFrame(types_table_data)
+                                                st.dataframe(df_types, use_container_width=True, hide_index=True)
+                                                total_points = sum(row['Punkty'] for row in types_table_data)
+                                                st.caption(f"**Suma punktów: {total_points}**")
                             
                             # Wykres rankingu per kolejka
                             if len(round_leaderboard) > 0:
@@ -569,7 +587,7 @@ def login_page() -> bool:
                                     # Pobierz dane z ostatnich 5 kolejek
                                     for i in range(max(0, selected_round_idx - 4), selected_round_idx + 1):
                                         round_id_comp, date_comp, _ = round_options[i]
-                                        round_lb = storage.get_round_leaderboard(round_id_comp)
+                                        round_lb = get_round_leaderboard_for_login(storage, round_id_comp)
                                         round_lb = [player for player in round_lb if player['player_name'] in selected_players]
                                         round_num_comp = date_to_round_number.get(round_id_comp, '?')
                                         
@@ -653,21 +671,17 @@ def login_page() -> bool:
                     fig.update_layout(xaxis_tickangle=-45, height=400)
                     st.plotly_chart(fig, use_container_width=True, key="login_ranking_alltime_chart")
                     
-                    # Statystyki
+                    # Statystyki z jednej agregacji DataFrame rankingu
+                    ranking_stats = df_leaderboard[['Suma', 'Sezony']].agg(['sum', 'mean', 'max'])
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
-                        st.metric("Liczba graczy", len(all_time_leaderboard))
+                        st.metric("Liczba graczy", len(df_leaderboard))
                     with col2:
-                        if all_time_leaderboard:
-                            st.metric("Najwięcej punktów", all_time_leaderboard[0]['total_points'])
+                        st.metric("Najwięcej punktów", int(ranking_stats.at['max', 'Suma']))
                     with col3:
-                        if all_time_leaderboard:
-                            avg_points = sum(p['total_points'] for p in all_time_leaderboard) / len(all_time_leaderboard)
-                            st.metric("Średnia punktów", f"{avg_points:.1f}")
+                        st.metric("Średnia punktów", f"{ranking_stats.at['mean', 'Suma']:.1f}")
                     with col4:
-                        if all_time_leaderboard:
-                            total_seasons = sum(p['seasons_played'] for p in all_time_leaderboard)
-                            st.metric("Łącznie sezonów", total_seasons)
+                        st.metric("Łącznie sezonów", int(ranking_stats.at['sum', 'Sezony']))
                     
                     # Rozbudowane raporty wszechczasów
                     st.markdown("---")
@@ -821,7 +835,7 @@ def login_page() -> bool:
         
         st.markdown("---")
     except Exception as e:
-        logger.error(f"Błąd wyświetlania rankingu: {e}")
+        logger.error("Błąd wyświetlania rankingu: %s", e)
         # Kontynuuj bez rankingu jeśli wystąpi błąd
     
     # Formularz logowania
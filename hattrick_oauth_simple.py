@@ -5,6 +5,7 @@ import requests
 import xml.etree.ElementTree as ET
 from typing import Dict, List, Optional, Any
 import logging
+from requests.adapters import HTTPAdapter
 from requests_oauthlib import OAuth1Session
 import webbrowser
 from urllib.parse import parse_qs
@@ -29,6 +30,17 @@ class HattrickOAuthSimple:
         self.access_token_url = f"{self.base_url}/oauth/access_token.ashx"
         self.api_url = f"{self.base_url}/chppxml.ashx"
     
+    def _create_api_session(self) -> OAuth1Session:
+        """Tworzy sesję API z pulą połączeń keep-alive (klient jest współdzielony między rerunami)"""
+        session = OAuth1Session(
+            self.consumer_key,
+            client_secret=self.consumer_secret,
+            resource_owner_key=self.access_token,
+            resource_owner_secret=self.access_token_secret
+        )
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+        return session
+    
     def get_authorization_url(self) -> Optional[str]:
         """Pobiera URL do autoryzacji"""
         try:
@@ -75,12 +87,7 @@ class HattrickOAuthSimple:
             self.access_token_secret = access_token['oauth_token_secret']
             
             # Utwórz sesję z access token
-            self.session = OAuth1Session(
-                self.consumer_key,
-                client_secret=self.consumer_secret,
-                resource_owner_key=self.access_token,
-                resource_owner_secret=self.access_token_secret
-            )
+            self.session = self._create_api_session()
             
             return {
                 'oauth_token': self.access_token,
@@ -97,12 +104,7 @@ class HattrickOAuthSimple:
         self.access_token_secret = access_token_secret
         
         # Utwórz sesję z tokenami
-        self.session = OAuth1Session(
-            self.consumer_key,
-            client_secret=self.consumer_secret,
-            resource_owner_key=self.access_token,
-            resource_owner_secret=self.access_token_secret
-        )
+        self.session = self._create_api_session()
     
     def make_api_request(self, file: str, params: Dict[str, str] = None) -> Optional[ET.Element]:
         """Wykonuje zapytanie do API CHPP"""
@@ -375,15 +377,15 @@ class HattrickOAuthSimple:
         if root is None:
             return None
         
-        # Debug: zapisz surowy XML do pliku
-        try:
-            import xml.etree.ElementTree as ET
-            xml_string = ET.tostring(root, encoding='unicode')
-            with open(f'match_{match_id}_debug.xml', 'w', encoding='utf-8') as f:
-                f.write(xml_string)
-            logger.info(f"Zapisano surowy XML do pliku match_{match_id}_debug.xml")
-        except Exception as e:
-            logger.error(f"Błąd zapisu XML: {e}")
+        # Debug: zapisz surowy XML do pliku (tylko przy włączonym DEBUG - bez zapisu na dysk przy każdym zapytaniu)
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                xml_string = ET.tostring(root, encoding='unicode')
+                with open(f'match_{match_id}_debug.xml', 'w', encoding='utf-8') as f:
+                    f.write(xml_string)
+                logger.debug(f"Zapisano surowy XML do pliku match_{match_id}_debug.xml")
+            except Exception as e:
+                logger.error(f"Błąd zapisu XML: {e}")
         
         # Parsuj szczegółowe dane meczu
         match_details = {
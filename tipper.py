@@ -5,6 +5,7 @@ import re
 from typing import Dict, Optional, Tuple, List
 from datetime import datetime
 import logging
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,7 @@ class Tipper:
     """Klasa obsługująca logikę typera"""
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def parse_prediction(prediction_text: str) -> Optional[Tuple[int, int]]:
         """
         Parsuje typ z tekstu w różnych formatach
@@ -163,6 +165,25 @@ class Tipper:
     
     @staticmethod
     def parse_match_predictions(text: str, matches: List[Dict]) -> Dict[str, Tuple[int, int]]:
+        """Parsuje typy z tekstu; wynik cache'owany po tekście i (match_id, gospodarze, goście) meczów"""
+        match_keys = tuple(
+            (str(match.get('match_id', '')), match.get('home_team_name', ''), match.get('away_team_name', ''))
+            for match in matches
+        )
+        return dict(Tipper._parse_match_predictions_cached(text, match_keys))
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _parse_match_predictions_cached(text: str, match_keys: Tuple[Tuple[str, str, str], ...]) -> Tuple[Tuple[str, Tuple[int, int]], ...]:
+        """Wersja cache'owana - zwraca niemutowalną krotkę, żeby wywołujący nie zmieniali wpisu w cache"""
+        matches = [
+            {'match_id': match_id, 'home_team_name': home_name, 'away_team_name': away_name}
+            for match_id, home_name, away_name in match_keys
+        ]
+        return tuple(Tipper._match_predictions_from_text(text, matches).items())
+    
+    @staticmethod
+    def _match_predictions_from_text(text: str, matches: List[Dict]) -> Dict[str, Tuple[int, int]]:
         """
         Parsuje typy w formacie: "Nazwa drużyny1 - Nazwa drużyny2 Wynik"
         i dopasowuje je do meczów na podstawie nazw drużyn
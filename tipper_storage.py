@@ -1,22 +1,30 @@
 """
 Moduł przechowywania danych typera
 """
+import copy
 import json
 import os
 import glob
 import re
 import hashlib
+import base64
 import time
+import threading
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import logging
-from functools import lru_cache
+from functools import lru_cache, wraps
+from urllib.parse import quote
+
+from tipper import Tipper
 
 logger = logging.getLogger(__name__)
 
 # Ścieżka do pliku z danymi typera
 TIPPER_DATA_FILE = "tipper_data.json"
 DEFAULT_GITHUB_BACKUP_INTERVAL_SECONDS = 3600
+# Stały szablon URL API GitHub - wartości z konfiguracji wstawiane jako zakodowane segmenty ścieżki
+GITHUB_CONTENTS_URL_TEMPLATE = "https://api.github.com/repos/{owner}/{repo}/contents/{path}"
 
 
 def default_exclude_worst_rule(season_id: str) -> bool:
@@ -40,6 +48,34 @@ def season_uses_worst_score_rule(season_id: str, season_data: Optional[Dict] = N
     return default_exclude_worst_rule(season_id)
 
 
+@lru_cache(maxsize=1)
+def get_github_http_session():
+    """Zwraca współdzieloną sesję HTTP do GitHub API (pula połączeń zamiast nowego TLS przy każdym zapisie)."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+    return session
+
+
+@lru_cache(maxsize=1)
+def load_env_file_once():
+    """Wczytuje .env raz na proces (bez nadpisywania już ustawionych zmiennych środowiskowych)."""
+    from dotenv import load_dotenv
+    load_dotenv(override=False)
+
+
+@lru_cache(maxsize=32)
+def get_streamlit_secret(name: str) -> str:
+    """Zwraca wartość ze Streamlit Secrets (parsowanie TOML raz na proces); pusty string gdy brak."""
+    try:
+        import streamlit as st
+        return st.secrets.get(name, '')
+    except Exception:
+        return ''
+
+
 def get_season_file_signatures(base_dir: str = None) -> tuple:
     """Zwraca sygnatury plików sezonów do cache'owania obliczeń."""
     search_dir = base_dir or os.getcwd()
@@ -133,6 +169,15 @@ def get_cached_all_time_leaderboard(file_signatures: tuple, exclude_worst: bool
     return leaderboard
 
 
+def _synchronized(method):
+    """Wykonuje metodę storage pod blokadą instancji - storage jest współdzielony przez sesje (wątki)."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class TipperStorage:
     """Klasa do przechowywania i zarządzania danymi typera"""
 
@@ -172,8 +217,6 @@ class TipperStorage:
             # Wyciągnij numer sezonu (np. "season_80" -> "80")
             if season_id == "current_season":
                 # Dla current_season użyj najwyższego numeru sezonu z dostępnych plików
-                import glob
-                import re
                 pattern = os.path.join(os.getcwd(), "tipper_data_season_*.json")
                 files = glob.glob(pattern)
                 season_nums = []
@@ -208,15 +251,27 @@ class TipperStorage:
         self._last_github_backup_time = 0.0
         self._last_github_backup_hash = ""
         self._has_unsynced_changes = False
+        self._local_file_signature = None
+        self._last_written_hash = None
+        # Storage jest współdzielony przez wiele sesji (wątków) - zmiany danych, przeładowanie
+        # i serializacja migawki wykonywane pod jedną blokadą (RLock - metody wywołują się nawzajem)
+        self._lock = threading.RLock()
+        # Licznik zmian danych w pamięci - klucz cache dla wyników liczonych z self.data (np. rankingu).
+        # Podbijany przez _mark_data_changed w każdej metodzie zmieniającej dane (także partiach bez _save_data)
+        # i przy każdym faktycznym zapisie pliku (flush_save / _do_save)
+        self._data_revision = 0
         self.data = self._load_data()
+        self._local_file_signature = self._get_local_file_signature()
+        # Rewizja startuje od wersji pliku (mtime w ns) - nowa instancja (np. po wyczyszczeniu cache_resource)
+        # nie trafi we wpis cache policzony przez poprzednią instancję z licznikiem od zera
+        self._data_revision = self._local_file_signature[0] if self._local_file_signature else 0
         self._initialize_sync_state()
     
     def _get_github_config(self) -> Optional[Dict]:
         """Pobiera konfigurację GitHub API z .env lub Streamlit Secrets"""
         try:
             # Najpierw spróbuj z .env (dla lokalnego rozwoju)
-            from dotenv import load_dotenv
-            load_dotenv()
+            load_env_file_once()
             
             github_token = os.getenv('GITHUB_TOKEN')
             github_repo_owner = os.getenv('GITHUB_REPO_OWNER')
@@ -224,13 +279,9 @@ class TipperStorage:
             
             # Jeśli nie ma w .env, spróbuj z Streamlit Secrets (dla Streamlit Cloud)
             if not github_token:
-                try:
-                    import streamlit as st
-                    github_token = st.secrets.get('GITHUB_TOKEN', '')
-                    github_repo_owner = st.secrets.get('GITHUB_REPO_OWNER', '')
-                    github_repo_name = st.secrets.get('GITHUB_REPO_NAME', '')
-                except Exception:
-                    pass
+                github_token = get_streamlit_secret('GITHUB_TOKEN')
+                github_repo_owner = get_streamlit_secret('GITHUB_REPO_OWNER')
+                github_repo_name = get_streamlit_secret('GITHUB_REPO_NAME')
             
             # Jeśli wszystkie wymagane wartości są dostępne, zwróć konfigurację
             if github_token and github_repo_owner and github_repo_name:
@@ -307,29 +358,44 @@ class TipperStorage:
             return None
 
     def _serialize_data(self, data: Optional[Dict] = None) -> str:
-        """Serializuje dane do stabilnej postaci JSON."""
-        return json.dumps(data if data is not None else self.data, ensure_ascii=False, indent=2)
+        """Serializuje dane do stabilnej postaci JSON (pod blokadą - inne sesje nie zmienią danych w trakcie)."""
+        with self._lock:
+            return json.dumps(data if data is not None else self.data, ensure_ascii=False, indent=2)
 
     def _calculate_data_hash(self, data: Optional[Dict] = None) -> str:
         """Oblicza hash bieżącego stanu danych do śledzenia synchronizacji."""
         json_content = self._serialize_data(data)
         return hashlib.sha256(json_content.encode('utf-8')).hexdigest()
 
-    def _write_local_data(self, data: Optional[Dict] = None):
-        """Zapisuje dane do lokalnego pliku roboczego."""
+    def _write_local_data(self, data: Optional[Dict] = None) -> bool:
+        """Zapisuje dane do lokalnego pliku roboczego; zwraca False, gdy treść się nie zmieniła i zapis pominięto."""
         abs_path = os.path.abspath(self.data_file)
-        json_content = self._serialize_data(data)
 
-        logger.info(f"_write_local_data: Zapisuję lokalnie do pliku {abs_path}")
+        with self._lock:
+            json_content = self._serialize_data(data)
+            content_hash = hashlib.sha256(json_content.encode('utf-8')).hexdigest()
+
+            # Flaga "dirty": ta sama treść co przy ostatnim zapisie i plik niezmieniony z zewnątrz - nie zapisuj ponownie
+            if content_hash == self._last_written_hash and self._get_local_file_signature() == self._local_file_signature:
+                logger.debug("_write_local_data: Brak zmian w danych, pomijam zapis do %s", abs_path)
+                return False
+
+            logger.info("_write_local_data: Zapisuję lokalnie do pliku %s", abs_path)
 
-        with open(abs_path, 'w', encoding='utf-8') as file_handle:
-            file_handle.write(json_content)
+            # Zapis do pliku tymczasowego i atomowa podmiana - cała partia zmian trafia na dysk naraz
+            tmp_path = f"{abs_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file_handle:
+                file_handle.write(json_content)
+            os.replace(tmp_path, abs_path)
+            self._local_file_signature = self._get_local_file_signature()
+            self._last_written_hash = content_hash
 
         if os.path.exists(abs_path):
             file_size = os.path.getsize(abs_path)
-            logger.debug(f"Plik zapisany poprawnie, rozmiar: {file_size} bajtów")
+            logger.debug("Plik zapisany poprawnie, rozmiar: %s bajtów", file_size)
         else:
-            logger.warning(f"Plik {abs_path} nie istnieje po zapisie (może być normalne na Streamlit Cloud)")
+            logger.warning("Plik %s nie istnieje po zapisie (może być normalne na Streamlit Cloud)", abs_path)
+        return True
 
     def _load_sync_metadata(self) -> Dict:
         """Ładuje metadane ostatniej synchronizacji z GitHub."""
@@ -393,6 +459,7 @@ class TipperStorage:
 
         return (time.time() - self._last_github_backup_time) >= self._github_backup_interval_seconds
 
+    @_synchronized
     def maybe_backup_to_github(self) -> bool:
         """Wykonuje okresowy backup do GitHub, jeśli lokalny stan nie jest jeszcze zsynchronizowany."""
         if not self._should_run_periodic_github_backup():
@@ -429,7 +496,6 @@ class TipperStorage:
             if target_season_id == "current_season":
                 # Najpierw sprawdź czy w danych jest sezon "season_XX" (na podstawie nazwy pliku)
                 # Wyciągnij numer sezonu z nazwy pliku
-                import re
                 filename = os.path.basename(self.data_file)
                 match = re.search(r'tipper_data_season_(\d+)\.json', filename)
                 if match:
@@ -518,7 +584,6 @@ class TipperStorage:
         try:
             from github import Github
             from github.Auth import Token
-            import base64
             
             # Połącz z GitHub używając nowego API autoryzacji
             auth = Token(self.github_config['token'])
@@ -541,9 +606,36 @@ class TipperStorage:
             logger.debug(f"Nie udało się załadować z GitHub (może plik nie istnieje): {e}")
             return None
     
+    def _get_local_file_signature(self) -> Optional[Tuple[int, int]]:
+        """Zwraca wersję lokalnego pliku (mtime, rozmiar) lub None, jeśli plik nie istnieje."""
+        try:
+            file_stat = os.stat(self.data_file)
+        except OSError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    @property
+    def data_revision(self) -> int:
+        """Numer rewizji danych w pamięci; rośnie przy każdej zmianie, zapisie i przeładowaniu"""
+        return self._data_revision
+
+    def _mark_data_changed(self):
+        """Podbija rewizję danych - wywoływane przez każdą metodę zmieniającą self.data (pod blokadą)"""
+        self._data_revision += 1
+
+    @_synchronized
     def reload_data(self, prefer_github: bool = False):
         """Przeładowuje dane z pliku; domyślnie z lokalnego stanu aplikacji."""
+        # Plik nie zmienił się od ostatniego odczytu/zapisu i nie ma oczekujących zmian - dane w pamięci są aktualne
+        if not prefer_github and not self._pending_save:
+            current_signature = self._get_local_file_signature()
+            if current_signature is not None and current_signature == self._local_file_signature:
+                logger.debug("Pomijam przeładowanie danych - plik bez zmian")
+                return
+
         self.data = self._load_data(prefer_github=prefer_github)
+        self._mark_data_changed()
+        self._local_file_signature = self._get_local_file_signature()
         self._initialize_sync_state()
         logger.info("Przeładowano dane z pliku")
     
@@ -559,6 +651,13 @@ class TipperStorage:
             }
         }
     
+    @_synchronized
+    def replace_data(self, data: Dict):
+        """Podmienia wszystkie dane storage (import) i od razu je zapisuje."""
+        self.data = data
+        self._save_data(force=True)
+
+    @_synchronized
     def _save_data(self, force: bool = False):
         """
         Zapisuje dane do pliku JSON - lokalnie lub przez GitHub API
@@ -567,6 +666,7 @@ class TipperStorage:
         """
         current_time = time.time()
         self._has_unsynced_changes = True
+        self._mark_data_changed()
         
         # Jeśli force=True, zapisz natychmiast
         if force:
@@ -588,31 +688,39 @@ class TipperStorage:
         else:
             # Zaplanuj zapis za pozostały czas
             remaining_time = self._save_delay - time_since_last_save
-            logger.debug(f"Opóźniam zapis o {remaining_time:.2f} sekund (debounce)")
+            logger.debug("Opóźniam zapis o %.2f sekund (debounce)", remaining_time)
     
-    def _do_save(self):
-        """Wykonuje faktyczny zapis danych"""
+    @_synchronized
+    def _do_save(self) -> bool:
+        """Wykonuje faktyczny zapis danych; zwraca False, gdy dane się nie zmieniły"""
         try:
-            self._write_local_data()
-
-            # Loguj szczegóły zapisu
-            rounds_count = len(self.data.get('rounds', {}))
-            total_predictions = 0
-            for round_id, round_data in self.data.get('rounds', {}).items():
-                predictions = round_data.get('predictions', {})
-                for player_name, player_predictions in predictions.items():
-                    total_predictions += len(player_predictions)
-                    logger.info(f"_do_save: Runda {round_id}, gracz {player_name}: {len(player_predictions)} typów, match_ids: {list(player_predictions.keys())[:5]}")
-            
-            logger.info(f"_do_save: Zapisano dane do pliku {self.data_file}: {rounds_count} rund, {total_predictions} typów")
-            logger.info(f"_do_save: Szczegóły: {len(self.data.get('seasons', {}))} sezonów")
+            if not self._write_local_data():
+                return False
+            # Zapisana treść różni się od poprzedniej - także zmiany wprowadzone bezpośrednio w self.data
+            self._mark_data_changed()
+
+            # Szczegóły zapisu liczone tylko przy włączonym DEBUG - nie obciążają ścieżki zapisu
+            if logger.isEnabledFor(logging.DEBUG):
+                rounds_count = len(self.data.get('rounds', {}))
+                total_predictions = 0
+                for round_id, round_data in self.data.get('rounds', {}).items():
+                    predictions = round_data.get('predictions', {})
+                    for player_name, player_predictions in predictions.items():
+                        total_predictions += len(player_predictions)
+                        logger.debug("_do_save: Runda %s, gracz %s: %s typów, match_ids: %s", round_id, player_name, len(player_predictions), list(player_predictions.keys())[:5])
+                
+                logger.debug("_do_save: Zapisano dane do pliku %s: %s rund, %s typów", self.data_file, rounds_count, total_predictions)
+                logger.debug("_do_save: Szczegóły: %s sezonów", len(self.data.get('seasons', {})))
 
             if self._should_run_periodic_github_backup():
                 self._backup_local_state_to_github(reason='periodic')
+            return True
                 
         except IOError as e:
-            logger.error(f"Błąd zapisywania danych typera: {e}")
+            logger.error("Błąd zapisywania danych typera: %s", e)
+            return False
     
+    @_synchronized
     def flush_save(self):
         """Wymusza natychmiastowy zapis wszystkich oczekujących zmian"""
         # Zawsze zapisz, nawet jeśli nie ma pending_save (może być opóźnienie w debounce)
@@ -620,31 +728,36 @@ class TipperStorage:
         self._last_save_time = time.time()
         self._has_unsynced_changes = True
         
-        # Loguj przed zapisem - sprawdź ile typów jest w każdej rundzie
-        logger.info(f"flush_save: Zapisuję do pliku {self.data_file}")
-        logger.info(f"flush_save: Absolutna ścieżka: {os.path.abspath(self.data_file)}")
-        for round_id, round_data in self.data.get('rounds', {}).items():
-            predictions = round_data.get('predictions', {})
-            for player_name, player_predictions in predictions.items():
-                logger.info(f"flush_save: Runda {round_id}, gracz {player_name}: {len(player_predictions)} typów, match_ids: {list(player_predictions.keys())}")
+        # Loguj przed zapisem - sprawdź ile typów jest w każdej rundzie (tylko przy włączonym DEBUG)
+        logger.debug("flush_save: Zapisuję do pliku %s", self.data_file)
+        if logger.isEnabledFor(logging.DEBUG):
+            for round_id, round_data in self.data.get('rounds', {}).items():
+                predictions = round_data.get('predictions', {})
+                for player_name, player_predictions in predictions.items():
+                    logger.debug("flush_save: Runda %s, gracz %s: %s typów, match_ids: %s", round_id, player_name, len(player_predictions), list(player_predictions.keys()))
         
         self._do_save()
-        if self.github_config and self._has_unsynced_changes:
+        # Backup do GitHub niezależnie od lokalnego zapisu (wcześniejszy zapis z debounce mógł już zapisać tę treść);
+        # pomijany tylko, gdy ta sama treść jest już w GitHub
+        if (
+            self.github_config
+            and self._has_unsynced_changes
+            and self._calculate_data_hash() != self._last_github_backup_hash
+        ):
             self._backup_local_state_to_github(reason='manual')
-        logger.info("flush_save: Wymuszono natychmiastowy zapis danych")
+        logger.debug("flush_save: Wymuszono natychmiastowy zapis danych")
         
-        # Sprawdź czy plik został zapisany
-        if os.path.exists(self.data_file):
-            file_size = os.path.getsize(self.data_file)
-            logger.info(f"flush_save: Plik zapisany, rozmiar: {file_size} bajtów")
+        # Sprawdź czy plik został zapisany (sygnatura pliku jest już znana po zapisie)
+        if self._local_file_signature is not None:
+            logger.debug("flush_save: Plik zapisany, rozmiar: %s bajtów", self._local_file_signature[1])
         else:
-            logger.error(f"flush_save: BŁĄD - plik {self.data_file} nie istnieje po zapisie!")
+            logger.error("flush_save: BŁĄD - plik %s nie istnieje po zapisie!", self.data_file)
     
+    @_synchronized
     def _save_to_github(self) -> bool:
         """Zapisuje dane do GitHub przez API (używa REST API bezpośrednio dla lepszej kompatybilności)"""
         try:
-            import requests
-            import base64
+            http = get_github_http_session()
             
             # Przygotuj zawartość JSON
             json_content = json.dumps(self.data, ensure_ascii=False, indent=2)
@@ -655,7 +768,11 @@ class TipperStorage:
             file_path = os.path.basename(self.data_file)
             
             # URL do API GitHub
-            url = f"https://api.github.com/repos/{self.github_config['repo_owner']}/{self.github_config['repo_name']}/contents/{file_path}"
+            url = GITHUB_CONTENTS_URL_TEMPLATE.format(
+                owner=quote(self.github_config['repo_owner'], safe=''),
+                repo=quote(self.github_config['repo_name'], safe=''),
+                path=quote(file_path)
+            )
             
             headers = {
                 "Authorization": f"token {self.github_config['token']}",
@@ -664,7 +781,7 @@ class TipperStorage:
             }
             
             # Sprawdź czy plik już istnieje
-            response = requests.get(url, headers=headers)
+            response = http.get(url, headers=headers)
             
             if response.status_code == 200:
                 # Plik istnieje - zaktualizuj go
@@ -677,7 +794,7 @@ class TipperStorage:
                     "sha": sha
                 }
                 
-                response = requests.put(url, headers=headers, json=data)
+                response = http.put(url, headers=headers, json=data)
                 
                 if response.status_code == 200:
                     logger.info(f"✅ Zaktualizowano plik {file_path} w GitHub (repo: {self.github_config['repo_owner']}/{self.github_config['repo_name']})")
@@ -700,7 +817,7 @@ class TipperStorage:
                     "content": json_b64
                 }
                 
-                response = requests.put(url, headers=headers, json=data)
+                response = http.put(url, headers=headers, json=data)
                 
                 if response.status_code == 201:
                     logger.info(f"✅ Utworzono plik {file_path} w GitHub (repo: {self.github_config['repo_owner']}/{self.github_config['repo_name']})")
@@ -723,19 +840,35 @@ class TipperStorage:
             logger.error(f"Szczegóły: {error_msg}")
             return False
     
-    def add_league(self, league_id: int, league_name: str = None):
-        """Dodaje ligę do systemu"""
+    @_synchronized
+    def add_league(self, league_id: int, league_name: str = None, save: bool = True) -> bool:
+        """Dodaje ligę do systemu; zwraca True, gdy liga została dodana lub zmieniła nazwę"""
         league_key = str(league_id)
         if league_key not in self.data['leagues']:
             self.data['leagues'][str(league_id)] = {
                 'name': league_name or f"Liga {league_id}",
                 'seasons': []
             }
-            self._save_data()
         elif league_name and self.data['leagues'][league_key].get('name') != league_name:
             self.data['leagues'][league_key]['name'] = league_name
+        else:
+            return False
+        
+        if save:
             self._save_data()
+        return True
+    
+    @_synchronized
+    def add_leagues(self, league_names: Dict[int, str]) -> bool:
+        """Dodaje (lub aktualizuje nazwy) wielu lig i zapisuje raz - tylko gdy coś się zmieniło; zwraca True przy zmianie"""
+        changed = False
+        for league_id, league_name in league_names.items():
+            changed = self.add_league(league_id, league_name, save=False) or changed
+        if changed:
+            self._save_data()
+        return changed
     
+    @_synchronized
     def add_season(self, league_id: int, season_id: str, start_date: str = None, end_date: str = None):
         """Dodaje sezon do ligi"""
         league_key = str(league_id)
@@ -760,6 +893,12 @@ class TipperStorage:
     
     def add_round(self, season_id: str, round_id: str, matches: List[Dict], start_date: str = None):
         """Dodaje rundę do sezonu"""
+        self.add_rounds_bulk(season_id, {round_id: matches}, {round_id: start_date})
+    
+    @_synchronized
+    def add_rounds_bulk(self, season_id: str, rounds_map: Dict[str, List[Dict]], start_dates: Optional[Dict[str, str]] = None) -> int:
+        """Dodaje wiele rund do sezonu jednym zapisem; zwraca liczbę nowych rund"""
+        start_dates = start_dates or {}
         if season_id not in self.data['seasons']:
             # Automatycznie utwórz sezon jeśli nie istnieje
             logger.info(f"Tworzenie sezonu {season_id}")
@@ -776,8 +915,13 @@ class TipperStorage:
                 'archived': False
             }
         
-        if round_id not in self.data['rounds']:
+        added_count = 0
+        for round_id, matches in rounds_map.items():
+            if round_id in self.data['rounds']:
+                continue
+            
             # Znajdź najwcześniejszą datę meczu
+            start_date = start_dates.get(round_id)
             if not start_date and matches:
                 match_dates = [m.get('match_date') for m in matches if m.get('match_date')]
                 if match_dates:
@@ -790,8 +934,12 @@ class TipperStorage:
                 'predictions': {}  # {player_name: {match_id: (home, away)}}
             }
             self.data['seasons'][season_id]['rounds'].append(round_id)
-            # Nowa runda musi być zapisana natychmiast, bo kolejne reruny używają reload_data().
+            added_count += 1
+        
+        if added_count:
+            # Nowe rundy muszą być zapisane natychmiast, bo kolejne reruny używają reload_data().
             self._save_data(force=True)
+        return added_count
     
     def _get_season_players(self, season_id: str = None) -> Dict:
         """Zwraca słownik graczy dla danego sezonu"""
@@ -817,6 +965,7 @@ class TipperStorage:
         
         return self.data['seasons'][season_id]['players']
     
+    @_synchronized
     def add_prediction(
         self,
         round_id: str,
@@ -825,119 +974,134 @@ class TipperStorage:
         prediction: tuple,
         recalculate_totals: bool = True
     ):
-        """Dodaje lub aktualizuje typ gracza dla meczu (tylko jeden typ na gracza i mecz)."""
-        if round_id not in self.data['rounds']:
-            logger.error(f"Runda {round_id} nie istnieje")
+        """Dodaje lub aktualizuje typ gracza dla meczu (tylko jeden typ na gracza i mecz) - jednoelementowa partia."""
+        created_count, updated_count = self.add_predictions_batch(round_id, player_name, {match_id: prediction})
+        if created_count + updated_count == 0:
             return False
         
-        # Pobierz sezon z rundy
+        if recalculate_totals:
+            season_id = self.data['rounds'][round_id].get('season_id', self.season_id)
+            self._recalculate_player_totals(season_id=season_id, player_names=[player_name])
+        return True
+    
+    @_synchronized
+    def add_predictions_batch(self, round_id: str, player_name: str, predictions: Dict[str, tuple]) -> Tuple[int, int]:
+        """Dodaje lub nadpisuje (upsert) typy gracza dla wielu meczów rundy; zwraca (nowe, zaktualizowane)."""
+        if round_id not in self.data['rounds']:
+            logger.error("Runda %s nie istnieje", round_id)
+            return 0, 0
+        
         round_data = self.data['rounds'][round_id]
         season_id = round_data.get('season_id', self.season_id)
-        
-        # Pobierz graczy dla sezonu
         players = self._get_season_players(season_id)
-        
         if player_name not in players:
             players[player_name] = self._build_player_entry()
         
-        # Dodaj lub aktualizuj typ do rundy
-        if 'predictions' not in self.data['rounds'][round_id]:
-            self.data['rounds'][round_id]['predictions'] = {}
-        
-        if player_name not in self.data['rounds'][round_id]['predictions']:
-            self.data['rounds'][round_id]['predictions'][player_name] = {}
-        
-        # Użyj string jako klucz dla spójności
-        match_id_str = str(match_id)
-        
-        # Nadpisz istniejący typ (lub dodaj nowy)
-        self.data['rounds'][round_id]['predictions'][player_name][match_id_str] = {
-            'home': prediction[0],
-            'away': prediction[1],
-            'timestamp': datetime.now().isoformat()
-        }
-        logger.info(f"add_prediction: Zapisano typ {prediction} dla gracza {player_name}, mecz {match_id_str}, runda {round_id}")
-        logger.info(f"add_prediction: Łącznie typów w rundzie dla {player_name}: {len(self.data['rounds'][round_id]['predictions'][player_name])}, match_ids: {list(self.data['rounds'][round_id]['predictions'][player_name].keys())}")
-        
-        # Dodaj lub aktualizuj typ do gracza (w sezonie)
-        if round_id not in players[player_name]['predictions']:
-            players[player_name]['predictions'][round_id] = {}
-        
-        # Nadpisz istniejący typ (lub dodaj nowy)
-        players[player_name]['predictions'][round_id][match_id_str] = {
-            'home': prediction[0],
-            'away': prediction[1],
-            'timestamp': datetime.now().isoformat()
-        }
-        logger.info(f"add_prediction: Zapisano typ do struktury gracza, łącznie typów w rundzie: {len(self.data['rounds'][round_id]['predictions'][player_name])}")
-        
-        # Sprawdź czy mecz jest rozegrany i przelicz punkty (zarówno dla nowych jak i zaktualizowanych typów)
-        matches = self.data['rounds'][round_id].get('matches', [])
-        for match in matches:
-            if str(match.get('match_id')) == match_id_str:
-                home_goals = match.get('home_goals')
-                away_goals = match.get('away_goals')
-                if home_goals is not None and away_goals is not None:
-                    # Przelicz punkty dla typu (zarówno nowego jak i zaktualizowanego)
-                    from tipper import Tipper
-                    points = Tipper.calculate_points(prediction, (int(home_goals), int(away_goals)))
-                    
-                    # Aktualizuj punkty w match_points (tylko jeśli nie są ręcznie ustawione)
-                    if 'match_points' not in self.data['rounds'][round_id]:
-                        self.data['rounds'][round_id]['match_points'] = {}
-                    if player_name not in self.data['rounds'][round_id]['match_points']:
-                        self.data['rounds'][round_id]['match_points'][player_name] = {}
-                    
-                    # Sprawdź czy punkty są ręcznie ustawione - jeśli tak, nie nadpisuj
-                    if not self.is_manual_points(round_id, match_id_str, player_name):
-                        self.data['rounds'][round_id]['match_points'][player_name][match_id_str] = points
-                        logger.info(f"add_prediction: Przeliczono punkty {points} dla gracza {player_name}, mecz {match_id_str}, typ {prediction}, wynik {home_goals}-{away_goals}")
-                    
-                    # Przelicz całkowite punkty gracza (dla sezonu) tylko jeśli nie jesteśmy w trybie batch.
-                    if recalculate_totals:
-                        self._recalculate_player_totals(season_id=season_id)
-                break
-        
-        # NIE zapisuj od razu przez _save_data() (używa debounce) - zapis będzie przez flush_save() po wszystkich typach
-        # self._save_data()  # Wyłączone - zapis będzie przez flush_save() po wszystkich typach
-        logger.info("add_prediction: Typ zapisany do pamięci, czekam na flush_save()")
-        return True
+        # Kontenery i mapa meczów rozwiązywane raz dla całej partii
+        round_predictions = round_data.setdefault('predictions', {}).setdefault(player_name, {})
+        player_round_predictions = players[player_name]['predictions'].setdefault(round_id, {})
+        matches_by_id = {str(match.get('match_id')): match for match in round_data.get('matches', [])}
+        timestamp = datetime.now().isoformat()
+        
+        created_count = 0
+        updated_count = 0
+        for match_id, prediction in predictions.items():
+            match_id_str = str(match_id)
+            if match_id_str in round_predictions:
+                updated_count += 1
+            else:
+                created_count += 1
+            
+            entry = {'home': prediction[0], 'away': prediction[1], 'timestamp': timestamp}
+            round_predictions[match_id_str] = entry
+            player_round_predictions[match_id_str] = dict(entry)
+            
+            # Przelicz punkty dla rozegranego meczu (bez nadpisywania punktów ustawionych ręcznie)
+            match = matches_by_id.get(match_id_str)
+            if match and match.get('home_goals') is not None and match.get('away_goals') is not None:
+                if not self.is_manual_points(round_id, match_id_str, player_name):
+                    points = Tipper.calculate_points(prediction, (int(match['home_goals']), int(match['away_goals'])))
+                    round_data.setdefault('match_points', {}).setdefault(player_name, {})[match_id_str] = points
+        
+        if predictions:
+            self._mark_data_changed()
+        logger.debug("add_predictions_batch: Gracz %s, runda %s: %s nowych, %s zaktualizowanych typów", player_name, round_id, created_count, updated_count)
+        return created_count, updated_count
     
+    @_synchronized
     def delete_player_predictions(self, round_id: str, player_name: str):
-        """Usuwa wszystkie typy gracza dla danej rundy"""
+        """Usuwa wszystkie typy gracza dla danej rundy (przez delete_predictions_batch)"""
         if round_id not in self.data['rounds']:
-            logger.error(f"Runda {round_id} nie istnieje")
+            logger.error("Runda %s nie istnieje", round_id)
             return False
         
-        # Pobierz sezon z rundy
         round_data = self.data['rounds'][round_id]
         season_id = round_data.get('season_id', self.season_id)
-        
-        # Pobierz graczy dla sezonu
         players = self._get_season_players(season_id)
         
         if player_name not in players:
-            logger.error(f"Gracz {player_name} nie istnieje w sezonie {season_id}")
+            logger.error("Gracz %s nie istnieje w sezonie %s", player_name, season_id)
             return False
         
-        # Usuń typy z rundy
-        if 'predictions' in self.data['rounds'][round_id]:
-            if player_name in self.data['rounds'][round_id]['predictions']:
-                del self.data['rounds'][round_id]['predictions'][player_name]
+        # Wszystkie mecze gracza w rundzie: typy w rundzie, punkty oraz typy w strukturze gracza
+        match_ids = (
+            set(round_data.get('predictions', {}).get(player_name, {}))
+            | set(round_data.get('match_points', {}).get(player_name, {}))
+            | set(players[player_name]['predictions'].get(round_id, {}))
+        )
+        self.delete_predictions_batch(round_id, player_name, list(match_ids))
+        return True
+    
+    @_synchronized
+    def delete_predictions_batch(self, round_id: str, player_name: str, match_ids: List[str], save: bool = True) -> int:
+        """Usuwa wskazane typy gracza z rundy jednym przebiegiem; zwraca liczbę usuniętych typów."""
+        if round_id not in self.data['rounds']:
+            logger.error("Runda %s nie istnieje", round_id)
+            return 0
         
-        # Usuń typy z gracza (w sezonie)
-        if round_id in players[player_name]['predictions']:
-            del players[player_name]['predictions'][round_id]
+        round_data = self.data['rounds'][round_id]
+        season_id = round_data.get('season_id', self.season_id)
+        players = self._get_season_players(season_id)
+        match_ids_to_delete = {str(match_id) for match_id in match_ids}
         
-        # Usuń punkty dla tego gracza w tej rundzie
-        if 'match_points' in self.data['rounds'][round_id]:
-            if player_name in self.data['rounds'][round_id]['match_points']:
-                del self.data['rounds'][round_id]['match_points'][player_name]
+        if not match_ids_to_delete:
+            return 0
         
-        self._save_data()
-        self._recalculate_player_totals(season_id=season_id)
-        return True
+        # (kontener, klucz, czy to typy): typy i punkty w rundzie oraz typy w strukturze gracza (w sezonie)
+        containers = [
+            (round_data.get('predictions', {}), player_name, True),
+            (round_data.get('match_points', {}), player_name, False)
+        ]
+        if player_name in players:
+            containers.append((players[player_name]['predictions'], round_id, True))
+        
+        deleted_count = 0
+        removed_any = False
+        for container, key, holds_predictions in containers:
+            entries = container.get(key)
+            if not entries:
+                continue
+            
+            removed = [match_id for match_id in list(entries) if str(match_id) in match_ids_to_delete]
+            for match_id in removed:
+                del entries[match_id]
+            removed_any = removed_any or bool(removed)
+            if holds_predictions:
+                deleted_count = max(deleted_count, len(removed))
+            if not entries:
+                del container[key]
+        
+        # Także same punkty (bez typów) zmieniają dane - przelicz sumy i podbij rewizję
+        if removed_any:
+            self._mark_data_changed()
+            self._recalculate_player_totals(season_id=season_id, save=False, player_names=[player_name])
+            if save:
+                self._save_data()
+        
+        logger.info("delete_predictions_batch: Usunięto %s typów gracza %s w rundzie %s", deleted_count, player_name, round_id)
+        return deleted_count
     
+    @_synchronized
     def update_match_result(
         self,
         round_id: str,
@@ -949,7 +1113,7 @@ class TipperStorage:
     ):
         """Aktualizuje wynik meczu i przelicza punkty"""
         if round_id not in self.data['rounds']:
-            logger.error(f"Runda {round_id} nie istnieje")
+            logger.error("Runda %s nie istnieje", round_id)
             return
         
         # Znajdź mecz w rundzie
@@ -961,7 +1125,7 @@ class TipperStorage:
                 match['away_goals'] = away_goals
                 match['result_updated'] = datetime.now().isoformat()
                 match_found = True
-                logger.info(f"update_match_result: Zaktualizowano wynik meczu {match_id} w storage: {home_goals}-{away_goals}")
+                logger.debug("update_match_result: Zaktualizowano wynik meczu %s w storage: %s-%s", match_id, home_goals, away_goals)
                 break
         
         # Jeśli mecz nie został znaleziony w storage, ale są typy dla niego, dodaj go
@@ -974,7 +1138,7 @@ class TipperStorage:
                     break
             
             if has_predictions:
-                logger.warning(f"update_match_result: ⚠️ Mecz {match_id} nie jest w storage, ale gracze mają typy - dodaję mecz do storage")
+                logger.warning("update_match_result: ⚠️ Mecz %s nie jest w storage, ale gracze mają typy - dodaję mecz do storage", match_id)
                 # Dodaj podstawowy mecz do storage (bez pełnych danych, ale z wynikiem)
                 new_match = {
                     'match_id': str(match_id),
@@ -983,7 +1147,7 @@ class TipperStorage:
                     'result_updated': datetime.now().isoformat()
                 }
                 matches.append(new_match)
-                logger.info(f"update_match_result: ✅ Dodano mecz {match_id} do storage z wynikiem {home_goals}-{away_goals}")
+                logger.info("update_match_result: ✅ Dodano mecz %s do storage z wynikiem %s-%s", match_id, home_goals, away_goals)
         
         # Pobierz sezon z rundy
         round_data = self.data['rounds'][round_id]
@@ -993,10 +1157,9 @@ class TipperStorage:
         players = self._get_season_players(season_id)
         
         # Przelicz punkty dla wszystkich graczy
-        from tipper import Tipper
         predictions = self.data['rounds'][round_id].get('predictions', {})
         
-        logger.info(f"update_match_result: round_id={round_id}, match_id={match_id}, wynik={home_goals}-{away_goals}, graczy z typami={len(predictions)}")
+        logger.debug("update_match_result: round_id=%s, match_id=%s, wynik=%s-%s, graczy z typami=%s", round_id, match_id, home_goals, away_goals, len(predictions))
         
         for player_name, player_predictions in predictions.items():
             # Sprawdź zarówno string jak i int jako klucz
@@ -1008,18 +1171,19 @@ class TipperStorage:
             elif match_id.isdigit() and int(match_id) in player_predictions:
                 pred = player_predictions[int(match_id)]
             
-            logger.info(f"update_match_result: Gracz {player_name}, match_id={match_id}, pred={pred}, player_predictions keys={list(player_predictions.keys())}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("update_match_result: Gracz %s, match_id=%s, pred=%s, player_predictions keys=%s", player_name, match_id, pred, list(player_predictions.keys()))
             
             if pred:
                 # Sprawdź czy punkty są ręcznie ustawione - jeśli tak, nie nadpisuj ich
                 if self.is_manual_points(round_id, match_id, player_name):
-                    logger.info(f"update_match_result: ⏭️ Pomijam automatyczne przeliczanie punktów dla gracza {player_name}, mecz {match_id} - punkty są ręcznie ustawione")
+                    logger.debug("update_match_result: ⏭️ Pomijam automatyczne przeliczanie punktów dla gracza %s, mecz %s - punkty są ręcznie ustawione", player_name, match_id)
                     continue
                 
                 prediction_tuple = (pred['home'], pred['away'])
                 points = Tipper.calculate_points(prediction_tuple, (home_goals, away_goals))
                 
-                logger.info(f"update_match_result: Gracz {player_name}, typ={prediction_tuple}, wynik={home_goals}-{away_goals}, obliczone punkty={points}")
+                logger.debug("update_match_result: Gracz %s, typ=%s, wynik=%s-%s, obliczone punkty=%s", player_name, prediction_tuple, home_goals, away_goals, points)
                 
                 # Debug: sprawdź szczegóły obliczeń
                 pred_home, pred_away = prediction_tuple
@@ -1041,7 +1205,10 @@ class TipperStorage:
                 base_points = 10 if pred_result == actual_result_type else 5
                 total_before_max = base_points - home_diff - away_diff
                 
-                logger.info(f"update_match_result: DEBUG - pred_result={pred_result}, actual_result={actual_result_type}, base_points={base_points}, home_diff={home_diff}, away_diff={away_diff}, total_before_max={total_before_max}, final_points={points}")
+                logger.debug(
+                    "update_match_result: pred_result=%s, actual_result=%s, base_points=%s, home_diff=%s, away_diff=%s, total_before_max=%s, final_points=%s",
+                    pred_result, actual_result_type, base_points, home_diff, away_diff, total_before_max, points
+                )
                 
                 # Aktualizuj punkty gracza (w sezonie)
                 if player_name not in players:
@@ -1055,16 +1222,88 @@ class TipperStorage:
                 
                 # Użyj string jako klucz dla spójności
                 self.data['rounds'][round_id]['match_points'][player_name][str(match_id)] = points
-                logger.info(f"update_match_result: ✅ Zapisano punkty {points} dla gracza {player_name}, mecz {match_id}")
+                logger.debug("update_match_result: ✅ Zapisano punkty %s dla gracza %s, mecz %s", points, player_name, match_id)
             else:
-                logger.warning(f"update_match_result: ⚠️ Gracz {player_name} nie ma typu dla meczu {match_id}")
+                logger.debug("update_match_result: Gracz %s nie ma typu dla meczu %s", player_name, match_id)
         
+        self._mark_data_changed()
         if recalculate_totals:
             self._recalculate_player_totals(season_id=season_id, save=False)
 
         if save:
             self._save_data()
     
+    @_synchronized
+    def update_match_results_bulk(self, round_id: str, results: List[Tuple[str, int, int]], season_id: str = None) -> int:
+        """Aktualizuje wyniki wielu meczów rundy, przelicza sumy raz i zapisuje jednym wywołaniem; zwraca liczbę przeliczonych meczów"""
+        if season_id is None:
+            season_id = self.data['rounds'].get(round_id, {}).get('season_id', self.season_id)
+
+        updated_count = 0
+        for match_id, home_goals, away_goals in results:
+            try:
+                self.update_match_result(round_id, match_id, home_goals, away_goals, save=False, recalculate_totals=False)
+                updated_count += 1
+            except Exception as e:
+                logger.error("Błąd przeliczania punktów dla meczu %s w rundzie %s: %s", match_id, round_id, e, exc_info=True)
+
+        if updated_count > 0:
+            self._recalculate_player_totals(season_id=season_id, save=False)
+            self._save_data(force=True)
+        return updated_count
+
+    @_synchronized
+    def sync_round_results(self, round_id: str, api_matches: List[Dict], add_missing: bool = False) -> int:
+        """Przenosi wyniki meczów z API do rundy (opcjonalnie dodaje brakujące mecze z typami) i zapisuje zmiany; zwraca liczbę zmienionych meczów"""
+        if round_id not in self.data['rounds']:
+            logger.debug("sync_round_results: Runda %s nie istnieje", round_id)
+            return 0
+
+        round_data = self.data['rounds'][round_id]
+        round_matches = round_data.setdefault('matches', [])
+        storage_matches_map = {str(match.get('match_id', '')): match for match in round_matches}
+        predictions = round_data.get('predictions', {})
+
+        updated_count = 0
+        for api_match in api_matches:
+            match_id = str(api_match.get('match_id', ''))
+            api_home_goals = api_match.get('home_goals')
+            api_away_goals = api_match.get('away_goals')
+            if api_home_goals is None or api_away_goals is None:
+                logger.debug("⏭️ Mecz %s z API nie ma wyniku (home_goals=%s, away_goals=%s)", match_id, api_home_goals, api_away_goals)
+                continue
+
+            storage_match = storage_matches_map.get(match_id)
+            if storage_match is not None:
+                storage_home_goals = storage_match.get('home_goals')
+                storage_away_goals = storage_match.get('away_goals')
+                # Zaktualizuj wynik tylko jeśli się zmienił lub nie był zapisany
+                if storage_home_goals != api_home_goals or storage_away_goals != api_away_goals:
+                    logger.info("✅ Aktualizuję wynik meczu %s w rundzie %s: %s-%s -> %s-%s", match_id, round_id, storage_home_goals, storage_away_goals, api_home_goals, api_away_goals)
+                    storage_match['home_goals'] = api_home_goals
+                    storage_match['away_goals'] = api_away_goals
+                    storage_match['result_updated'] = datetime.now().isoformat()
+                    updated_count += 1
+                continue
+
+            has_predictions = any(match_id in player_predictions for player_predictions in predictions.values())
+            if add_missing and has_predictions:
+                # Dodaj mecz do storage z danymi z API
+                logger.warning("⚠️ Mecz %s z API nie został znaleziony w storage, ale gracze mają typy - dodaję mecz do storage", match_id)
+                new_match = dict(api_match)
+                new_match['result_updated'] = datetime.now().isoformat()
+                round_matches.append(new_match)
+                storage_matches_map[match_id] = new_match
+                updated_count += 1
+            else:
+                logger.warning("⚠️ Mecz %s z API nie został znaleziony w storage rundy %s - pomijam", match_id, round_id)
+
+        if updated_count > 0:
+            self._save_data(force=True)
+            logger.info("Zaktualizowano %s wyników meczów w rundzie %s", updated_count, round_id)
+        return updated_count
+
+    @_synchronized
     def set_manual_points(self, round_id: str, match_id: str, player_name: str, points: int, season_id: str = None):
         """
         Ręcznie ustawia punkty dla gracza i meczu (może być ujemne)
@@ -1080,7 +1319,7 @@ class TipperStorage:
             season_id = self.season_id
         
         if round_id not in self.data['rounds']:
-            logger.error(f"Runda {round_id} nie istnieje")
+            logger.error("Runda %s nie istnieje", round_id)
             return False
         
         # Pobierz graczy dla sezonu
@@ -1154,13 +1393,16 @@ class TipperStorage:
         
         return True
     
-    def _recalculate_player_totals(self, season_id: str = None, save: bool = True):
-        """Przelicza całkowite punkty dla wszystkich graczy w danym sezonie"""
+    @_synchronized
+    def _recalculate_player_totals(self, season_id: str = None, save: bool = True, player_names: Optional[List[str]] = None) -> bool:
+        """Przelicza całkowite punkty graczy w danym sezonie (wszystkich lub tylko wskazanych w player_names); zwraca True, gdy sumy się zmieniły"""
         if season_id is None:
             season_id = self.season_id
         
         # Pobierz graczy dla sezonu
         players = self._get_season_players(season_id)
+        if player_names is not None:
+            players = {name: players[name] for name in player_names if name in players}
         
         # Filtruj rundy tylko dla tego sezonu
         season_rounds = {}
@@ -1168,6 +1410,14 @@ class TipperStorage:
             if round_data.get('season_id') == season_id:
                 season_rounds[round_id] = round_data
         
+        # Posortowane mecze i status rundy liczone raz na rundę (a nie osobno dla każdego gracza)
+        sorted_round_matches = {
+            round_id: sorted(round_data.get('matches', []), key=lambda m: m.get('match_date', ''))
+            for round_id, round_data in season_rounds.items()
+        }
+        finished_rounds = {round_id for round_id, round_data in season_rounds.items() if self._is_round_finished(round_data)}
+        
+        totals_changed = False
         for player_name, player_data in players.items():
             total_points = 0
             rounds_played = 0
@@ -1180,11 +1430,10 @@ class TipperStorage:
             for round_id, round_data in season_rounds.items():
                 round_points = 0
                 match_points = round_data.get('match_points', {}).get(player_name, {})
-                matches = round_data.get('matches', [])
                 predictions = round_data.get('predictions', {}).get(player_name, {})
                 
-                # Pobierz wszystkie mecze w rundzie posortowane według daty
-                all_matches_sorted = sorted(matches, key=lambda m: m.get('match_date', ''))
+                # Wszystkie mecze w rundzie posortowane według daty
+                all_matches_sorted = sorted_round_matches[round_id]
                 
                 # Sumuj punkty z meczów w rundzie (dla wszystkich meczów, dla których gracz ma typ)
                 for match in all_matches_sorted:
@@ -1229,8 +1478,7 @@ class TipperStorage:
                     rounds_played += 1
                 
                 # WAŻNE: Uwzględnij 0 jako najgorszy wynik TYLKO dla rozegranych kolejek
-                is_finished = self._is_round_finished(round_data)
-                if is_finished:
+                if round_id in finished_rounds:
                     # Sprawdź czy gracz typował w tej rundzie
                     has_predictions = player_name in round_data.get('predictions', {})
                     
@@ -1255,15 +1503,38 @@ class TipperStorage:
                 worst_score = min(round_scores.values()) if round_scores.values() else 0
             
             # Aktualizuj dane gracza
-            player_data['total_points'] = total_points
-            player_data['rounds_played'] = rounds_played
-            player_data['best_score'] = best_score if best_score > 0 else 0
-            # Jeśli worst_score jest inf, oznacza to że gracz nie ma żadnych rund - ustaw 0
-            player_data['worst_score'] = worst_score if worst_score != float('inf') else 0
-            player_data['round_scores'] = round_scores
+            new_totals = {
+                'total_points': total_points,
+                'rounds_played': rounds_played,
+                'best_score': best_score if best_score > 0 else 0,
+                # Jeśli worst_score jest inf, oznacza to że gracz nie ma żadnych rund - ustaw 0
+                'worst_score': worst_score if worst_score != float('inf') else 0,
+                'round_scores': round_scores
+            }
+            if any(player_data.get(key) != value for key, value in new_totals.items()):
+                player_data.update(new_totals)
+                totals_changed = True
         
-        if save:
+        if totals_changed:
+            self._mark_data_changed()
+        
+        # Bez zmian w sumach nie zapisujemy (i nie podbijamy rewizji danych), chyba że czeka odłożony zapis
+        if save and (totals_changed or self._pending_save):
             self._save_data()
+        return totals_changed
+    
+    @_synchronized
+    def recalculate_totals_and_save(self, season_id: str = None) -> bool:
+        """Przelicza sumy punktów graczy sezonu i zapisuje od razu, gdy się zmieniły (lub czeka odłożony zapis); zwraca True przy zmianie sum"""
+        totals_changed = self._recalculate_player_totals(season_id=season_id, save=False)
+        if totals_changed or self._pending_save:
+            self._save_data(force=True)
+        return totals_changed
+    
+    @_synchronized
+    def get_round_snapshot(self, round_id: str) -> Dict:
+        """Zwraca kopię danych rundy - bezpieczną do iteracji, gdy inne sesje zmieniają współdzielony storage"""
+        return copy.deepcopy(self.data['rounds'].get(round_id, {}))
     
     def get_round_predictions(self, round_id: str) -> Dict:
         """Zwraca typy dla rundy"""
@@ -1295,6 +1566,26 @@ class TipperStorage:
         else:
             return players[player_name]['predictions']
 
+    @_synchronized
+    def get_round_player_predictions(self, round_id: str, player_names: List[str], season_id: str = None) -> Dict[str, Dict]:
+        """Zwraca kopie typów wielu graczy dla rundy jednym odczytem (ta sama kolejność źródeł co get_player_predictions)"""
+        if season_id is None:
+            season_id = self.season_id
+        
+        round_predictions = self.data.get('rounds', {}).get(round_id, {}).get('predictions', {})
+        players = None
+        predictions_by_player = {}
+        for player_name in player_names:
+            if player_name in round_predictions:
+                predictions_by_player[player_name] = dict(round_predictions[player_name])
+                continue
+            # Fallback: players[player_name]['predictions'] - słownik graczy sezonu pobierany tylko raz
+            if players is None:
+                players = self._get_season_players(season_id)
+            player_data = players.get(player_name)
+            predictions_by_player[player_name] = dict(player_data['predictions'].get(round_id, {})) if player_data else {}
+        return predictions_by_player
+
     def get_player_team(self, player_name: str, season_id: str = None) -> str:
         """Zwraca opcjonalne powiązanie gracza z drużyną."""
         if season_id is None:
@@ -1306,6 +1597,7 @@ class TipperStorage:
 
         return str(players[player_name].get('team_name', '') or '').strip()
 
+    @_synchronized
     def set_player_team(self, player_name: str, team_name: str, season_id: str = None) -> bool:
         """Ustawia opcjonalne powiązanie gracza z drużyną."""
         if season_id is None:
@@ -1324,6 +1616,7 @@ class TipperStorage:
         self._save_data()
         return True
     
+    @_synchronized
     def get_leaderboard(self, exclude_worst: bool = True, season_id: str = None) -> List[Dict]:
         """Zwraca ranking graczy dla danego sezonu (z opcją odrzucenia najgorszego wyniku)"""
         if season_id is None:
@@ -1345,16 +1638,14 @@ class TipperStorage:
         
         # Pobierz wszystkie rundy sezonu posortowane po dacie (najstarsza pierwsza)
         all_rounds = sorted(season_rounds.items(), key=lambda x: x[1].get('start_date', ''))
+        # Ranking całości pokazuje tylko zamknięte kolejki - status rundy sprawdzany raz, a nie dla każdego gracza
+        finished_rounds = [(round_id, round_data) for round_id, round_data in all_rounds if self._is_round_finished(round_data)]
         
         for player_name, player_data in players.items():
             round_scores = player_data.get('round_scores', {})
             
-            # Ranking całości pokazuje tylko zamknięte kolejki.
             round_points_list = []
-            for round_id, round_data in all_rounds:
-                if not self._is_round_finished(round_data):
-                    continue
-
+            for round_id, round_data in finished_rounds:
                 round_points = round_scores.get(round_id, 0)
                 round_points_list.append(round_points)
 
@@ -1400,6 +1691,7 @@ class TipperStorage:
         
         return leaderboard
     
+    @_synchronized
     def get_round_leaderboard(self, round_id: str) -> List[Dict]:
         """Zwraca ranking graczy dla konkretnej rundy"""
         if round_id not in self.data['rounds']:
@@ -1483,11 +1775,12 @@ class TipperStorage:
                     total_points += points
                     if points > 0 or (match_id in player_predictions_dict or str(match_id) in player_predictions_dict):
                         matches_count += 1
-                    logger.info(f"DEBUG: Gracz {player_name}, match_id={match_id}, points={points}, total={total_points}")
+                    logger.debug("Gracz %s, match_id=%s, points=%s, total=%s", player_name, match_id, points, total_points)
             
-            logger.info(f"DEBUG get_round_leaderboard: Gracz {player_name}, round_id={round_id}, "
-                       f"match_points_list={match_points_list} (count={len(match_points_list)}), "
-                       f"total_points={total_points}, matches_count={matches_count}")
+            logger.debug(
+                "get_round_leaderboard: Gracz %s, round_id=%s, match_points_list=%s, total_points=%s, matches_count=%s",
+                player_name, round_id, match_points_list, total_points, matches_count
+            )
             
             team_name = str(players.get(player_name, {}).get('team_name', '') or '').strip()
 
@@ -1558,6 +1851,7 @@ class TipperStorage:
         season_data = self.data.get('seasons', {}).get(season_id, {})
         return season_uses_worst_score_rule(season_id, season_data)
 
+    @_synchronized
     def set_exclude_worst_rule(self, enabled: bool, season_id: str = None):
         """Ustawia regułę odrzucania najgorszego wyniku dla sezonu."""
         if season_id is None:
@@ -1579,6 +1873,7 @@ class TipperStorage:
         self.data['seasons'][season_id]['exclude_worst_rule'] = bool(enabled)
         self._save_data()
 
+    @_synchronized
     def set_team_metadata(self, team_metadata: Dict, season_id: str = None, merge: bool = True):
         """Zapisuje metadane drużyn dla danego sezonu."""
         if season_id is None:
@@ -1605,6 +1900,7 @@ class TipperStorage:
 
         self._save_data()
     
+    @_synchronized
     def set_selected_teams(self, team_names: List[str], season_id: str = None):
         """Zapisuje listę wybranych drużyn do typowania dla danego sezonu"""
         if season_id is None:
@@ -1627,6 +1923,7 @@ class TipperStorage:
         self.data['seasons'][season_id]['selected_teams'] = team_names
         self._save_data()
 
+    @_synchronized
     def set_selected_players(self, player_names: List[str], season_id: str = None):
         """Zapisuje listę wybranych graczy dla danego sezonu."""
         if season_id is None:
@@ -1665,6 +1962,7 @@ class TipperStorage:
         
         return []
     
+    @_synchronized
     def set_selected_leagues(self, league_ids: List[int], season_id: str = None):
         """Zapisuje listę wybranych lig do typowania dla danego sezonu"""
         if season_id is None:
@@ -1700,6 +1998,7 @@ class TipperStorage:
         # Zwróć wartość archived (domyślnie False jeśli nie istnieje)
         return self.data['seasons'][season_id].get('archived', False)
     
+    @_synchronized
     def set_season_archived(self, archived: bool, season_id: str = None):
         """Oznacza sezon jako archiwalny lub niearchiwalny"""
         if season_id is None:
@@ -1724,6 +2023,7 @@ class TipperStorage:
         self.data['seasons'][season_id]['archived'] = archived
         self._save_data()
     
+    @_synchronized
     def add_player(self, player_name: str, season_id: str = None, team_name: str = ""):
         """Dodaje gracza do sezonu"""
         if season_id is None:
@@ -1740,6 +2040,7 @@ class TipperStorage:
         self._save_data()
         return True
     
+    @_synchronized
     def remove_player(self, player_name: str, season_id: str = None):
         """Usuwa gracza z sezonu (i wszystkie jego typy)"""
         if season_id is None:
@@ -1775,6 +2076,7 @@ class TipperStorage:
         self._recalculate_player_totals(season_id=season_id)
         return True
 
+    @_synchronized
     def rename_player(self, old_name: str, new_name: str, season_id: str = None):
         """Zmienia nazwę gracza w sezonie wraz z typami i punktami."""
         if season_id is None:
@@ -1827,7 +2129,7 @@ class TipperStorage:
             season_id = self.season_id
         
         players = self._get_season_players(season_id)
-        return sorted(list(players.keys()))
+        return sorted(players)
     
     def create_new_season(self, season_num: int) -> bool:
         """Tworzy nowy sezon z pustym plikiem JSON"""